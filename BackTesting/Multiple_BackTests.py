@@ -5,19 +5,56 @@ from datetime import datetime
 import pytz
 from pathlib import Path
 import copy
+import functools
+import itertools
+import os
+import heapq
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from Core.BarStream import BarStream
+from Core.BarStore import BarStore, frame_to_columns
+from Core.Calendar import SessionCalendar
+from Core.Engine import ReplaySource, SimulatedBroker, TradingEngine
+from Core.Analytics import NS_PER_DAY, equity_curve, ledger_metrics
+from Core.Lifecycle import TRADE_DTYPE, KernelState, candidate_exits, run_kernel
+from Core.Portfolio import sizing_rule
+from Core.Strategy import ScalpingStrategy
 
 # Logging setup
 logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
 
+# Approximate bytes the streaming engine holds per symbol per bar of a chunk (raw, indicator and aligned columns)
+STREAM_BYTES_PER_BAR = 200
+
+# Sweep ranking keys where smaller is better
+LOWER_IS_BETTER = {'max_drawdown'}
+
 class BacktestScalpingBot:
-    def __init__(self, data_folder, starting_capital=5000):
+    def __init__(self, data_folder, starting_capital=5000, engine="vectorized", missing_bars="skip", bar_store=None,
+                 fill_model=None, regular_hours=True, target_assets=None, chunk_memory_mb=256):
         self.data_folder = Path(data_folder)
         self.starting_capital = starting_capital
-        self.target_assets = ['TSLA', 'AAPL', 'NVDA']
-        self.market_data = {
-            symbol: pd.read_csv(self.data_folder / f'minute_{symbol.lower()}.csv', parse_dates=['timestamp'])
-            for symbol in self.target_assets
-        }
+        # "vectorized" precomputes indicators once per symbol, "loop" recomputes them every bar,
+        # "event" replays bars through the same strategy core and engine the live bots run
+        # "portfolio" shares one account across symbols with pluggable sizing and exposure caps
+        # "streaming" runs the vectorized engine over time-ordered chunks without loading the whole history
+        self.engine = engine
+        # "skip" leaves a symbol untouched on minutes it has no bar, "ffill" marks open positions at the last close
+        self.missing_bars = missing_bars
+        self.stream = None
+        self.indicator_columns = None
+        # Optional Core.FillModel.FillModel: exits on intrabar high/low crosses instead of bar closes
+        self.fill_model = fill_model
+        # Drop pre/post-market bars (e.g. the 08:00 UTC rows in minute_tsla.csv); the live bots only trade sessions
+        self.regular_hours = regular_hours
+        self.target_assets = list(target_assets or ['TSLA', 'AAPL', 'NVDA'])
+        # Bars are {column: array}; symbols in the columnar store are memory-mapped, the rest come from CSV
+        self.bar_store = BarStore(bar_store or self.data_folder / 'bars')
+        self._market_data = None
+        # Rough peak working set of the streaming engine; sets how many bars each chunk holds
+        self.chunk_memory_mb = chunk_memory_mb
 
         # Define multiple strategy configurations
         self.strategies = [
@@ -51,6 +88,25 @@ class BacktestScalpingBot:
             }
         ]
 
+    @property
+    def market_data(self):
+        """Every symbol's bars, loaded on first use (the streaming engine never needs them all at once)"""
+        if self._market_data is None:
+            self._market_data = {symbol: self.load_bars(symbol) for symbol in self.target_assets}
+        return self._market_data
+
+    def source_bars(self, symbol):
+        if self.bar_store.has(symbol):
+            return self.bar_store.load(symbol)
+        frame = pd.read_csv(self.data_folder / f'minute_{symbol.lower()}.csv', parse_dates=['timestamp'])
+        return frame_to_columns(frame)
+
+    def load_bars(self, symbol):
+        bars = self.source_bars(symbol)
+        if self.regular_hours and len(bars['timestamp']):
+            return regular_session_bars(bars)
+        return bars
+
     def run_all_strategies(self):
         results = []
         for strat in self.strategies:
@@ -64,7 +120,48 @@ class BacktestScalpingBot:
             print(f"{res['name']} => Trades: {res['trades']}, Wins: {res['wins']}, Losses: {res['losses']}, "
                   f"Win Rate: {win_rate:.2f}%, PnL: {res['pnl']:.2f}, Ending Capital: {res['capital']:.2f}")
 
-    def run_backtest_for_strategy(self, config):
+        ledgers = [res['ledger'] for res in results if 'ledger' in res]
+        if len(ledgers) == len(results):
+            metrics = ledger_metrics(ledgers, self.starting_capital, n_days=self.trading_days())
+            print("\n=== RISK AND HOLD TIMES ===")
+            for res, row in zip(results, metrics.itertuples()):
+                print(f"{res['name']} => Max Drawdown: {row.max_drawdown * 100:.3f}%, Sharpe: {row.sharpe:.2f}, "
+                      f"Profit Factor: {row.profit_factor:.2f}, Mean Hold: {row.mean_hold_minutes:.1f} min")
+        return results
+
+    def run_backtest_for_strategy(self, config, engine=None):
+        """Run one config; engines built on the lifecycle kernel also return a trade `ledger`
+        (Core.Lifecycle.TRADE_DTYPE) and its realised `equity_curve`"""
+        engine = engine or self.engine
+        if engine == "vectorized":
+            result = self.run_vectorized_backtest(config)
+        elif engine == "loop":
+            result = self.run_loop_backtest(config)
+        elif engine == "event":
+            result = self.run_event_backtest(config)
+        elif engine == "portfolio":
+            result = self.run_portfolio_backtest(config)
+        elif engine == "streaming":
+            result = self.run_streaming_backtest(config)
+        else:
+            raise ValueError(f"Unknown backtest engine: {engine}")
+        if 'ledger' in result:
+            result['equity_curve'] = equity_curve(result['ledger'], self.starting_capital)
+        return result
+
+    def trading_days(self):
+        """Number of UTC days with at least one bar across the target assets"""
+        days = [np.unique(np.asarray(self.market_data[symbol]['timestamp']) // NS_PER_DAY)
+                for symbol in self.target_assets]
+        return len(np.unique(np.concatenate(days)))
+
+    def require_close_exits(self, engine):
+        """Only the vectorized engine resolves exits with a fill model; the others would silently ignore it"""
+        if self.fill_model is not None:
+            raise ValueError(f"The {engine} engine resolves exits on bar closes; it does not take a fill model")
+
+    def run_loop_backtest(self, config):
+        self.require_close_exits("loop")
         price_data = {symbol: [] for symbol in self.target_assets}
         capital = self.starting_capital
         daily_pnl = 0
@@ -73,10 +170,9 @@ class BacktestScalpingBot:
         losses = 0
         active_positions = {}
 
-        min_len = min(len(self.market_data[symbol]) for symbol in self.target_assets)
-        for i in range(min_len):
-            for symbol in self.target_assets:
-                row = self.market_data[symbol].iloc[i]
+        stream = self.bar_stream()
+        for t in range(len(stream)):
+            for symbol, row in stream.bars_at(t):
                 price = row['close']
 
                 # Update price history
@@ -114,9 +210,10 @@ class BacktestScalpingBot:
 
             # Manage exits
             for symbol, pos in list(active_positions.items()):
-                current = price_data[symbol][-1]
-                current_price = current['close']
-                elapsed = (current['timestamp'] - pos['entry_time']).total_seconds() / 60
+                current_price = stream.column(symbol, 'close')[t]
+                if np.isnan(current_price):
+                    continue
+                elapsed = (stream.index[t] - pos['entry_time']).total_seconds() / 60
 
                 pnl = (current_price - pos['entry_price']) * pos['size']
                 if pos['direction'] == 'sell':
@@ -145,6 +242,220 @@ class BacktestScalpingBot:
             "capital": capital
         }
 
+    def run_event_backtest(self, config):
+        self.require_close_exits("event")
+        strategy = ScalpingStrategy(dict(config, position_size_pct=config.get('position_size_pct', 0.1)),
+                                    self.target_assets)
+        broker = SimulatedBroker(self.starting_capital)
+        ReplaySource(self.bar_stream()).run(TradingEngine(strategy, broker))
+        return {
+            "name": config["name"],
+            "trades": broker.trades,
+            "wins": broker.wins,
+            "losses": broker.losses,
+            "pnl": broker.pnl,
+            "capital": broker.capital
+        }
+
+    def bar_stream(self):
+        """Merge all symbols onto one timestamp axis, built once per bot"""
+        if self.stream is None:
+            self.stream = BarStream.from_columns(
+                {symbol: self.market_data[symbol] for symbol in self.target_assets},
+                missing=self.missing_bars
+            )
+        return self.stream
+
+    def precompute_indicators(self):
+        """Compute RSI, MACD/signal and EMA20/50 once per symbol and align them on the bar stream"""
+        if self.indicator_columns is None:
+            stream = self.bar_stream()
+            self.indicator_columns = {}
+            for symbol in self.target_assets:
+                # Indicators run over the symbol's own bars; missing minutes become NaN and never signal
+                columns = self.build_indicator_columns(self.market_data[symbol])
+                aligned = {name: stream.align(symbol, values) for name, values in columns.items()}
+                for field in ('open', 'high', 'low', 'close'):
+                    aligned[field] = stream.column(symbol, field)
+                aligned['timestamp'] = stream.timestamps
+                self.indicator_columns[symbol] = aligned
+        return self.indicator_columns
+
+    def build_indicator_columns(self, bars, period=14, short_period=12, long_period=26,
+                                signal_period=9, short_ema=20, long_ema=50, state=None):
+        """Indicator columns over `bars`; pass the same `state` dict for consecutive chunks of one
+        symbol's bars and each chunk continues where the previous one stopped, bit for bit"""
+        closes = np.asarray(bars['close'], dtype=np.float64)
+        n = len(closes)
+        if state is None:
+            seen, tail = 0, closes[:0]
+        else:
+            seen, tail = state.setdefault('count', 0), state.setdefault('tail', closes[:0])
+            state.setdefault('ema', {})
+
+        # RSI over the last `period` closes, same window and zero-loss rule as calculate_rsi
+        rsi = np.full(n, np.nan)
+        history = np.concatenate([tail, closes])
+        if len(history) >= period:
+            windows = np.lib.stride_tricks.sliding_window_view(np.diff(history), period - 1)
+            gains = np.where(windows > 0, windows, 0.0).sum(axis=1)
+            losses = -np.where(windows < 0, windows, 0.0).sum(axis=1)
+            rs = np.divide(gains, losses, out=np.zeros_like(gains), where=losses != 0)
+            first = max(period - 1 - len(tail), 0)
+            rsi[first:] = (100 - (100 / (1 + rs)))[len(tail) + first - (period - 1):]
+
+        # EWMs are causal, so one pass over the full series matches every prefix recomputation
+        ema = None if state is None else state['ema']
+        macd = ewm_mean(closes, short_period, ema) - ewm_mean(closes, long_period, ema)
+        signal = ewm_mean(macd, signal_period, ema, key='signal')
+        ema_short = ewm_mean(closes, short_ema, ema)
+        ema_long = ewm_mean(closes, long_ema, ema)
+        # Warm-up bars count from the symbol's first bar, not the chunk's
+        macd[:max(long_period - 1 - seen, 0)] = np.nan
+        signal[:max(long_period - 1 - seen, 0)] = np.nan
+        ema_short[:max(long_ema - 1 - seen, 0)] = np.nan
+        ema_long[:max(long_ema - 1 - seen, 0)] = np.nan
+
+        if state is not None:
+            state['count'] = seen + n
+            state['tail'] = history[-(period - 1):].copy()
+        return {
+            'close': closes,
+            'rsi': rsi,
+            'macd': macd,
+            'signal': signal,
+            'ema_short': ema_short,
+            'ema_long': ema_long
+        }
+
+    def run_vectorized_backtest(self, config):
+        return simulate_vectorized(
+            self.precompute_indicators(), self.target_assets, self.starting_capital, config, self.fill_model
+        )
+
+    def run_portfolio_backtest(self, config):
+        self.require_close_exits("portfolio")
+        return simulate_portfolio(self.precompute_indicators(), self.target_assets, self.starting_capital, config)
+
+    def run_streaming_backtest(self, config, chunk_bars=None):
+        """The vectorized backtest over time-ordered chunks of at most `chunk_bars` bars per symbol.
+
+        Bars are read chunk by chunk (memory-mapped from the bar store; CSV-only
+        symbols are still parsed whole), and indicator state, open positions and
+        capital carry across chunk boundaries, so results are identical to
+        run_vectorized_backtest while the working set stays bounded by the chunk
+        size rather than the length of the history.
+        """
+        self.require_close_exits("streaming")
+        if chunk_bars is None:
+            chunk_bars = self.chunk_memory_mb * 2 ** 20 // (STREAM_BYTES_PER_BAR * len(self.target_assets))
+        chunk_bars = max(int(chunk_bars), 1)
+
+        sources = {symbol: self.source_bars(symbol) for symbol in self.target_assets}
+        times = {symbol: sources[symbol]['timestamp'] for symbol in self.target_assets}
+        cursor = dict.fromkeys(self.target_assets, 0)
+        calendar = None
+        if self.regular_hours:
+            first = min(int(values[0]) for values in times.values() if len(values))
+            last = max(int(values[-1]) for values in times.values() if len(values))
+            calendar = SessionCalendar(start=pd.Timestamp(first) - pd.Timedelta(days=1),
+                                       end=pd.Timestamp(last) + pd.Timedelta(days=1))
+
+        indicator_state = {symbol: {} for symbol in self.target_assets}
+        last_close = {}
+        kernel = KernelState(len(self.target_assets), self.starting_capital, config)
+        ledger = [np.zeros(0, dtype=TRADE_DTYPE)]
+        offset = 0
+        while True:
+            # The chunk ends where some symbol has used up its chunk_bars; every symbol stays within it
+            remaining = [symbol for symbol in self.target_assets if cursor[symbol] < len(times[symbol])]
+            if not remaining:
+                break
+            end = min(times[symbol][cursor[symbol] + chunk_bars] if cursor[symbol] + chunk_bars < len(times[symbol])
+                      else np.iinfo(np.int64).max for symbol in remaining)
+            chunk = {}
+            for symbol in self.target_assets:
+                stop = int(np.searchsorted(times[symbol], end))
+                bars = {name: np.asarray(sources[symbol][name][cursor[symbol]:stop]) for name in ('timestamp', 'close')}
+                cursor[symbol] = stop
+                if calendar is not None and len(bars['timestamp']):
+                    inside = calendar.session_mask(bars['timestamp'])
+                    bars = {name: values[inside] for name, values in bars.items()}
+                chunk[symbol] = bars
+            if not any(len(bars['timestamp']) for bars in chunk.values()):
+                continue
+
+            stream = BarStream.from_columns(chunk, fields=('close',), missing=self.missing_bars)
+            signals, closes = [], []
+            for symbol in self.target_assets:
+                columns = self.build_indicator_columns(chunk[symbol], state=indicator_state[symbol])
+                aligned = {name: stream.align(symbol, values) for name, values in columns.items()}
+                aligned['close'] = stream.column(symbol, 'close')
+                if self.missing_bars == "ffill" and symbol in last_close:
+                    # Minutes before the symbol's first bar in this chunk carry the previous chunk's last close
+                    before = ~np.maximum.accumulate(stream.present[stream.rows[symbol]])
+                    aligned['close'][before] = last_close[symbol]
+                if len(chunk[symbol]['close']):
+                    last_close[symbol] = chunk[symbol]['close'][-1]
+                signals.append(entry_signals(aligned, config))
+                closes.append(aligned['close'])
+
+            ledger.append(kernel.run_chunk(signals, closes, stream.timestamps, offset))
+            offset += len(stream)
+
+        # Trades close in a later chunk than they open in; restore the in-memory run's entry order
+        ledger = np.concatenate(ledger)
+        ledger = ledger[np.lexsort((ledger['symbol'], ledger['entry_index']))]
+        wins = int(np.count_nonzero(ledger['pnl'] > 0))
+        return {
+            "name": config["name"],
+            "trades": len(ledger),
+            "wins": wins,
+            "losses": len(ledger) - wins,
+            "pnl": kernel.pnl,
+            "capital": kernel.capital,
+            "ledger": ledger
+        }
+
+    def run_parameter_sweep(self, param_ranges, processes=None, rank_by="pnl", engine="vectorized",
+                            base_config=None):
+        """Evaluate every combination of `param_ranges` on a process pool and return a ranked DataFrame.
+
+        Parameters not in `param_ranges` come from `base_config` (by default the
+        first entry of `self.strategies`), so a partial grid is a complete config.
+        Engines that keep a trade ledger also get Core.Analytics.ledger_metrics
+        columns (max_drawdown, sharpe, profit_factor, hold times, ...), computed
+        for all configs in one pass, and any of them can be the `rank_by` key.
+        """
+        if engine == "portfolio":
+            self.require_close_exits(engine)
+        configs = expand_parameter_grid(param_ranges, self.strategies[0] if base_config is None else base_config)
+        columns = self.precompute_indicators()
+        for symbol_columns in columns.values():
+            for values in symbol_columns.values():
+                values.setflags(write=False)
+
+        logging.info(f"Sweeping {len(configs)} configurations on {processes or os.cpu_count()} processes...")
+        chunksize = max(1, len(configs) // ((processes or os.cpu_count()) * 4))
+        with ProcessPoolExecutor(
+            max_workers=processes,
+            initializer=_init_sweep_worker,
+            initargs=(columns, self.target_assets, self.starting_capital, self.fill_model, engine)
+        ) as pool:
+            results = list(pool.map(_run_sweep_config, configs, chunksize=chunksize))
+
+        ledgers = [result.pop('ledger', None) for result in results]
+        ranked = pd.DataFrame(results)
+        ranked['win_rate'] = ranked['wins'] / ranked['trades'].clip(lower=1) * 100
+        if all(ledger is not None for ledger in ledgers):
+            metrics = ledger_metrics(ledgers, self.starting_capital, n_days=self.trading_days())
+            for name in metrics.columns.difference(ranked.columns, sort=False):
+                ranked[name] = metrics[name].to_numpy()
+        ranked = ranked.sort_values(rank_by, ascending=rank_by in LOWER_IS_BETTER,
+                                    kind='stable').reset_index(drop=True)
+        ranked.insert(0, 'rank', np.arange(1, len(ranked) + 1))
+        return ranked
+
     def calculate_rsi(self, price_data, period=14):
         closes = [p['close'] for p in price_data][-period:]
         if len(closes) < period:
@@ -176,6 +487,326 @@ class BacktestScalpingBot:
         else:
             return 'neutral'
 
+
+def regular_session_bars(bars):
+    """Keep only the bars inside NYSE regular sessions; memory-mapped columns stay mapped if nothing is dropped"""
+    timestamps = bars['timestamp']
+    calendar = SessionCalendar(start=pd.Timestamp(int(timestamps[0])) - pd.Timedelta(days=1),
+                               end=pd.Timestamp(int(timestamps[-1])) + pd.Timedelta(days=1))
+    inside = calendar.session_mask(timestamps)
+    if inside.all():
+        return bars
+    return {name: values[inside] for name, values in bars.items()}
+
+
+@functools.lru_cache(maxsize=None)
+def ewm_settle_count(span):
+    """Observations after which pandas' adjusted EWM weight stops changing in float64"""
+    decay = 1. - 1. / (1. + (span - 1) / 2.)
+    weight, count = 1., 1
+    while weight * decay + 1. != weight:
+        weight = weight * decay + 1.
+        count += 1
+    return count
+
+
+def ewm_mean(values, span, state=None, key=None):
+    """pandas ewm(span=...).mean() of `values`, continued from state[key] if a state dict is given.
+
+    The adjusted EWM carries only its running mean and a weight that depends on
+    the observation count alone, so replaying `count` copies of the mean (capped
+    once the weight settles) restarts it exactly where the last chunk stopped.
+    """
+    key = span if key is None else key
+    carried = None if state is None else state.get(key)
+    if carried is None:
+        mean = pd.Series(values).ewm(span=span).mean().to_numpy(copy=True)
+    else:
+        prefix = np.full(min(carried['count'], ewm_settle_count(span)), carried['value'])
+        mean = pd.Series(np.concatenate([prefix, values])).ewm(span=span).mean().to_numpy()[len(prefix):].copy()
+    if state is not None and len(values):
+        state[key] = {'value': mean[-1], 'count': (carried or {'count': 0})['count'] + len(values)}
+    return mean
+
+
+def entry_signals(columns, config):
+    """Return per-bar +1 (buy), -1 (sell) or 0 from precomputed indicator columns"""
+    rsi, macd, signal = columns['rsi'], columns['macd'], columns['signal']
+    trend_up = columns['ema_short'] > columns['ema_long']
+    trend_down = columns['ema_short'] < columns['ema_long']
+    buy = (rsi < config['rsi_buy_threshold']) & (macd > signal) & trend_up
+    sell = (rsi > config.get('rsi_sell_threshold', 56)) & (macd < signal) & trend_down
+    return np.where(buy, 1, np.where(sell, -1, 0)).astype(np.int8)
+
+
+def simulate_vectorized(columns, target_assets, starting_capital, config, fill_model=None):
+    """Run one strategy config over precomputed indicator columns.
+
+    The position lifecycle runs in Core.Lifecycle's single-pass kernel (JIT
+    compiled when numba is installed); this only builds the signal arrays.
+    """
+    if fill_model is not None:
+        return simulate_intrabar(columns, target_assets, starting_capital, config, fill_model)
+    trades, capital, daily_pnl = run_kernel(
+        [entry_signals(columns[symbol], config) for symbol in target_assets],
+        [columns[symbol]['close'] for symbol in target_assets],
+        columns[target_assets[0]]['timestamp'], starting_capital, config
+    )
+    wins = int(np.count_nonzero(trades['pnl'] > 0))
+
+    return {
+        "name": config["name"],
+        "trades": len(trades),
+        "wins": wins,
+        "losses": len(trades) - wins,
+        "pnl": daily_pnl,
+        "capital": capital,
+        "ledger": trades
+    }
+
+
+def simulate_intrabar(columns, target_assets, starting_capital, config, fill_model):
+    """Run one strategy config with exits resolved from intrabar high/low by `fill_model`.
+
+    Fills for every candidate entry are resolved at once per symbol; the loop
+    below only walks the trades that are actually taken, not the bars.
+    """
+    taken = []
+    for order, symbol in enumerate(target_assets):
+        signals = entry_signals(columns[symbol], config)
+        candidates = np.flatnonzero(signals)
+        fills = fill_model.resolve(
+            candidates, signals[candidates], columns[symbol],
+            config['take_profit_pct'], config['stop_loss_pct'], config['max_hold_minutes']
+        )
+        # One position per symbol: the next entry must come after the previous exit bar
+        free_from = 0
+        for k, entry in enumerate(candidates):
+            if entry < free_from:
+                continue
+            exit_index = fills['exit_index'][k]
+            if exit_index < 0:
+                break  # still open when the data ends, like an unclosed position in the loop engine
+            taken.append((entry, order, exit_index, int(signals[entry]),
+                          fills['entry_price'][k], fills['exit_price'][k], fills['reason'][k]))
+            free_from = exit_index + 1
+    taken.sort()
+
+    capital = starting_capital
+    daily_pnl = 0
+    trade_count = 0
+    wins = 0
+    losses = 0
+    pending_exits = []
+    ledger = np.zeros(len(taken), dtype=TRADE_DTYPE)
+    for i, (entry, order, exit_index, direction, entry_price, exit_price, reason) in enumerate(taken):
+        # Exits on earlier bars settle before this entry is sized
+        while pending_exits and pending_exits[0][0] < entry:
+            _, _, pnl = heapq.heappop(pending_exits)
+            capital += pnl
+        size = capital * config.get('position_size_pct', 0.1) / entry_price
+        pnl = (exit_price - entry_price) * size * direction
+        pnl -= fill_model.fees(entry_price * size) + fill_model.fees(exit_price * size)
+        heapq.heappush(pending_exits, (exit_index, order, pnl))
+        ledger[i] = (order, entry, exit_index, 0, 0, direction, reason, entry_price, exit_price, size, pnl)
+
+        daily_pnl += pnl
+        trade_count += 1
+        if pnl > 0:
+            wins += 1
+        else:
+            losses += 1
+    capital += sum(pnl for _, _, pnl in pending_exits)
+    timestamps = columns[target_assets[0]]['timestamp']
+    ledger['entry_time'] = timestamps[ledger['entry_index']]
+    ledger['exit_time'] = timestamps[ledger['exit_index']]
+
+    return {
+        "name": config["name"],
+        "trades": trade_count,
+        "wins": wins,
+        "losses": losses,
+        "pnl": daily_pnl,
+        "capital": capital,
+        "ledger": ledger
+    }
+
+
+def simulate_portfolio(columns, target_assets, starting_capital, config, keep_equity=True):
+    """Run one strategy config with portfolio-level accounting across all symbols.
+
+    Positions share one account: buying power is equity * `leverage` minus the
+    gross exposure already open, entries are sized by a pluggable rule
+    (Core.Portfolio, config "sizing") and clipped by `max_position_pct` and
+    `max_gross_exposure` (both fractions of equity) and `max_open_positions`.
+    Quantities are rounded to `qty_decimals` places like the live order
+    adapters do; "buying_power" sizing defaults to 2, which with
+    position_size_pct 0.01 is exactly the live bots' rule.
+    Exits for every entry signal come from Core.Lifecycle.candidate_exits, so
+    only the signals are walked in Python; open positions are then marked to
+    market with array operations over (symbols x bars), giving an equity curve.
+    With the default "capital" sizing and no caps it reproduces simulate_vectorized.
+    """
+    sizing = config.get('sizing', 'capital')
+    decimals = config.get('qty_decimals', 2 if sizing == 'buying_power' else None)
+    sizing = sizing_rule(sizing)
+    pct = config.get('position_size_pct', 0.1)
+    leverage = config.get('leverage', 1.0)
+    max_position = config.get('max_position_pct')
+    max_gross = config.get('max_gross_exposure')
+    max_positions = config.get('max_open_positions')
+    take_profit, stop_loss, max_hold = config['take_profit_pct'], config['stop_loss_pct'], config['max_hold_minutes']
+
+    closes = np.vstack([columns[symbol]['close'] for symbol in target_assets])
+    timestamps = columns[target_assets[0]]['timestamp']
+    n_symbols, n_bars = closes.shape
+    # Marks carry each symbol's last close over minutes it has no bar
+    seen = np.where(np.isnan(closes), 0, np.arange(n_bars))
+    marks = np.take_along_axis(closes, np.maximum.accumulate(seen, axis=1), axis=1)
+    signals = np.vstack([entry_signals(columns[symbol], config) for symbol in target_assets])
+
+    # Every signal with the exit it would get if taken, in (bar, symbol) order
+    bars, symbols, exits = [], [], []
+    for i in range(n_symbols):
+        candidates, exit_index, _ = candidate_exits(signals[i], closes[i], timestamps, take_profit, stop_loss,
+                                                    max_hold)
+        bars.append(candidates)
+        symbols.append(np.full(len(candidates), i))
+        exits.append(exit_index)
+    bars, symbols, exits = np.concatenate(bars), np.concatenate(symbols), np.concatenate(exits)
+    order = np.lexsort((symbols, bars))
+    bars, symbols, exits = bars[order], symbols[order], exits[order]
+
+    capital = starting_capital
+    daily_pnl = 0
+    trade_count = 0
+    wins = 0
+    losses = 0
+    peak_gross = 0.0
+    # Open positions: symbol index -> (qty, entry_price, direction); closed ones wait in a heap by exit bar
+    positions = {}
+    pending_exits = []
+    free_from = np.zeros(n_symbols, dtype=np.int64)
+    # Step changes of each symbol's signed qty and signed cost, for the mark-to-market arrays
+    qty_steps = np.zeros((n_symbols, n_bars + 1))
+    cost_steps = np.zeros((n_symbols, n_bars + 1))
+    realized_steps = np.zeros(n_bars)
+
+    for t, i, exit_index in zip(bars.tolist(), symbols.tolist(), exits.tolist()):
+        # Positions closed before this bar free their symbol and settle into capital
+        while pending_exits and pending_exits[0][0] < t:
+            _, j, pnl = heapq.heappop(pending_exits)
+            del positions[j]
+            capital += pnl
+        if t < free_from[i] or (max_positions is not None and len(positions) >= max_positions):
+            continue
+        gross = 0.0
+        open_pnl = 0.0
+        for j, (qty, entry_price, direction) in positions.items():
+            gross += qty * marks[j, t]
+            open_pnl += (marks[j, t] - entry_price) * qty * direction
+        equity = capital + open_pnl
+        buying_power = equity * leverage - gross
+        price = closes[i, t]
+        qty = sizing(price, capital, equity, buying_power, pct)
+        if decimals is not None:
+            qty = round(qty, decimals)
+        limit = buying_power
+        if max_position is not None:
+            limit = min(limit, equity * max_position)
+        if max_gross is not None:
+            limit = min(limit, equity * max_gross - gross)
+        if qty * price > limit:
+            qty = limit / price
+            if decimals is not None:
+                qty = np.floor(qty * 10 ** decimals) / 10 ** decimals
+        if qty <= 0:
+            continue
+        direction = signals[i, t]
+        positions[i] = (qty, price, direction)
+        peak_gross = max(peak_gross, gross + qty * price)
+
+        # Held (and marked) from the entry bar until the exit bar, where the pnl is realised
+        held_until = n_bars if exit_index < 0 else exit_index
+        qty_steps[i, t] += qty * direction
+        qty_steps[i, held_until] -= qty * direction
+        cost_steps[i, t] += price * qty * direction
+        cost_steps[i, held_until] -= price * qty * direction
+        free_from[i] = held_until + 1
+        if exit_index < 0:
+            heapq.heappush(pending_exits, (n_bars, i, 0.0))
+            continue
+        pnl = (closes[i, exit_index] - price) * qty
+        if direction < 0:
+            pnl *= -1
+        heapq.heappush(pending_exits, (exit_index, i, pnl))
+        realized_steps[exit_index] += pnl
+        daily_pnl += pnl
+        trade_count += 1
+        if pnl > 0:
+            wins += 1
+        else:
+            losses += 1
+    capital = starting_capital + daily_pnl
+
+    # Positions of one symbol never overlap, so the running sums return to exactly zero between them
+    signed_qty = np.cumsum(qty_steps[:, :n_bars], axis=1)
+    signed_cost = np.cumsum(cost_steps[:, :n_bars], axis=1)
+    unrealized = (np.nan_to_num(marks) * signed_qty - signed_cost).sum(axis=0)
+    equity = starting_capital + np.cumsum(realized_steps) + unrealized
+    peaks = np.maximum.accumulate(equity)
+    result = {
+        "name": config["name"],
+        "trades": trade_count,
+        "wins": wins,
+        "losses": losses,
+        "pnl": daily_pnl,
+        "capital": capital,
+        "max_drawdown": float(((peaks - equity) / peaks).max()) if n_bars else 0.0,
+        "peak_gross_exposure": peak_gross
+    }
+    if keep_equity:
+        result["equity"] = equity
+    return result
+
+
+def expand_parameter_grid(param_ranges, base_config=None):
+    """Expand {"param": [values, ...]} into a list of named strategy configs"""
+    names = list(param_ranges)
+    configs = []
+    for values in itertools.product(*(param_ranges[name] for name in names)):
+        config = dict(base_config or {})
+        config.update(zip(names, values))
+        config['name'] = "Sweep_" + "_".join(f"{name}={value}" for name, value in zip(names, values))
+        configs.append(config)
+    return configs
+
+
+_sweep_state = {}
+
+
+def _init_sweep_worker(columns, target_assets, starting_capital, fill_model=None, engine="vectorized"):
+    _sweep_state['columns'] = columns
+    _sweep_state['target_assets'] = target_assets
+    _sweep_state['starting_capital'] = starting_capital
+    _sweep_state['fill_model'] = fill_model
+    _sweep_state['engine'] = engine
+
+
+def _run_sweep_config(config):
+    if _sweep_state.get('engine') == "portfolio":
+        result = simulate_portfolio(
+            _sweep_state['columns'], _sweep_state['target_assets'], _sweep_state['starting_capital'], config,
+            keep_equity=False
+        )
+    else:
+        result = simulate_vectorized(
+            _sweep_state['columns'], _sweep_state['target_assets'], _sweep_state['starting_capital'], config,
+            _sweep_state['fill_model']
+        )
+    result.update({key: value for key, value in config.items() if key != 'name'})
+    return result
+
 # Run all strategies
 if __name__ == "__main__":
     bot = BacktestScalpingBot(data_folder=".", starting_capital=5000)
@@ -0,0 +1,208 @@
+import argparse
+import logging
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from Core.Analytics import NS_PER_DAY, ledger_metrics
+from Multiple_BackTests import BacktestScalpingBot, LOWER_IS_BETTER, expand_parameter_grid, simulate_vectorized, \
+    _sweep_state, _init_sweep_worker
+
+DEFAULT_PARAM_RANGES = {
+    'take_profit_pct': [0.002, 0.0025, 0.003, 0.004],
+    'stop_loss_pct': [0.001, 0.0015, 0.002],
+    'max_hold_minutes': [8, 10, 15],
+    'rsi_buy_threshold': [30, 35],
+}
+
+
+# simulate_vectorized's own counters, then the per-ledger statistics of Core.Analytics.ledger_metrics
+RESULT_KEYS = ('trades', 'wins', 'losses', 'pnl', 'capital')
+RANK_KEYS = RESULT_KEYS + tuple(name for name in ledger_metrics([], 1.0).columns if name not in RESULT_KEYS)
+
+
+def parse_rank_by(rank_by):
+    """'key' or '-key' -> (key, lower_is_better); keys in LOWER_IS_BETTER rank ascending either way"""
+    key = rank_by[1:] if rank_by.startswith('-') else rank_by
+    if key not in RANK_KEYS:
+        raise ValueError(f"Can't rank walk-forward windows by {key!r}; choose one of {', '.join(RANK_KEYS)}")
+    return key, rank_by.startswith('-') or key in LOWER_IS_BETTER
+
+
+def walk_forward_windows(timestamps, train_days, test_days, step_days=None):
+    """Slide train/test windows over the trading days in `timestamps` (int64 ns, UTC).
+
+    Returns (train_start, train_end, test_start, test_end) bar index ranges; a
+    window counts days that have bars, so weekends and holidays don't eat into it.
+    """
+    step_days = step_days or test_days
+    days = np.asarray(timestamps) // NS_PER_DAY
+    # First bar index of every trading day, plus the end of the data
+    day_starts = np.append(np.flatnonzero(np.diff(days, prepend=days[0] - 1)), len(days))
+    n_days = len(day_starts) - 1
+    windows = []
+    for first in range(0, n_days - train_days - test_days + 1, step_days):
+        split = first + train_days
+        windows.append((int(day_starts[first]), int(day_starts[split]),
+                        int(day_starts[split]), int(day_starts[split + test_days])))
+    return windows
+
+
+def slice_columns(columns, start, end):
+    """Views of every indicator column over bars [start, end); nothing is recomputed or copied"""
+    return {symbol: {name: values[start:end] for name, values in symbol_columns.items()}
+            for symbol, symbol_columns in columns.items()}
+
+
+def _run_window(task):
+    """Optimise on the train slice, then score the winning config on the test slice"""
+    index, (train_start, train_end, test_start, test_end), configs, rank_by, min_trades = task
+    columns = _sweep_state['columns']
+    target_assets = _sweep_state['target_assets']
+    starting_capital = _sweep_state['starting_capital']
+    fill_model = _sweep_state['fill_model']
+
+    key, ascending = parse_rank_by(rank_by)
+    train = slice_columns(columns, train_start, train_end)
+    results = [simulate_vectorized(train, target_assets, starting_capital, config, fill_model) for config in configs]
+    if key in RESULT_KEYS:
+        scores = [result[key] for result in results]
+    else:
+        days = np.unique(np.asarray(train[target_assets[0]]['timestamp']) // NS_PER_DAY)
+        scores = ledger_metrics([result['ledger'] for result in results], starting_capital,
+                                n_days=len(days))[key].to_numpy()
+    best, best_result, best_score = None, None, None
+    for config, result, score in zip(configs, results, scores):
+        if result['trades'] < min_trades:
+            continue
+        if best_result is None or (score < best_score if ascending else score > best_score):
+            best, best_result, best_score = config, result, score
+    if best is None:
+        return {'window': index, 'train_start': train_start, 'test_start': test_start, 'test_end': test_end,
+                'config': None, 'train_trades': 0, 'train_pnl': 0.0,
+                'test_trades': 0, 'test_wins': 0, 'test_losses': 0, 'test_pnl': 0.0}
+
+    test = simulate_vectorized(slice_columns(columns, test_start, test_end), target_assets, starting_capital,
+                               best, fill_model)
+    return {
+        'window': index,
+        'train_start': train_start,
+        'test_start': test_start,
+        'test_end': test_end,
+        'config': best['name'],
+        **{key: value for key, value in best.items() if key != 'name'},
+        'train_trades': best_result['trades'],
+        'train_pnl': best_result['pnl'],
+        'test_trades': test['trades'],
+        'test_wins': test['wins'],
+        'test_losses': test['losses'],
+        'test_pnl': test['pnl']
+    }
+
+
+class WalkForwardOptimizer:
+    """Walk-forward optimisation over a BacktestScalpingBot's bar history.
+
+    Indicators are computed once over the whole history and every train/test
+    window is a view into them, so overlapping windows share the work (and test
+    windows start with warmed-up indicators, as a live bot would). Each window
+    picks the config with the best `rank_by` on its train slice and is scored
+    on the following test slice starting from the bot's starting capital.
+    `rank_by` is one of RANK_KEYS; prefix it with '-' to prefer lower values
+    (max_drawdown always ranks lowest first).
+    Windows run in parallel on a process pool.
+    """
+
+    def __init__(self, bot, param_ranges=None, train_days=10, test_days=2, step_days=None, rank_by="pnl",
+                 min_trades=1, base_config=None):
+        self.bot = bot
+        # Parameters missing from the grid come from base_config, as in run_parameter_sweep
+        self.configs = expand_parameter_grid(param_ranges or DEFAULT_PARAM_RANGES,
+                                             bot.strategies[0] if base_config is None else base_config)
+        self.train_days = train_days
+        self.test_days = test_days
+        self.step_days = step_days or test_days
+        parse_rank_by(rank_by)
+        self.rank_by = rank_by
+        self.min_trades = min_trades
+
+    def run(self, processes=None):
+        """Return (per-window DataFrame, aggregate summary dict)"""
+        columns = self.bot.precompute_indicators()
+        for symbol_columns in columns.values():
+            for values in symbol_columns.values():
+                values.setflags(write=False)
+        timestamps = self.bot.bar_stream().timestamps
+        windows = walk_forward_windows(timestamps, self.train_days, self.test_days, self.step_days)
+        if not windows:
+            raise ValueError(f"Need at least {self.train_days + self.test_days} trading days of bars")
+
+        tasks = [(i, window, self.configs, self.rank_by, self.min_trades) for i, window in enumerate(windows)]
+        logging.info(f"Walk-forward: {len(windows)} windows x {len(self.configs)} configs "
+                     f"on {processes or os.cpu_count()} processes...")
+        with ProcessPoolExecutor(
+            max_workers=processes,
+            initializer=_init_sweep_worker,
+            initargs=(columns, self.bot.target_assets, self.bot.starting_capital, self.bot.fill_model)
+        ) as pool:
+            results = list(pool.map(_run_window, tasks))
+
+        report = pd.DataFrame(results)
+        for name in ('train_start', 'test_start', 'test_end'):
+            # test_end is exclusive; report the last bar inside the window instead
+            positions = report[name] - 1 if name == 'test_end' else report[name]
+            report[name] = pd.to_datetime(timestamps[positions.to_numpy()], utc=True)
+        report['test_win_rate'] = report['test_wins'] / report['test_trades'].clip(lower=1) * 100
+        return report, self.summarize(report)
+
+    def summarize(self, report):
+        traded = report[report['config'].notna()]
+        trades = int(traded['test_trades'].sum())
+        wins = int(traded['test_wins'].sum())
+        train_per_day = traded['train_pnl'].sum() / max(len(traded) * self.train_days, 1)
+        test_per_day = traded['test_pnl'].sum() / max(len(traded) * self.test_days, 1)
+        return {
+            'windows': len(report),
+            'windows_traded': len(traded),
+            'profitable_windows': int((traded['test_pnl'] > 0).sum()),
+            'test_trades': trades,
+            'test_win_rate': wins / trades * 100 if trades else 0.0,
+            'test_pnl': float(traded['test_pnl'].sum()),
+            'test_pnl_mean': float(traded['test_pnl'].mean()) if len(traded) else 0.0,
+            'test_pnl_std': float(traded['test_pnl'].std()) if len(traded) > 1 else 0.0,
+            # Out-of-sample PnL per day relative to in-sample; near 1 means the tuning generalises
+            'efficiency': float(test_per_day / train_per_day) if train_per_day else 0.0,
+            'most_chosen': traded['config'].mode().iloc[0] if len(traded) else None
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Walk-forward optimisation of the scalping strategy")
+    parser.add_argument('--data', default=".", help="folder with minute_<symbol>.csv files")
+    parser.add_argument('--bar-store', default=None, help="Core.BarStore folder (defaults to <data>/bars)")
+    parser.add_argument('--train-days', type=int, default=10)
+    parser.add_argument('--test-days', type=int, default=2)
+    parser.add_argument('--step-days', type=int, default=None)
+    parser.add_argument('--rank-by', default="pnl", help="ranking key, '-' prefix for lower is better")
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--output', default=None, help="write the per-window report to this CSV")
+    args = parser.parse_args()
+
+    bot = BacktestScalpingBot(args.data, bar_store=args.bar_store)
+    optimizer = WalkForwardOptimizer(bot, train_days=args.train_days, test_days=args.test_days,
+                                     step_days=args.step_days, rank_by=args.rank_by)
+    report, summary = optimizer.run(processes=args.processes)
+
+    print("\n=== WALK-FORWARD WINDOWS ===")
+    print(report[['window', 'test_start', 'test_end', 'config', 'train_pnl', 'test_trades', 'test_win_rate',
+                  'test_pnl']].to_string(index=False))
+    print("\n=== WALK-FORWARD SUMMARY ===")
+    for key, value in summary.items():
+        print(f"{key}: {value:.2f}" if isinstance(value, float) else f"{key}: {value}")
+    if args.output:
+        report.to_csv(args.output, index=False)
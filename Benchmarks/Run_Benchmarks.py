@@ -0,0 +1,269 @@
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(ROOT))
+sys.path.append(str(ROOT / "BackTesting"))
+sys.path.append(str(ROOT / "Code"))
+from Core.BarStore import BarStore
+from Core.Fakes import FakeTradingClient, synthetic_bars
+from Core.Indicators import IndicatorSet
+from Core.ReplayStream import ReplayDataStream
+from Multiple_BackTests import BacktestScalpingBot
+
+DATA_FOLDER = ROOT / "Data"
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+# --quick runs smaller workloads, so they are only ever compared with each other
+QUICK_BASELINE = Path(__file__).resolve().parent / "baseline_quick.json"
+SYNTHETIC_START = "2020-01-01"
+
+
+def best_of(fn, repeat):
+    """Smallest wall time of `repeat` calls to fn() and the last return value"""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def bars_in(bot):
+    return sum(len(bot.market_data[symbol]['close']) for symbol in bot.target_assets)
+
+
+def fresh(bot):
+    """Drop the bot's cached stream and indicators so each run pays for them again"""
+    bot.stream = None
+    bot.indicator_columns = None
+    return bot
+
+
+def synthetic_store(folder, symbols, years):
+    end = pd.Timestamp(SYNTHETIC_START) + pd.DateOffset(years=years)
+    store = BarStore(Path(folder) / "bars")
+    for symbol in symbols:
+        store.write(symbol, synthetic_bars(symbol, SYNTHETIC_START, end))
+    return store
+
+
+def bench_indicators(args):
+    closes = synthetic_bars("BENCH", SYNTHETIC_START, "2020-07-01")['close'].to_numpy()
+    bot = BacktestScalpingBot(DATA_FOLDER)
+    results = {}
+
+    def streaming():
+        indicators = IndicatorSet()
+        for price in closes:
+            indicators.update(price)
+            indicators.values()
+
+    seconds, _ = best_of(streaming, args.repeat)
+    results['indicators.streaming'] = {'us_per_1k_bars': seconds / len(closes) * 1e9}
+
+    bars = {'close': closes}
+    seconds, _ = best_of(lambda: bot.build_indicator_columns(bars), args.repeat)
+    results['indicators.vectorized'] = {'us_per_1k_bars': seconds / len(closes) * 1e9}
+
+    # The loop engine's reference path: rebuild each indicator from the last 100 bars on every bar
+    window = [{'close': price} for price in closes[:100]]
+    n = 1000 if args.quick else 3000
+
+    def reference():
+        for price in closes[100:100 + n]:
+            window.pop(0)
+            window.append({'close': price})
+            bot.calculate_rsi(window)
+            bot.calculate_macd(window)
+            bot.calculate_trend(window)
+
+    seconds, _ = best_of(reference, 1)
+    results['indicators.reference'] = {'us_per_1k_bars': seconds / n * 1e9}
+    return results
+
+
+def bench_backtest(args):
+    results = {}
+    bot = BacktestScalpingBot(DATA_FOLDER)
+    config = bot.strategies[0]
+    n_bars = bars_in(bot)
+    for engine in ("vectorized", "event", "loop"):
+        seconds, _ = best_of(lambda: fresh(bot).run_backtest_for_strategy(config, engine=engine), args.repeat)
+        results[f'backtest.csv.{engine}'] = {'bars': n_bars, 'seconds': seconds, 'bars_per_sec': n_bars / seconds}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = synthetic_store(tmp, bot.target_assets, args.years)
+        bot = BacktestScalpingBot(tmp, bar_store=store.root)
+        n_bars = bars_in(bot)
+        for engine in ("vectorized", "streaming", "event"):
+            seconds, _ = best_of(lambda: fresh(bot).run_backtest_for_strategy(config, engine=engine), 1)
+            results[f'backtest.synthetic_{args.years}y.{engine}'] = {
+                'bars': n_bars, 'seconds': seconds, 'bars_per_sec': n_bars / seconds
+            }
+    return results
+
+
+def bench_sweep(args):
+    bot = BacktestScalpingBot(DATA_FOLDER)
+    param_ranges = {
+        'take_profit_pct': [0.002, 0.003, 0.004, 0.005],
+        'stop_loss_pct': [0.001, 0.0015, 0.002],
+        'max_hold_minutes': [5, 10] if args.quick else [5, 8, 10, 15],
+        'rsi_buy_threshold': [30, 35],
+    }
+    bot.precompute_indicators()
+    seconds, ranked = best_of(lambda: bot.run_parameter_sweep(param_ranges, processes=args.processes), 1)
+    return {'sweep': {
+        'configs': len(ranked),
+        'seconds': seconds,
+        'ms_per_config': seconds / len(ranked) * 1e3,
+        'configs_per_sec': len(ranked) / seconds
+    }}
+
+
+def bench_on_bar(args):
+    # The live bot imports alpaca; without it only this benchmark is skipped
+    try:
+        from FinalQuantTrade import LiveScalpingBot
+    except ImportError as e:
+        print(f"on_bar skipped: {e}", file=sys.stderr)
+        return {}
+    stream = ReplayDataStream.from_csv_folder(DATA_FOLDER, fanout=args.fanout)
+    with tempfile.TemporaryDirectory() as tmp:
+        bot = LiveScalpingBot(client=FakeTradingClient(), stream=stream, symbols=stream.symbols,
+                              journal_dir=tmp, latency_metrics=True)
+        with contextlib.redirect_stdout(io.StringIO()):
+            bot.run()
+    stats = stream.stats()
+    on_bar = bot.latency.snapshot()['stages']['on_bar']['*']
+    return {'on_bar': {
+        'symbols': stats['symbols'],
+        'bars_per_sec': stats['bars_per_sec'],
+        'p50_us': on_bar['p50'] * 1e6,
+        'p99_us': on_bar['p99'] * 1e6,
+        'max_us': on_bar['max'] * 1e6
+    }}
+
+
+BENCHMARKS = {
+    'indicators': bench_indicators,
+    'backtest': bench_backtest,
+    'sweep': bench_sweep,
+    'on_bar': bench_on_bar,
+}
+
+# Metrics that describe the workload rather than how fast it ran
+NOT_TIMED = ('bars', 'configs', 'symbols')
+# Run settings that change the workloads; a baseline taken with other values is not comparable
+WORKLOAD_SETTINGS = ('quick', 'years', 'fanout')
+
+
+def higher_is_better(metric):
+    return metric.endswith('_per_sec')
+
+
+def compare(results, baseline, tolerance):
+    """Print each timed metric against the baseline; return the names that regressed beyond `tolerance`.
+
+    A benchmark whose workload (bars, configs, symbols) differs from the
+    baseline's is reported but not compared; its rates would not mean the same.
+    """
+    regressions = []
+    print(f"{'benchmark':<34} {'metric':<16} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, metrics in results.items():
+        changed = [metric for metric in NOT_TIMED
+                   if metric in metrics and metric in baseline.get(name, {}) and metrics[metric] != baseline[name][metric]]
+        if changed:
+            print(f"{name:<34} workload changed ({', '.join(changed)}); not compared, refresh the baseline")
+            continue
+        for metric, value in metrics.items():
+            if metric in NOT_TIMED:
+                continue
+            base = baseline.get(name, {}).get(metric)
+            if not base:
+                print(f"{name:<34} {metric:<16} {'-':>12} {value:>12.4g} {'new':>8}")
+                continue
+            change = value / base - 1
+            worse = -change if higher_is_better(metric) else change
+            flag = ''
+            if worse > tolerance:
+                flag = '  REGRESSION'
+                regressions.append(f"{name}.{metric}")
+            print(f"{name:<34} {metric:<16} {base:>12.4g} {value:>12.4g} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark indicators, backtests, sweeps and live bar handling")
+    parser.add_argument('--only', default=','.join(BENCHMARKS), help="comma-separated subset of " + ', '.join(BENCHMARKS))
+    parser.add_argument('--quick', action='store_true', help="smaller workloads for a fast check")
+    parser.add_argument('--repeat', type=int, default=5, help="runs per measurement, best time kept")
+    parser.add_argument('--years', type=int, default=2, help="years of synthetic bars per symbol")
+    parser.add_argument('--fanout', type=int, default=10, help="copies of each data file in the on_bar replay")
+    parser.add_argument('--processes', type=int, default=None, help="sweep worker processes")
+    parser.add_argument('--output', default=None, help="write results JSON here")
+    parser.add_argument('--baseline', default=None, help="defaults to baseline.json, or baseline_quick.json with --quick")
+    parser.add_argument('--save-baseline', action='store_true', help="store these results as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="allowed slowdown before flagging a regression")
+    args = parser.parse_args()
+    if args.quick:
+        args.repeat, args.years, args.fanout = 1, 1, 3
+
+    logging.getLogger().setLevel(logging.WARNING)
+    results = {}
+    for name in args.only.split(','):
+        started = time.perf_counter()
+        results.update(BENCHMARKS[name](args))
+        print(f"{name} done in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+    report = {
+        'meta': {
+            'taken': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'machine': platform.machine(),
+            'cpus': os.cpu_count(),
+            'quick': args.quick,
+            'years': args.years,
+            'fanout': args.fanout
+        },
+        'results': results
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+
+    baseline_path = Path(args.baseline or (QUICK_BASELINE if args.quick else BASELINE))
+    regressions = []
+    baseline = json.loads(baseline_path.read_text()) if baseline_path.exists() else None
+    mismatched = [key for key in WORKLOAD_SETTINGS
+                  if baseline is not None and baseline['meta'].get(key) != report['meta'][key]]
+    if mismatched:
+        print(f"{baseline_path} was taken with different {', '.join(mismatched)}; not comparing")
+    elif baseline is not None:
+        regressions = compare(results, baseline['results'], args.tolerance)
+    else:
+        print(json.dumps(results, indent=2))
+    if args.save_baseline:
+        baseline_path.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"Baseline saved to {baseline_path}")
+    if regressions:
+        print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
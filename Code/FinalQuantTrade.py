@@ -1,13 +1,23 @@
 import asyncio
-import numpy as np
-import pandas as pd
-from datetime import datetime, timezone
+from alpaca.data.historical import StockHistoricalDataClient
 from alpaca.data.live import StockDataStream
 from alpaca.trading.client import TradingClient
-from alpaca.trading.requests import MarketOrderRequest
-from alpaca.trading.enums import OrderSide, TimeInForce, OrderType
-import os
-import csv
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from Core.AlpacaAdapters import AsyncAlpacaBroker
+from Core.BarBuffer import to_ns
+from Core.Engine import TradingEngine
+from Core.Latency import LatencyRecorder
+from Core.Sharding import CoordinatorStrategy, ShardCoordinator
+from Core.Snapshot import fetch_missing_bars, load_snapshot, reconcile_positions, save_snapshot, snapshot_loop
+from Core.Strategy import ScalpingStrategy
+from Core.TradeLog import TradeJournal, print_event
 
 API_KEY = "Enter Your Own Key"
 SECRET_KEY = "Enter Your Own Key"
@@ -16,169 +26,169 @@ BASE_URL = "https://paper-api.alpaca.markets"
 LIVE_SYMBOLS = ['TSLA', 'AAPL', 'NVDA', 'META', 'AMZN']
 
 class LiveScalpingBot:
-    def __init__(self):
-        self.client = TradingClient(API_KEY, SECRET_KEY, paper=True)
-        self.stream = StockDataStream(API_KEY, SECRET_KEY)
-        self.data = {symbol: [] for symbol in LIVE_SYMBOLS}
-        self.open_positions = {}
-        self.csv_file = "live_trades_log.csv"
+    def __init__(self, client=None, stream=None, symbols=None, journal_dir=".", latency_metrics=False,
+                 shards=0, history=None):
+        # client/stream can be swapped for Core.Fakes.FakeTradingClient / Core.ReplayStream for offline runs
+        self.client = client or TradingClient(API_KEY, SECRET_KEY, paper=True)
+        self.stream = stream or StockDataStream(API_KEY, SECRET_KEY)
+        # Backfills the bars missed while down; replays (a custom stream) only backfill when given one
+        if history is None and stream is None:
+            history = StockHistoricalDataClient(API_KEY, SECRET_KEY)
+        self.history = history
+        self.symbols = list(symbols or LIVE_SYMBOLS)
+        self.journal_dir = journal_dir
 
         self.config = {
             "take_profit_pct": 0.0025,
             "stop_loss_pct": 0.0015,
             "max_hold_minutes": 8,
-            "rsi_buy_threshold": 35
+            "rsi_buy_threshold": 35,
+            "position_size_pct": 0.01,
+            "max_open_positions": None,                    # global cap across all symbols / shards
+            "latency_snapshot": "latency_snapshot.json",  # under journal_dir; exported every latency_export_interval s
+            "latency_export_interval": 60,
+            "latency_http_port": None,                     # e.g. 8787 to serve the snapshot over HTTP
+            "state_snapshot": "live_state.json",           # under journal_dir; read back on restart
+            "state_snapshot_interval": 30,
+            "cold_start_days": 4                           # history fetched for symbols the snapshot lacks
         }
 
-        if not os.path.exists(self.csv_file):
-            with open(self.csv_file, mode='w', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    "timestamp", "symbol", "side", "entry_price", "exit_price",
-                    "quantity", "elapsed_minutes", "pnl"
-                ])
-
-        for symbol in LIVE_SYMBOLS:
+        # Same strategy core the backtester replays; only the broker adapter differs.
+        # With shards > 0 the indicators run in worker processes and this process keeps
+        # the broker, positions and journal (see Core.Sharding)
+        self.shards = shards
+        if shards:
+            self.strategy = CoordinatorStrategy(self.config, self.symbols)
+        else:
+            self.strategy = ScalpingStrategy(self.config, self.symbols)
+        # Orders and account lookups run off the event loop; acks come back through process_acks
+        self.broker = AsyncAlpacaBroker(self.client)
+        # Per-stage / per-symbol timings of the bar-to-order path; off unless asked for
+        self.latency = LatencyRecorder() if latency_metrics else None
+        self.engine = TradingEngine(self.strategy, self.broker, latency=self.latency)
+        self.coordinator = ShardCoordinator(self.engine, self.symbols, shards, self.report) if shards else None
+        # Entries, exits and order acks, one file per session, written off the event loop
+        self.journal = TradeJournal(self.journal_dir)
+        # Bar buffers, indicators and open positions, saved periodically for warm restarts
+        self.snapshot_path = Path(self.journal_dir) / self.config['state_snapshot']
+        self.latency_path = Path(self.journal_dir) / self.config['latency_snapshot']
+        # symbol -> timestamp (ns) of its last backfilled bar; stream bars up to it are dropped
+        self.resume_after = {}
+
+        for symbol in self.symbols:
             self.stream.subscribe_bars(self.on_bar, symbol)
 
-    async def on_bar(self, bar):
-        symbol = bar.symbol
-        self.data[symbol].append({
-            'timestamp': bar.timestamp,
-            'open': bar.open,
-            'high': bar.high,
-            'low': bar.low,
-            'close': bar.close
-        })
-
-        if len(self.data[symbol]) > 100:
-            self.data[symbol].pop(0)
-
-        await self.check_entry(symbol)
-        await self.check_exit(symbol)
-
-    async def check_entry(self, symbol):
-        if symbol in self.open_positions:
-            return
-
-        price_data = self.data[symbol]
-        if len(price_data) < 50:
-            return
+    @property
+    def open_positions(self):
+        return self.strategy.positions
 
-        rsi = self.calculate_rsi(price_data)
-        macd, signal = self.calculate_macd(price_data)
-        trend = self.calculate_trend(price_data)
-
-        if None in (rsi, macd, signal, trend):
+    async def on_bar(self, bar):
+        if self.resume_after and self.backfilled(bar):
             return
-
-        latest_price = price_data[-1]['close']
-        if rsi < self.config['rsi_buy_threshold'] and macd > signal and trend == 'up':
-            direction = OrderSide.BUY
-        elif rsi > 56 and macd < signal and trend == 'down':
-            direction = OrderSide.SELL
+        if self.latency is not None:
+            self.latency.record_receive(bar)
+        if self.coordinator is not None:
+            self.report(self.coordinator.on_bar(bar))
         else:
+            self.report(self.engine.on_bar(bar))
+
+    def backfilled(self, bar):
+        last = self.resume_after.get(bar.symbol)
+        if last is None:
+            return False
+        if to_ns(bar.timestamp) <= last:
+            return True
+        del self.resume_after[bar.symbol]
+        return False
+
+    def warm_start(self):
+        """Restore the last snapshot, then fetch every bar missed since in one historical request.
+
+        Restored positions are checked against the broker first: anything closed
+        after the snapshot was taken is dropped rather than exited a second time.
+        """
+        state = load_snapshot(self.snapshot_path)
+        if state is not None:
+            if self.shards:
+                # Indicators live in the shard workers, which start cold; only positions carry over
+                state = {'positions': state.get('positions', {})}
+            if state.get('positions'):
+                positions, dropped = reconcile_positions(state['positions'], self.client.get_all_positions())
+                state = {**state, 'positions': positions}
+                if dropped:
+                    print(f"Not restoring {', '.join(dropped)}: the broker no longer holds those positions")
+            self.strategy.restore(state)
+            print(f"Restored {len(state.get('bars', {}))} symbols and {len(state.get('positions', {}))} "
+                  f"open positions from {self.snapshot_path}")
+        if self.history is None or self.shards:
             return
-
-        account = self.client.get_account()
-        buying_power = float(account.buying_power)
-        qty = round((buying_power * 0.01) / latest_price, 2)
-
-        order = MarketOrderRequest(
-            symbol=symbol,
-            qty=qty,
-            side=direction,
-            time_in_force=TimeInForce.DAY,
-            type=OrderType.MARKET
-        )
-        self.client.submit_order(order)
         now = datetime.now(timezone.utc)
-        print(f"[ENTRY] {symbol} | {direction.name} {qty} @ {latest_price:.2f} | Time: {now.strftime('%H:%M:%S')} UTC")
-        self.open_positions[symbol] = {
-            'entry_time': now,
-            'entry_price': latest_price,
-            'side': direction.name,
-            'qty': qty
-        }
-
-    async def check_exit(self, symbol):
-        if symbol not in self.open_positions:
-            return
-
-        price_data = self.data[symbol]
-        current_price = price_data[-1]['close']
-        pos = self.open_positions[symbol]
-        pnl = (current_price - pos['entry_price']) * pos['qty']
-        if pos['side'] == 'SELL':
-            pnl *= -1
-
-        tp = pos['entry_price'] * self.config['take_profit_pct'] * pos['qty']
-        sl = pos['entry_price'] * self.config['stop_loss_pct'] * pos['qty']
-        elapsed = (datetime.now(timezone.utc) - pos['entry_time']).total_seconds() / 60
-
-        if pnl >= tp or pnl <= -sl or elapsed >= self.config['max_hold_minutes']:
-            closing_side = OrderSide.SELL if pos['side'] == 'BUY' else OrderSide.BUY
-            order = MarketOrderRequest(
-                symbol=symbol,
-                qty=pos['qty'],
-                side=closing_side,
-                time_in_force=TimeInForce.DAY,
-                type=OrderType.MARKET
-            )
-            self.client.submit_order(order)
-
-            print(f"[EXIT] {symbol} | {closing_side.name} {pos['qty']} @ {current_price:.2f} | Entry: {pos['entry_price']:.2f} | "
-                  f"Elapsed: {elapsed:.1f}m | PnL: {'+' if pnl >= 0 else ''}{pnl:.2f}")
-
-            with open(self.csv_file, mode='a', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    datetime.now(timezone.utc).isoformat(),
-                    symbol,
-                    pos['side'],
-                    pos['entry_price'],
-                    current_price,
-                    pos['qty'],
-                    round(elapsed, 2),
-                    round(pnl, 2)
-                ])
-
-            del self.open_positions[symbol]
-
-    def calculate_rsi(self, price_data, period=14):
-        closes = [p['close'] for p in price_data][-period:]
-        if len(closes) < period:
-            return None
-        delta = np.diff(closes)
-        gains = delta[delta > 0].sum()
-        losses = -delta[delta < 0].sum()
-        rs = gains / losses if losses != 0 else 0
-        return 100 - (100 / (1 + rs))
-
-    def calculate_macd(self, price_data, short_period=12, long_period=26, signal_period=9):
-        closes = pd.Series([p['close'] for p in price_data])
-        if len(closes) < long_period:
-            return None, None
-        macd = closes.ewm(span=short_period).mean() - closes.ewm(span=long_period).mean()
-        signal = macd.ewm(span=signal_period).mean()
-        return macd.iloc[-1], signal.iloc[-1]
-
-    def calculate_trend(self, price_data, short_ema=20, long_ema=50):
-        closes = pd.Series([p['close'] for p in price_data])
-        if len(closes) < long_ema:
-            return None
-        ema_short = closes.ewm(span=short_ema).mean().iloc[-1]
-        ema_long = closes.ewm(span=long_ema).mean().iloc[-1]
-        if ema_short > ema_long:
-            return 'up'
-        elif ema_short < ema_long:
-            return 'down'
-        else:
-            return 'neutral'
+        cold_start = pd.Timestamp(now - timedelta(days=self.config['cold_start_days']))
+        starts = {}
+        for symbol in self.symbols:
+            buffer = self.strategy.bars.get(symbol)
+            starts[symbol] = buffer.last_timestamp() if buffer is not None and len(buffer) else cold_start
+        started = time.perf_counter()
+        missing = fetch_missing_bars(self.history, starts, now)
+        for symbol, (timestamps, columns) in missing.items():
+            if len(timestamps):
+                self.strategy.backfill(symbol, timestamps, columns)
+                self.resume_after[symbol] = int(timestamps[-1])
+        print(f"Backfilled {sum(len(timestamps) for timestamps, _ in missing.values())} bars for "
+              f"{len(self.resume_after)} symbols in {time.perf_counter() - started:.2f}s")
+
+    def report(self, events):
+        for event in events:
+            print_event(event)
+            self.journal.record(event)
+
+    def on_ack(self, ack):
+        if self.latency is not None:
+            self.latency.record('ack', ack['symbol'], ack['latency'])
+        self.journal.record(ack)
+        self.report(self.engine.on_order_ack(ack))
+
+    async def process_acks(self):
+        while True:
+            self.on_ack(await self.broker.acks.get())
+
+    async def main(self):
+        await asyncio.to_thread(self.warm_start)
+        await self.journal.start()
+        await self.broker.start()
+        if self.coordinator is not None:
+            self.coordinator.start()
+        ack_task = asyncio.create_task(self.process_acks())
+        export_task = None
+        if self.latency is not None:
+            export_task = asyncio.create_task(
+                self.latency.export_loop(self.latency_path, self.config['latency_export_interval']))
+            if self.config['latency_http_port']:
+                self.latency.serve(port=self.config['latency_http_port'])
+        snapshot_task = asyncio.create_task(
+            snapshot_loop(self.snapshot_path, self.strategy.to_dict, self.config['state_snapshot_interval']))
+        try:
+            await self.stream._run_forever()
+        finally:
+            try:
+                # Raises if a shard worker died; the shutdown below still runs
+                if self.coordinator is not None:
+                    await self.coordinator.stop()
+            finally:
+                await self.broker.close()
+                while not self.broker.acks.empty():
+                    self.on_ack(self.broker.acks.get_nowait())
+                ack_task.cancel()
+                snapshot_task.cancel()
+                save_snapshot(self.snapshot_path, self.strategy.to_dict())
+                await self.journal.close()
+                if export_task is not None:
+                    export_task.cancel()
+                    self.latency.export(self.latency_path)
 
     def run(self):
         print(" Starting live trading bot...")
-        self.stream.run()
+        asyncio.run(self.main())
 
 if __name__ == "__main__":
     bot = LiveScalpingBot()
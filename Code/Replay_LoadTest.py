@@ -0,0 +1,37 @@
+import contextlib
+import io
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from Core.Fakes import FakeTradingClient
+from Core.ReplayStream import ReplayDataStream
+from FinalQuantTrade import LiveScalpingBot
+
+DATA_FOLDER = Path(__file__).resolve().parent.parent / "Data"
+
+
+def run_load_test(fanout, speed=None, quiet=True):
+    """Drive LiveScalpingBot.on_bar from the replay stream with `fanout` copies of each data file"""
+    stream = ReplayDataStream.from_csv_folder(DATA_FOLDER, fanout=fanout, speed=speed)
+    with tempfile.TemporaryDirectory() as tmp:
+        bot = LiveScalpingBot(
+            client=FakeTradingClient(), stream=stream, symbols=stream.symbols,
+            journal_dir=tmp
+        )
+        output = io.StringIO() if quiet else sys.stdout
+        with contextlib.redirect_stdout(output):
+            bot.run()
+    return stream.stats()
+
+
+if __name__ == "__main__":
+    # Usage: python Replay_LoadTest.py [speed] [fanout ...]   (speed 0 = as fast as possible)
+    speed = float(sys.argv[1]) if len(sys.argv) > 1 else 0
+    fanouts = [int(arg) for arg in sys.argv[2:]] or [1, 10, 50, 100]
+    print(f"{'symbols':>8} {'bars':>9} {'bars/sec':>10} {'p50 lag ms':>11} {'p99 lag ms':>11} {'max lag ms':>11}")
+    for fanout in fanouts:
+        stats = run_load_test(fanout, speed or None)
+        print(f"{stats['symbols']:>8} {stats['bars']:>9} {stats['bars_per_sec']:>10.0f} "
+              f"{stats['lag_p50'] * 1000:>11.2f} {stats['lag_p99'] * 1000:>11.2f} {stats['lag_max'] * 1000:>11.2f}")
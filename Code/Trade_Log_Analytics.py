@@ -0,0 +1,38 @@
+import argparse
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from Core.JournalAnalytics import JournalAnalyzer
+
+API_KEY = "Enter Your Own Key"
+SECRET_KEY = "Enter Your Own Key"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Slippage and realised vs signal PnL from the live trade journals")
+    parser.add_argument('--journals', default=".", help="folder with live_trades_*.csv journals, or one journal file")
+    parser.add_argument('--state', default=".journal_analytics", help="where the offset index and fills cache live")
+    parser.add_argument('--offline', action='store_true', help="skip broker reconciliation")
+    parser.add_argument('--workers', type=int, default=8, help="concurrent broker order lookups")
+    args = parser.parse_args()
+
+    client = None
+    if not args.offline:
+        from alpaca.trading.client import TradingClient
+        client = TradingClient(API_KEY, SECRET_KEY, paper=True)
+
+    analyzer = JournalAnalyzer(args.journals, args.state, client=client, max_workers=args.workers)
+    new_rows = analyzer.ingest()
+    looked_up = analyzer.reconcile()
+    analyzer.save_state()
+    report = analyzer.report()
+    print(f"Parsed {new_rows} new journal rows, looked up {looked_up} orders")
+
+    with pd.option_context('display.width', 200, 'display.max_columns', None, 'display.float_format', '{:.4f}'.format):
+        print("\n=== BY SYMBOL ===")
+        print(report['by_symbol'].to_string())
+        print("\n=== BY HOUR (UTC) ===")
+        print(report['by_hour'].to_string())
@@ -1,11 +1,147 @@
 import asyncio
 import aiohttp
-import numpy as np
 import pandas as pd
-from datetime import datetime, timezone, time
 from alpaca.trading.client import TradingClient
-from alpaca.trading.requests import MarketOrderRequest
-from alpaca.trading.enums import OrderSide, TimeInForce
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from Core.AlpacaAdapters import AsyncAlpacaBroker
+from Core.Calendar import SessionCalendar
+from Core.Engine import Bar, TradingEngine
+from Core.Strategy import ScalpingStrategy
+from Core.TradeLog import print_event
+
+# Largest outputsize Twelve Data serves in one time_series request
+MAX_OUTPUTSIZE = 5000
+
+class TokenBucket:
+    """Async token bucket refilled continuously at `rate_per_minute` API credits"""
+    def __init__(self, rate_per_minute, capacity=None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or rate_per_minute
+        self.tokens = float(self.capacity)
+        self.updated = None
+        self.lock = asyncio.Lock()
+
+    def refill(self, now):
+        if self.updated is not None:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, tokens=1):
+        """Wait until `tokens` credits are available and take them"""
+        if tokens > self.capacity:
+            # The bucket never holds that many, so charging less would overrun the plan
+            raise ValueError(f"Cannot take {tokens} credits from a bucket of {self.capacity}")
+        async with self.lock:
+            loop = asyncio.get_running_loop()
+            self.refill(loop.time())
+            while self.tokens < tokens:
+                await asyncio.sleep((tokens - self.tokens) / self.rate)
+                self.refill(loop.time())
+            self.tokens -= tokens
+
+class TwelveDataClient:
+    """Shared, pooled Twelve Data client; batches symbols and stays inside the plan's credit budget"""
+    def __init__(self, api_key, base_url="https://api.twelvedata.com", credits_per_minute=8,
+                 batch_size=8, max_connections=8, timeout=20, health_ttl=300):
+        if batch_size > credits_per_minute:
+            raise ValueError(f"batch_size {batch_size} costs more credits than the {credits_per_minute} "
+                             f"available per minute")
+        self.api_key = api_key
+        self.base_url = base_url
+        self.batch_size = batch_size
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.health_ttl = health_ttl
+        self.bucket = TokenBucket(credits_per_minute)
+        self.session = None
+        self.health = None
+        self.health_checked_at = None
+
+    async def start(self):
+        if self.session is None:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=120),
+                timeout=aiohttp.ClientTimeout(total=self.timeout))
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def get(self, path, params, credits=1):
+        """Rate-limited GET on the shared session; returns the decoded JSON body"""
+        await self.start()
+        await self.bucket.acquire(credits)
+        async with self.session.get(f"{self.base_url}/{path}", params={**params, "apikey": self.api_key}) as response:
+            response.raise_for_status()
+            return await response.json()
+
+    async def time_series_batch(self, symbols, interval="1min", outputsize=2):
+        """One request for up to `batch_size` symbols (Twelve Data charges one credit per symbol)"""
+        data = await self.get("time_series", {
+            "symbol": ",".join(symbols),
+            "interval": interval,
+            "outputsize": outputsize,
+            "timezone": "UTC",
+        }, credits=len(symbols))
+        # Single-symbol requests are not keyed by symbol
+        if len(symbols) == 1:
+            data = {symbols[0]: data}
+        return {symbol: parse_values(data.get(symbol, {})) for symbol in symbols}
+
+    async def time_series(self, symbols, interval="1min", outputsize=2):
+        """Fetch bars for every symbol; batches run concurrently over the pooled connections.
+
+        `outputsize` is one size for all symbols or {symbol: size}; a batch asks
+        for the largest size among its symbols.
+        """
+        sizes = outputsize if isinstance(outputsize, dict) else dict.fromkeys(symbols, outputsize)
+        batches = [symbols[i:i + self.batch_size] for i in range(0, len(symbols), self.batch_size)]
+        results = await asyncio.gather(
+            *(self.time_series_batch(batch, interval, max(sizes[symbol] for symbol in batch))
+              for batch in batches),
+            return_exceptions=True)
+        bars = {}
+        for batch, result in zip(batches, results):
+            if isinstance(result, Exception):
+                print(f"Error fetching {','.join(batch)}: {str(result)}")
+                continue
+            bars.update(result)
+        return bars
+
+    async def is_healthy(self):
+        """API usage probe, cached for `health_ttl` seconds; costs no data credits"""
+        now = asyncio.get_running_loop().time()
+        if self.health_checked_at is not None and now - self.health_checked_at < self.health_ttl:
+            return self.health
+        try:
+            await self.start()
+            async with self.session.get(f"{self.base_url}/api_usage", params={"apikey": self.api_key}) as response:
+                body = await response.json()
+                self.health = response.status == 200 and body.get("status", "ok") == "ok"
+        except Exception:
+            self.health = False
+        self.health_checked_at = now
+        return self.health
+
+def parse_values(payload):
+    """Twelve Data `values` (newest first) -> bar dicts, oldest first, with UTC timestamps"""
+    if payload.get("status", "ok") != "ok" or "values" not in payload:
+        return []
+    bars = []
+    for value in reversed(payload["values"]):
+        bars.append({
+            'timestamp': pd.Timestamp(value['datetime'], tz='UTC'),
+            'open': float(value['open']),
+            'high': float(value['high']),
+            'low': float(value['low']),
+            'close': float(value['close']),
+            'volume': int(float(value.get('volume', 0)))
+        })
+    return bars
 
 class TwelveDataScalper:
     def __init__(self):
@@ -16,7 +152,6 @@ class TwelveDataScalper:
             paper=True
         )
         self.symbols = ["AAPL", "TSLA", "AMZN", "MSFT", "NVDA"]
-        self.data = {symbol: [] for symbol in self.symbols}
         self.open_positions = {}
         
         # Twelve Data Config
@@ -31,48 +166,60 @@ class TwelveDataScalper:
             "rsi_buy_threshold": 35,
             "position_size_pct": 0.01,
             "poll_interval": 60,
-            "market_open": time(9, 30),  # 9:30 AM
-            "market_close": time(16, 0)  # 4:00 PM
+            "credits_per_minute": 8,  # Basic plan; raise to match the subscribed plan
+            "batch_size": 8,
+            "health_ttl": 300,
+            "history_bars": 100
         }
+        # NYSE sessions with holidays and half days, precomputed in UTC
+        self.calendar = SessionCalendar()
+
+        # Shared strategy core; entries, exits and sizing match the other bots and the backtester
+        self.strategy = ScalpingStrategy(self.config, self.symbols, history_bars=self.config['history_bars'])
+        self.data = self.strategy.bars
+        self.broker = AsyncAlpacaBroker(self.client)
+        self.engine = TradingEngine(self.strategy, self.broker)
+        self.api = TwelveDataClient(
+            self.twelve_data_key, self.base_url,
+            credits_per_minute=self.config['credits_per_minute'],
+            batch_size=self.config['batch_size'],
+            health_ttl=self.config['health_ttl'])
+        self.alpaca_health = None
+        self.alpaca_checked_at = None
 
     async def check_market_open(self):
-        """Check if market is currently open"""
-        now = datetime.now(timezone.utc).astimezone()
-        
-        # Check weekday (Mon-Fri)
-        if now.weekday() >= 5:  # Saturday(5) or Sunday(6)
-            return False
-            
-        # Check time window
-        market_open = self.config['market_open']
-        market_close = self.config['market_close']
-        current_time = now.time()
-        
-        return market_open <= current_time <= market_close
+        """Check if the US market is in a regular session right now"""
+        return self.calendar.is_open()
 
     async def verify_alpaca_connection(self):
-        """Check Alpaca API connectivity"""
+        """Check Alpaca API connectivity (cached for `health_ttl` seconds)"""
+        now = asyncio.get_running_loop().time()
+        if self.alpaca_checked_at is not None and now - self.alpaca_checked_at < self.config['health_ttl']:
+            return self.alpaca_health
         try:
-            account = await self.client.get_account()
-            return account.trading_blocked is False
+            # Served by the broker gateway off the event loop; also refreshes cached buying power
+            account = await self.broker.refresh_account()
+            self.alpaca_health = account.trading_blocked is False
         except Exception:
-            return False
+            self.alpaca_health = False
+        self.alpaca_checked_at = now
+        return self.alpaca_health
 
     async def verify_twelvedata_connection(self):
-        """Check Twelve Data API connectivity"""
-        try:
-            async with aiohttp.ClientSession() as session:
-                url = f"{self.base_url}/time_series?symbol=AAPL&interval=1min&apikey={self.twelve_data_key}"
-                async with session.get(url) as response:
-                    return response.status == 200
-        except Exception:
-            return False
+        """Check Twelve Data API connectivity (cached for `health_ttl` seconds)"""
+        return await self.api.is_healthy()
 
     async def fetch_realtime_data(self):
         """Main data fetching loop with health checks"""
         while True:
-            # Verify market conditions
+            started = asyncio.get_running_loop().time()
+            # Verify market conditions; outside a session, sleep straight through to the next open
             market_open = await self.check_market_open()
+            if not market_open:
+                wait = self.calendar.seconds_until_open()
+                print(f"Market closed, sleeping until {self.calendar.next_open()}")
+                await asyncio.sleep(wait if wait is not None else 3600)
+                continue
             alpaca_connected = await self.verify_alpaca_connection()
             twelvedata_connected = await self.verify_twelvedata_connection()
             
@@ -86,49 +233,62 @@ class TwelveDataScalper:
                 await asyncio.sleep(60)
                 continue
                 
-            # Fetch data if all conditions met
-            for symbol in self.symbols:
+            # Full history on the first pass, afterwards every bar since each symbol's last one,
+            # so a failed poll is made up by the next instead of leaving a gap
+            current_minute = pd.Timestamp.now(tz='UTC').floor('min')
+            outputsize = {symbol: self.bars_needed(symbol, current_minute) for symbol in self.symbols}
+            bars = await self.api.time_series(self.symbols, outputsize=outputsize)
+
+            # The newest value is the still-forming minute; only completed bars reach the strategy
+            for symbol, symbol_bars in bars.items():
                 try:
-                    async with aiohttp.ClientSession() as session:
-                        # Get real-time price
-                        price_url = f"{self.base_url}/price?symbol={symbol}&apikey={self.twelve_data_key}"
-                        async with session.get(price_url) as price_response:
-                            price_data = await price_response.json()
-                        
-                        # Get minute bars
-                        intraday_url = f"{self.base_url}/time_series?symbol={symbol}&interval=1min&outputsize=100&apikey={self.twelve_data_key}"
-                        async with session.get(intraday_url) as intraday_response:
-                            intraday_data = await intraday_response.json()
-                        
-                        if 'price' in price_data and 'values' in intraday_data:
-                            price = float(price_data['price'])
-                            latest_bar = intraday_data['values'][0]
-                            
-                            self.data[symbol].append({
-                                'timestamp': datetime.now(timezone.utc),
-                                'open': float(latest_bar['open']),
-                                'high': float(latest_bar['high']),
-                                'low': float(latest_bar['low']),
-                                'close': price,
-                                'volume': int(latest_bar['volume'])
-                            })
-                            
-                            if len(self.data[symbol]) > 100:
-                                self.data[symbol].pop(0)
-                                
-                            await self.process_symbol(symbol)
-                            
+                    last_seen = self.data[symbol].last_timestamp()
+                    completed = [bar for bar in symbol_bars if bar['timestamp'] < current_minute and
+                                 (last_seen is None or bar['timestamp'] > last_seen)]
+                    if last_seen is None:
+                        # First response for this symbol is history: warm the indicators, place no orders
+                        self.strategy.backfill_bars([self.to_bar(symbol, bar) for bar in completed])
+                        continue
+                    for bar in completed:
+                        await self.process_symbol(symbol, bar)
                 except Exception as e:
                     print(f"Error processing {symbol}: {str(e)}")
             
-            await asyncio.sleep(self.config['poll_interval'])
+            elapsed = asyncio.get_running_loop().time() - started
+            await asyncio.sleep(max(0.0, self.config['poll_interval'] - elapsed))
+
+    def bars_needed(self, symbol, current_minute):
+        """outputsize that reaches back to `symbol`'s last bar: one per minute since, plus the forming one"""
+        last_seen = self.data[symbol].last_timestamp()
+        if last_seen is None:
+            return self.config['history_bars']
+        missed = int((current_minute - last_seen) / pd.Timedelta(minutes=1))
+        if missed + 1 > MAX_OUTPUTSIZE:
+            print(f"{symbol}: {missed} minutes since the last bar; only the latest {MAX_OUTPUTSIZE} are fetched")
+        return max(2, min(missed + 1, MAX_OUTPUTSIZE))
 
-    # ... (keep all other methods unchanged: process_symbol, check_entry, place_order, etc.)
+    def to_bar(self, symbol, latest):
+        return Bar(symbol, latest['timestamp'], latest['open'], latest['high'],
+                   latest['low'], latest['close'], latest['volume'])
+
+    async def process_symbol(self, symbol, latest):
+        """Run one new bar of `symbol` through the strategy engine (which records it in `self.data`)"""
+        for event in self.engine.on_bar(self.to_bar(symbol, latest)):
+            print_event(event)
+
+    async def process_acks(self):
+        while True:
+            ack = await self.broker.acks.get()
+            for event in self.engine.on_order_ack(ack):
+                print_event(event)
 
     async def run(self):
         """Start the trading bot with health monitoring"""
         print("Starting bot with connectivity checks...")
+        ack_task = None
         try:
+            await self.broker.start()
+            ack_task = asyncio.create_task(self.process_acks())
             # Initial connection checks
             if not await self.verify_alpaca_connection():
                 raise ConnectionError("Alpaca API connection failed")
@@ -141,6 +301,10 @@ class TwelveDataScalper:
         except Exception as e:
             print(f"Fatal error: {str(e)}")
         finally:
+            if ack_task is not None:
+                ack_task.cancel()
+            await self.api.close()
+            await self.broker.close()
             print("Bot stopped")
 
 if __name__ == "__main__":
@@ -0,0 +1,121 @@
+import asyncio
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from alpaca.trading.requests import MarketOrderRequest
+from alpaca.trading.enums import OrderSide, TimeInForce, OrderType
+
+
+class AlpacaBroker:
+    """Broker adapter that sends the engine's orders to an alpaca TradingClient"""
+
+    def __init__(self, client):
+        self.client = client
+
+    def buying_power(self):
+        return float(self.client.get_account().buying_power)
+
+    def build_order(self, symbol, qty, side, client_order_id=None):
+        return MarketOrderRequest(
+            symbol=symbol,
+            qty=qty,
+            side=OrderSide.BUY if side == 'BUY' else OrderSide.SELL,
+            time_in_force=TimeInForce.DAY,
+            type=OrderType.MARKET,
+            client_order_id=client_order_id
+        )
+
+    def submit_order(self, symbol, qty, side, price, timestamp):
+        qty = round(qty, 2)
+        if qty <= 0:
+            return None
+        submitted = self.client.submit_order(self.build_order(symbol, qty, side))
+        # Market orders are booked at the signal price; the broker's fill arrives later
+        return {'qty': qty, 'price': price, 'order_id': str(getattr(submitted, 'id', '')) or None}
+
+    def settle(self, trade):
+        pass
+
+
+class AsyncAlpacaBroker(AlpacaBroker):
+    """Non-blocking broker gateway for the live bots.
+
+    submit_order returns at once with a client order id and runs the HTTP call on
+    a thread pool, so a burst of signals across symbols goes out in parallel
+    instead of stalling the event loop one round trip at a time. Buying power is
+    served from a cache that a background task refreshes every
+    `refresh_interval` seconds and right after each acknowledgement.
+    Acknowledgements (accepted or rejected) are put on `acks` for the bot to
+    consume.
+
+    Call `await start()` inside the running event loop before the first bar and
+    `await close()` on shutdown.
+    """
+
+    def __init__(self, client, max_workers=8, refresh_interval=5.0):
+        super().__init__(client)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="broker")
+        self.refresh_interval = refresh_interval
+        self.cached_buying_power = 0.0
+        self.account = None
+        self.acks = asyncio.Queue()
+        self.pending = set()
+        # Created here, like `acks`, so acks sent before start() can still request a refresh
+        self.refresh_requested = asyncio.Event()
+        self.refresh_task = None
+
+    async def start(self):
+        await self.refresh_account()
+        self.refresh_task = asyncio.create_task(self.refresh_loop())
+
+    async def close(self):
+        if self.refresh_task is not None:
+            self.refresh_task.cancel()
+        if self.pending:
+            await asyncio.gather(*self.pending, return_exceptions=True)
+        self.executor.shutdown(wait=False)
+
+    async def refresh_account(self):
+        """Fetch the account off the event loop and update the cached buying power"""
+        try:
+            self.account = await asyncio.get_running_loop().run_in_executor(self.executor, self.client.get_account)
+            self.cached_buying_power = float(self.account.buying_power)
+        except Exception as e:
+            print(f"Error refreshing account: {e}")
+        return self.account
+
+    async def refresh_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self.refresh_requested.wait(), timeout=self.refresh_interval)
+            except asyncio.TimeoutError:
+                pass
+            self.refresh_requested.clear()
+            await self.refresh_account()
+
+    def buying_power(self):
+        return self.cached_buying_power
+
+    def submit_order(self, symbol, qty, side, price, timestamp):
+        qty = round(qty, 2)
+        if qty <= 0:
+            return None
+        client_order_id = uuid.uuid4().hex
+        order = self.build_order(symbol, qty, side, client_order_id)
+        task = asyncio.get_running_loop().create_task(self.send_order(order, symbol, side, qty, client_order_id))
+        self.pending.add(task)
+        task.add_done_callback(self.pending.discard)
+        return {'qty': qty, 'price': price, 'order_id': client_order_id}
+
+    async def send_order(self, order, symbol, side, qty, client_order_id):
+        sent = time.perf_counter()
+        ack = {'type': 'ack', 'symbol': symbol, 'side': side, 'qty': qty, 'order_id': client_order_id}
+        try:
+            submitted = await asyncio.get_running_loop().run_in_executor(self.executor, self.client.submit_order, order)
+            ack.update(status='accepted', broker_order_id=str(getattr(submitted, 'id', '')) or None)
+        except Exception as e:
+            ack.update(status='rejected', error=str(e))
+        ack['latency'] = time.perf_counter() - sent
+        await self.acks.put(ack)
+        self.refresh_requested.set()
@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+
+from Core.Lifecycle import TRADE_DTYPE
+
+NS_PER_DAY = 86_400 * 10 ** 9
+NS_PER_MINUTE = 60 * 10 ** 9
+
+EQUITY_DTYPE = np.dtype([('timestamp', np.int64), ('equity', np.float64)])
+
+HOLD_BINS = (0, 1, 2, 5, 10, 15, 30, 60, np.inf)
+
+
+def hold_minutes(ledger):
+    return (ledger['exit_time'] - ledger['entry_time']) / NS_PER_MINUTE
+
+
+def equity_curve(ledger, starting_capital):
+    """Realised equity after each trade of a TRADE_DTYPE ledger settles, in settlement order"""
+    order = np.argsort(ledger['exit_index'], kind='stable')
+    curve = np.empty(len(ledger), dtype=EQUITY_DTYPE)
+    curve['timestamp'] = ledger['exit_time'][order]
+    # Accumulate from the starting capital so each point equals the backtest's running capital exactly
+    curve['equity'] = np.cumsum(np.concatenate([[float(starting_capital)], ledger['pnl'][order]]))[1:]
+    return curve
+
+
+def symbol_breakdown(ledger, symbols):
+    """Trades, wins, PnL and hold time per symbol; `symbols` maps the ledger's symbol indices to names"""
+    index = ledger['symbol']
+    n = len(symbols)
+    trades = np.bincount(index, minlength=n)
+    wins = np.bincount(index, weights=ledger['pnl'] > 0, minlength=n)
+    pnl = np.bincount(index, weights=ledger['pnl'], minlength=n)
+    hold = np.bincount(index, weights=hold_minutes(ledger), minlength=n)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return pd.DataFrame({
+            'trades': trades,
+            'wins': wins.astype(np.int64),
+            'win_rate': np.where(trades > 0, wins / trades * 100, 0.0),
+            'pnl': pnl,
+            'avg_pnl': np.where(trades > 0, pnl / trades, 0.0),
+            'avg_hold_minutes': np.where(trades > 0, hold / trades, 0.0)
+        }, index=pd.Index(list(symbols), name='symbol'))
+
+
+def hold_time_distribution(ledger, bins=HOLD_BINS):
+    """Number of trades per hold-time bucket (minutes), as a Series indexed by bucket"""
+    counts, edges = np.histogram(hold_minutes(ledger), bins=np.asarray(bins, dtype=np.float64))
+    labels = [f"{lo:g}-{hi:g}" if np.isfinite(hi) else f"{lo:g}+" for lo, hi in zip(edges[:-1], edges[1:])]
+    return pd.Series(counts, index=pd.Index(labels, name='hold_minutes'), name='trades')
+
+
+def ledger_metrics(ledgers, starting_capital, n_days=None, periods_per_year=252):
+    """Drawdown, Sharpe, win/loss and hold-time statistics for many ledgers at once; one row per ledger.
+
+    The ledgers are concatenated and every statistic is a grouped reduction
+    over the combined arrays, so ranking thousands of sweep results costs a few
+    NumPy/pandas passes rather than a loop per config. Equity is realised
+    (marked at trade closes) from `starting_capital`. Sharpe is annualised from
+    daily realised returns over `n_days` trading days, days without a close
+    counting as flat; it defaults to the days on which any ledger closed a trade.
+    """
+    n = len(ledgers)
+    ids = np.repeat(np.arange(n), [len(ledger) for ledger in ledgers])
+    trades = np.concatenate(ledgers) if n else np.zeros(0, dtype=TRADE_DTYPE)
+    pnl = trades['pnl']
+    hold = hold_minutes(trades)
+
+    count = np.bincount(ids, minlength=n)
+    wins = np.bincount(ids, weights=pnl > 0, minlength=n)
+    gross_win = np.bincount(ids, weights=np.where(pnl > 0, pnl, 0.0), minlength=n)
+    gross_loss = -np.bincount(ids, weights=np.where(pnl < 0, pnl, 0.0), minlength=n)
+    total = np.bincount(ids, weights=pnl, minlength=n)
+
+    # Realised equity and its running peak within each ledger, in settlement order
+    order = np.lexsort((np.arange(len(trades)), trades['exit_index'], ids))
+    groups = ids[order]
+    equity = starting_capital + pd.Series(pnl[order]).groupby(groups).cumsum().to_numpy()
+    peak = np.maximum(pd.Series(equity).groupby(groups).cummax().to_numpy(), starting_capital)
+    drawdown = pd.Series((peak - equity) / peak).groupby(groups).max()
+    max_drawdown = np.zeros(n)
+    max_drawdown[drawdown.index.to_numpy()] = drawdown.to_numpy()
+
+    # Daily realised returns; days with no closes contribute zeros through n_days
+    days = trades['exit_time'] // NS_PER_DAY
+    if n_days is None:
+        n_days = len(np.unique(days))
+    daily = pd.Series(pnl / starting_capital).groupby([ids, days]).sum()
+    day_ids = daily.index.get_level_values(0).to_numpy()
+    returns = daily.to_numpy()
+    n_days = max(int(n_days), 2)
+    mean = np.bincount(day_ids, weights=returns, minlength=n) / n_days
+    variance = (np.bincount(day_ids, weights=returns ** 2, minlength=n) - n_days * mean ** 2) / (n_days - 1)
+    std = np.sqrt(np.clip(variance, 0.0, None))
+
+    median_hold = pd.Series(hold).groupby(ids).median()
+    median = np.zeros(n)
+    median[median_hold.index.to_numpy()] = median_hold.to_numpy()
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return pd.DataFrame({
+            'trades': count,
+            'wins': wins.astype(np.int64),
+            'win_rate': np.where(count > 0, wins / count * 100, 0.0),
+            'pnl': total,
+            'profit_factor': np.where(gross_loss > 0, gross_win / gross_loss, np.where(gross_win > 0, np.inf, 0.0)),
+            'avg_win': np.where(wins > 0, gross_win / wins, 0.0),
+            'avg_loss': np.where(count > wins, -gross_loss / (count - wins), 0.0),
+            'max_drawdown': max_drawdown,
+            'sharpe': np.where(std > 0, mean / std * np.sqrt(periods_per_year), 0.0),
+            'mean_hold_minutes': np.where(count > 0, np.bincount(ids, weights=hold, minlength=n) / count, 0.0),
+            'median_hold_minutes': median
+        })
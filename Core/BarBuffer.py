@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+
+BUFFER_FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+
+def to_ns(timestamp):
+    """pd.Timestamp / datetime / int -> int64 nanoseconds since the epoch (UTC)"""
+    if isinstance(timestamp, (int, np.integer)):
+        return int(timestamp)
+    if not isinstance(timestamp, pd.Timestamp):
+        timestamp = pd.Timestamp(timestamp)
+    return timestamp.value
+
+
+class BarBuffer:
+    """Fixed-size per-symbol bar history backed by preallocated NumPy arrays.
+
+    Every value is written twice, at `i` and `i + capacity`, so the most recent
+    `n` values of any column are always one contiguous slice. Appends are O(1)
+    and allocation-free; `latest()` returns read-only views, never copies.
+    """
+
+    def __init__(self, capacity=100, fields=BUFFER_FIELDS):
+        self.capacity = capacity
+        self.fields = tuple(fields)
+        self.timestamps = np.zeros(2 * capacity, dtype=np.int64)
+        self.columns = {field: np.full(2 * capacity, np.nan) for field in self.fields}
+        self.head = 0
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def append(self, timestamp, *values):
+        """Append one bar; `values` follow `fields` order, missing trailing fields become NaN"""
+        i = self.head
+        j = i + self.capacity
+        ts = to_ns(timestamp)
+        self.timestamps[i] = ts
+        self.timestamps[j] = ts
+        for k, field in enumerate(self.fields):
+            value = values[k] if k < len(values) and values[k] is not None else np.nan
+            column = self.columns[field]
+            column[i] = value
+            column[j] = value
+        self.head = (i + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    def append_bar(self, bar):
+        self.append(bar.timestamp, *(getattr(bar, field) for field in self.fields))
+
+    def extend(self, timestamps, columns):
+        """Bulk append arrays (e.g. a backfill); only the last `capacity` rows are kept"""
+        timestamps = np.asarray(timestamps)
+        if timestamps.dtype.kind == 'M':
+            timestamps = timestamps.astype('datetime64[ns]').view(np.int64)
+        n = min(len(timestamps), self.capacity)
+        if n == 0:
+            return
+        rows = (self.head + np.arange(n)) % self.capacity
+        for target, source in [(self.timestamps, timestamps)] + [
+                (self.columns[field], columns.get(field)) for field in self.fields]:
+            values = np.nan if source is None else np.asarray(source)[-n:]
+            target[rows] = values
+            target[rows + self.capacity] = values
+        self.head = (self.head + n) % self.capacity
+        self.count = min(self.capacity, self.count + n)
+
+    def window(self, n):
+        n = self.count if n is None else min(n, self.count)
+        return self.head + self.capacity - n, n
+
+    def latest(self, field='close', n=None):
+        """Read-only view of the last `n` values of `field`, oldest first"""
+        start, n = self.window(n)
+        source = self.timestamps if field == 'timestamp' else self.columns[field]
+        view = source[start:start + n]
+        view.flags.writeable = False
+        return view
+
+    def last(self, field='close'):
+        if self.count == 0:
+            return None
+        source = self.timestamps if field == 'timestamp' else self.columns[field]
+        return source[self.head + self.capacity - 1]
+
+    def last_timestamp(self):
+        """Timestamp of the newest bar as a UTC pd.Timestamp, or None when empty"""
+        if self.count == 0:
+            return None
+        return pd.Timestamp(int(self.last('timestamp')), tz='UTC')
+
+    def to_dict(self):
+        return {
+            'capacity': self.capacity,
+            'fields': list(self.fields),
+            'timestamp': self.latest('timestamp').tolist(),
+            **{field: self.latest(field).tolist() for field in self.fields}
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        buffer = cls(state['capacity'], state['fields'])
+        buffer.extend(np.array(state['timestamp'], dtype=np.int64), state)
+        return buffer
@@ -0,0 +1,192 @@
+import json
+import os
+import shutil
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BAR_FIELDS = ('open', 'high', 'low', 'close', 'volume', 'trade_count', 'vwap')
+
+
+class BarStore:
+    """Columnar on-disk store for minute bars.
+
+    Each symbol is a directory of column sets: a compacted `base-<n>` folder
+    plus any `seg-<n>` folders appended since, each holding one .npy file per
+    column, `timestamp` (int64 nanoseconds since the epoch, UTC) and BAR_FIELDS
+    as float64. `manifest.json` names the sets that make up the symbol and is
+    replaced last on every write, so a crash leaves either the old or the new
+    version, never a mix. Loads of a compacted symbol are memory-mapped, so
+    opening years of bars costs a few page faults rather than a CSV parse.
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def symbols(self):
+        if not self.root.exists():
+            return []
+        return sorted(path.name for path in self.root.iterdir() if (path / 'manifest.json').exists())
+
+    def has(self, symbol):
+        return (self.root / symbol.upper() / 'manifest.json').exists()
+
+    def manifest(self, symbol):
+        path = self.root / symbol.upper() / 'manifest.json'
+        if not path.exists():
+            return {'base': None, 'segments': [], 'next': 0}
+        with open(path) as f:
+            return json.load(f)
+
+    def load(self, symbol, fields=BAR_FIELDS):
+        """Return {column: read-only array} for `symbol`.
+
+        A compacted symbol is memory-mapped straight from its base; pending
+        segments are merged in memory until compact() folds them in.
+        """
+        folder = self.root / symbol.upper()
+        manifest = self.manifest(symbol)
+        names = ('timestamp',) + tuple(fields)
+        parts = [self.read_set(folder / name, names) for name in [manifest['base']] + manifest['segments'] if name]
+        if not parts:
+            raise FileNotFoundError(f"No bars stored for {symbol.upper()} in {self.root}")
+        if len(parts) == 1:
+            return parts[0]
+        columns = merge_columns(parts)
+        for values in columns.values():
+            values.setflags(write=False)
+        return columns
+
+    def read_set(self, folder, names):
+        columns = {name: np.load(folder / f'{name}.npy', mmap_mode='r') for name in names}
+        if any(len(values) != len(columns['timestamp']) for values in columns.values()):
+            raise ValueError(f"Column lengths differ in {folder}")
+        return columns
+
+    def load_frame(self, symbol):
+        """Load `symbol` as a DataFrame laid out like the minute_<symbol>.csv files"""
+        columns = self.load(symbol)
+        frame = pd.DataFrame({field: np.asarray(columns[field]) for field in BAR_FIELDS})
+        frame.insert(0, 'timestamp', pd.to_datetime(np.asarray(columns['timestamp']), unit='ns', utc=True))
+        frame.insert(0, 'symbol', symbol.upper())
+        return frame
+
+    def write(self, symbol, columns):
+        """Replace `symbol` with `columns` (a bar DataFrame or a dict of column arrays)"""
+        if isinstance(columns, pd.DataFrame):
+            columns = frame_to_columns(columns)
+        manifest = self.manifest(symbol)
+        base = self.write_set(symbol, 'base', manifest, columns)
+        self.commit(symbol, {'base': base, 'segments': [], 'next': manifest['next']})
+
+    def append(self, symbol, columns):
+        """Add new bars to `symbol` as a segment; where timestamps repeat, the newest bars win.
+
+        Only the new bars are written, so appending chunk after chunk stays
+        linear in the data downloaded. Call compact() once done appending.
+        """
+        if isinstance(columns, pd.DataFrame):
+            columns = frame_to_columns(columns)
+        if len(columns['timestamp']) == 0:
+            return
+        manifest = self.manifest(symbol)
+        segment = self.write_set(symbol, 'seg', manifest, merge_columns([columns]))
+        manifest['segments'] = manifest['segments'] + [segment]
+        self.commit(symbol, manifest)
+
+    def compact(self, symbol):
+        """Fold pending segments into a new sorted, de-duplicated base so loads are memory-mapped again"""
+        if self.has(symbol) and self.manifest(symbol)['segments']:
+            self.write(symbol, self.load(symbol))
+
+    def write_set(self, symbol, kind, manifest, columns):
+        """Write every column into a fresh, not yet referenced folder and return its name"""
+        name = f"{kind}-{manifest['next']:06d}"
+        manifest['next'] += 1
+        folder = self.root / symbol.upper() / name
+        # Left over from a write that crashed before its commit
+        shutil.rmtree(folder, ignore_errors=True)
+        folder.mkdir(parents=True)
+        for column in ('timestamp',) + BAR_FIELDS:
+            dtype = np.int64 if column == 'timestamp' else np.float64
+            with open(folder / f'{column}.npy', 'wb') as f:
+                np.save(f, np.ascontiguousarray(columns[column], dtype=dtype))
+                f.flush()
+                os.fsync(f.fileno())
+        return name
+
+    def commit(self, symbol, manifest):
+        """Swap in the new manifest (the single atomic step of a write), then drop unreferenced sets"""
+        folder = self.root / symbol.upper()
+        with open(folder / 'manifest.json.tmp', 'w') as f:
+            json.dump(manifest, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(folder / 'manifest.json.tmp', folder / 'manifest.json')
+        live = {manifest['base'], *manifest['segments']}
+        for path in folder.iterdir():
+            if path.is_dir() and path.name not in live:
+                # Still memory-mapped by a reader on some platforms; the next commit retries
+                shutil.rmtree(path, ignore_errors=True)
+
+    def coverage(self, symbol):
+        """Return the [start_ns, end_ns) ranges already downloaded for `symbol`"""
+        path = self.root / symbol.upper() / 'coverage.json'
+        if not path.exists():
+            return []
+        with open(path) as f:
+            return [tuple(interval) for interval in json.load(f)]
+
+    def mark_covered(self, symbol, start_ns, end_ns):
+        """Record that [start_ns, end_ns) has been fetched, merging overlapping ranges"""
+        intervals = sorted(self.coverage(symbol) + [(start_ns, end_ns)])
+        merged = [list(intervals[0])]
+        for start, end in intervals[1:]:
+            if start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        folder = self.root / symbol.upper()
+        folder.mkdir(parents=True, exist_ok=True)
+        with open(folder / 'coverage.json.tmp', 'w') as f:
+            json.dump(merged, f)
+        os.replace(folder / 'coverage.json.tmp', folder / 'coverage.json')
+
+
+def merge_columns(parts):
+    """Concatenate column dicts, sort by timestamp and keep the last occurrence of each timestamp"""
+    columns = {name: np.concatenate([np.asarray(part[name]) for part in parts]) for name in parts[0]}
+    timestamps = columns['timestamp']
+    order = np.argsort(timestamps, kind='stable')
+    last = np.ones(len(order), dtype=bool)
+    last[:-1] = timestamps[order][1:] != timestamps[order][:-1]
+    keep = order[last]
+    return {name: values[keep] for name, values in columns.items()}
+
+
+def frame_to_columns(frame):
+    """Convert a bar DataFrame with a 'timestamp' column into {column: array}"""
+    timestamps = pd.to_datetime(frame['timestamp'], utc=True)
+    columns = {'timestamp': timestamps.to_numpy(dtype='datetime64[ns]').view(np.int64)}
+    for field in BAR_FIELDS:
+        columns[field] = frame[field].to_numpy(dtype=np.float64)
+    return columns
+
+
+def convert_csv_folder(data_folder, store):
+    """Convert every minute_<symbol>.csv in `data_folder` into `store`"""
+    converted = []
+    for path in sorted(Path(data_folder).glob('minute_*.csv')):
+        symbol = path.stem.split('_', 1)[1].upper()
+        store.write(symbol, pd.read_csv(path, parse_dates=['timestamp']))
+        converted.append(symbol)
+        print(f"Converted: {path.name} -> {store.root / symbol}")
+    return converted
+
+
+if __name__ == "__main__":
+    data_folder = sys.argv[1] if len(sys.argv) > 1 else "Data"
+    store_folder = sys.argv[2] if len(sys.argv) > 2 else Path(data_folder) / "bars"
+    convert_csv_folder(data_folder, BarStore(store_folder))
@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+
+
+class BarStream:
+    """Time-aligned minute bars for several symbols, stored as contiguous arrays.
+
+    Every symbol shares one sorted timestamp axis (the union of all bar times).
+    `present[row, t]` says whether the symbol printed a bar at that minute and
+    `positions[row, t]` points back to the row in the symbol's own frame (-1 when
+    missing). Missing minutes are either left as NaN (missing="skip") or carry the
+    last close forward as a flat bar with zero volume (missing="ffill"); entries should only be
+    taken where `present` is True either way.
+    """
+
+    def __init__(self, symbols, timestamps, columns, present, positions, missing="skip"):
+        self.symbols = list(symbols)
+        self.rows = {symbol: row for row, symbol in enumerate(self.symbols)}
+        self.timestamps = timestamps
+        self.index = pd.DatetimeIndex(timestamps.view('datetime64[ns]'), tz='UTC')
+        self.columns = columns
+        self.present = present
+        self.positions = positions
+        self.missing = missing
+
+    @classmethod
+    def from_frames(cls, frames, fields=('open', 'high', 'low', 'close', 'volume'), missing="skip"):
+        """Build the stream once from {symbol: DataFrame with a 'timestamp' column}"""
+        columns = {}
+        for symbol, frame in frames.items():
+            columns[symbol] = {field: frame[field].to_numpy(dtype=np.float64) for field in fields}
+            columns[symbol]['timestamp'] = frame['timestamp'].to_numpy(dtype='datetime64[ns]').view(np.int64)
+        return cls.from_columns(columns, fields, missing)
+
+    @classmethod
+    def from_columns(cls, bars, fields=('open', 'high', 'low', 'close', 'volume'), missing="skip"):
+        """Build the stream once from {symbol: {column: array}} with int64 nanosecond timestamps"""
+        if missing not in ("skip", "ffill"):
+            raise ValueError(f"Unknown missing-bar policy: {missing}")
+        symbols = list(bars)
+        times = {symbol: np.asarray(bars[symbol]['timestamp'], dtype=np.int64) for symbol in symbols}
+        timestamps = np.unique(np.concatenate([times[symbol] for symbol in symbols]))
+
+        n_symbols, n_times = len(symbols), len(timestamps)
+        present = np.zeros((n_symbols, n_times), dtype=bool)
+        positions = np.full((n_symbols, n_times), -1, dtype=np.int64)
+        columns = {field: np.full((n_symbols, n_times), np.nan) for field in fields}
+
+        for row, symbol in enumerate(symbols):
+            slots = np.searchsorted(timestamps, times[symbol])
+            present[row, slots] = True
+            positions[row, slots] = np.arange(len(slots))
+            for field in fields:
+                columns[field][row, slots] = bars[symbol][field]
+
+        stream = cls(symbols, timestamps, columns, present, positions, missing)
+        if missing == "ffill":
+            # A missing minute becomes a flat bar at the last close with no volume
+            last_close = stream.forward_fill(columns['close'])
+            for field in fields:
+                if field == 'volume':
+                    columns[field][~present] = 0.0
+                elif field in ('open', 'high', 'low', 'close'):
+                    columns[field] = np.where(present, columns[field], last_close)
+        return stream
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def forward_fill(self, values):
+        """Carry each row's last present value across missing minutes"""
+        last_seen = np.where(self.present, np.arange(len(self))[None, :], 0)
+        np.maximum.accumulate(last_seen, axis=1, out=last_seen)
+        filled = np.take_along_axis(values, last_seen, axis=1)
+        seen = np.maximum.accumulate(self.present, axis=1)
+        return np.where(seen, filled, np.nan)
+
+    def column(self, symbol, field):
+        return self.columns[field][self.rows[symbol]]
+
+    def align(self, symbol, values, fill_value=np.nan):
+        """Scatter a per-bar array of `symbol` onto the shared timestamp axis"""
+        row = self.rows[symbol]
+        aligned = np.full(len(self), fill_value, dtype=np.result_type(values, np.asarray(fill_value)))
+        aligned[self.present[row]] = values
+        return aligned
+
+    def bars_at(self, t):
+        """Yield (symbol, bar dict) for every symbol that printed at step `t`"""
+        timestamp = self.index[t]
+        for row, symbol in enumerate(self.symbols):
+            if self.present[row, t]:
+                bar = {field: values[row, t] for field, values in self.columns.items()}
+                bar['timestamp'] = timestamp
+                yield symbol, bar
@@ -0,0 +1,340 @@
+from datetime import date, time, timedelta
+
+import numpy as np
+import pandas as pd
+
+
+def easter(year):
+    """Gregorian Easter Sunday (anonymous Gregorian algorithm)"""
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = b // 4, b % 4
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month = (h + l - 7 * m + 114) // 31
+    day = (h + l - 7 * m + 114) % 31 + 1
+    return date(year, month, day)
+
+
+def nth_weekday(year, month, weekday, n):
+    """n-th `weekday` (Mon=0) of a month; n=-1 for the last one"""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def observed(day):
+    """US rule: a Saturday holiday is observed on Friday, a Sunday one on Monday"""
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+
+def weekdays_from(day, n=1):
+    """The first `n` weekdays on or after `day`; the UK and Canadian rule for weekend holidays"""
+    days = []
+    while len(days) < n:
+        if day.weekday() < 5:
+            days.append(day)
+        day += timedelta(days=1)
+    return days
+
+
+def sunday_substitutes(holidays):
+    """Add a substitute for every holiday on a Sunday: the next day that is not already a holiday"""
+    holidays = set(holidays)
+    for day in sorted(holidays):
+        if day.weekday() == 6:
+            substitute = day + timedelta(days=1)
+            while substitute in holidays:
+                substitute += timedelta(days=1)
+            holidays.add(substitute)
+    return holidays
+
+
+# One-off NYSE closures (weather, national days of mourning)
+US_SPECIAL_CLOSURES = {
+    date(2012, 10, 29), date(2012, 10, 30), date(2018, 12, 5), date(2025, 1, 9)
+}
+
+
+def us_holidays(year):
+    """NYSE full-day holidays in `year`"""
+    holidays = {
+        nth_weekday(year, 1, 0, 3),           # Martin Luther King Jr. Day
+        nth_weekday(year, 2, 0, 3),           # Washington's Birthday
+        easter(year) - timedelta(days=2),     # Good Friday
+        nth_weekday(year, 5, 0, -1),          # Memorial Day
+        observed(date(year, 7, 4)),           # Independence Day
+        nth_weekday(year, 9, 0, 1),           # Labor Day
+        nth_weekday(year, 11, 3, 4),          # Thanksgiving
+        observed(date(year, 12, 25)),         # Christmas
+    }
+    # New Year's Day on a Saturday is not observed on the Friday before
+    if date(year, 1, 1).weekday() != 5:
+        holidays.add(observed(date(year, 1, 1)))
+    if year >= 2022:
+        holidays.add(observed(date(year, 6, 19)))  # Juneteenth
+    holidays.update(day for day in US_SPECIAL_CLOSURES if day.year == year)
+    return holidays
+
+
+def us_early_closes(year):
+    """NYSE 13:00 ET half days in `year`"""
+    early = {nth_weekday(year, 11, 3, 4) + timedelta(days=1)}  # Day after Thanksgiving
+    for day in (date(year, 7, 3), date(year, 12, 24)):
+        if day.weekday() < 4:  # Mon-Thu; on a Friday it is the observed holiday itself
+            early.add(day)
+    return early
+
+
+def tsx_holidays(year):
+    """TSX full-day holidays in `year`"""
+    return {
+        *weekdays_from(date(year, 1, 1)),                    # New Year's Day
+        nth_weekday(year, 2, 0, 3),                          # Family Day
+        easter(year) - timedelta(days=2),                    # Good Friday
+        date(year, 5, 24) - timedelta(days=date(year, 5, 24).weekday()),  # Victoria Day: Monday before May 25
+        *weekdays_from(date(year, 7, 1)),                    # Canada Day
+        nth_weekday(year, 8, 0, 1),                          # Civic Holiday
+        nth_weekday(year, 9, 0, 1),                          # Labour Day
+        nth_weekday(year, 10, 0, 2),                         # Thanksgiving
+        *weekdays_from(date(year, 12, 25), 2),               # Christmas and Boxing Day
+    }
+
+
+def tsx_early_closes(year):
+    """TSX 13:00 ET close on Christmas Eve"""
+    return {day for day in (date(year, 12, 24),) if day.weekday() < 5}
+
+
+# Bank holidays moved or added for one year: {year: (dates no longer holidays, dates added)}
+UK_SPECIAL_HOLIDAYS = {
+    2011: (set(), {date(2011, 4, 29)}),                                    # Royal wedding
+    2012: ({date(2012, 5, 28)}, {date(2012, 6, 4), date(2012, 6, 5)}),     # Diamond Jubilee
+    2020: ({date(2020, 5, 4)}, {date(2020, 5, 8)}),                        # VE Day
+    2022: ({date(2022, 5, 30)}, {date(2022, 6, 2), date(2022, 6, 3),       # Platinum Jubilee
+                                 date(2022, 9, 19)}),                      # State funeral
+    2023: (set(), {date(2023, 5, 8)}),                                     # Coronation
+}
+
+
+def lse_holidays(year):
+    """LSE full-day holidays (England and Wales bank holidays) in `year`"""
+    good_friday = easter(year) - timedelta(days=2)
+    holidays = {
+        *weekdays_from(date(year, 1, 1)),                    # New Year's Day
+        good_friday,
+        good_friday + timedelta(days=3),                     # Easter Monday
+        nth_weekday(year, 5, 0, 1),                          # Early May bank holiday
+        nth_weekday(year, 5, 0, -1),                         # Spring bank holiday
+        nth_weekday(year, 8, 0, -1),                         # Summer bank holiday
+        *weekdays_from(date(year, 12, 25), 2),               # Christmas and Boxing Day
+    }
+    removed, added = UK_SPECIAL_HOLIDAYS.get(year, (set(), set()))
+    return (holidays - removed) | added
+
+
+def lse_early_closes(year):
+    """LSE 12:30 closes on Christmas Eve and New Year's Eve"""
+    return {day for day in (date(year, 12, 24), date(year, 12, 31)) if day.weekday() < 5}
+
+
+def xetra_holidays(year):
+    """Frankfurt (Xetra) trading holidays in `year`; weekend holidays are not moved"""
+    good_friday = easter(year) - timedelta(days=2)
+    return {date(year, 1, 1), good_friday, good_friday + timedelta(days=3), date(year, 5, 1),
+            date(year, 12, 24), date(year, 12, 25), date(year, 12, 26), date(year, 12, 31)}
+
+
+def equinox(year, base):
+    """Japanese equinox day from the usual approximation, valid 1980-2099"""
+    return int(base + 0.242194 * (year - 1980) - (year - 1980) // 4)
+
+
+# Holidays moved for the Tokyo Olympics: {year: (Marine Day, Sports Day, Mountain Day)}
+JAPAN_OLYMPIC_HOLIDAYS = {
+    2020: (date(2020, 7, 23), date(2020, 7, 24), date(2020, 8, 10)),
+    2021: (date(2021, 7, 22), date(2021, 7, 23), date(2021, 8, 9)),
+}
+# Imperial succession holidays
+JAPAN_SPECIAL_HOLIDAYS = {date(2019, 4, 30), date(2019, 5, 1), date(2019, 5, 2), date(2019, 10, 22)}
+
+
+def japan_holidays(year):
+    """TSE closures in `year`: national holidays (with Sunday substitutes and days sandwiched
+    between two holidays) plus the Jan 1-3 and Dec 31 exchange break"""
+    marine, sports, mountain = JAPAN_OLYMPIC_HOLIDAYS.get(
+        year, (nth_weekday(year, 7, 0, 3), nth_weekday(year, 10, 0, 2), date(year, 8, 11)))
+    national = {
+        date(year, 1, 1),
+        nth_weekday(year, 1, 0, 2),                          # Coming of Age Day
+        date(year, 2, 11),                                   # National Foundation Day
+        date(year, 3, equinox(year, 20.8431)),               # Vernal Equinox Day
+        date(year, 4, 29),                                   # Showa Day
+        date(year, 5, 3), date(year, 5, 4), date(year, 5, 5),  # Golden Week
+        marine,
+        nth_weekday(year, 9, 0, 3),                          # Respect for the Aged Day
+        date(year, 9, equinox(year, 23.2488)),               # Autumnal Equinox Day
+        sports,
+        date(year, 11, 3),                                   # Culture Day
+        date(year, 11, 23),                                  # Labour Thanksgiving Day
+    }
+    if year >= 2016:
+        national.add(mountain)
+    if year >= 2020:
+        national.add(date(year, 2, 23))                      # Emperor's Birthday
+    elif year <= 2018:
+        national.add(date(year, 12, 23))
+    national |= {day for day in JAPAN_SPECIAL_HOLIDAYS if day.year == year}
+    national = sunday_substitutes(national)
+    for day in sorted(national):
+        between = day + timedelta(days=1)
+        if between + timedelta(days=1) in national and between not in national and between.weekday() < 6:
+            national.add(between)                            # Citizens' holiday
+    return national | {date(year, 1, 2), date(year, 1, 3), date(year, 12, 31)}
+
+
+def hkex_holidays(year):
+    """HKEX holidays on the Gregorian calendar only; the lunar ones (Lunar New Year, Ching Ming,
+    Buddha's Birthday, Tuen Ng, Mid-Autumn, Chung Yeung) are not modelled"""
+    good_friday = easter(year) - timedelta(days=2)
+    return sunday_substitutes({
+        date(year, 1, 1), good_friday, good_friday + timedelta(days=1), good_friday + timedelta(days=3),
+        date(year, 5, 1), date(year, 7, 1), date(year, 10, 1), date(year, 12, 25), date(year, 12, 26),
+    })
+
+
+def hkex_early_closes(year):
+    """HKEX 12:00 closes on Christmas Eve and New Year's Eve (Lunar New Year's Eve is not modelled)"""
+    return {day for day in (date(year, 12, 24), date(year, 12, 31)) if day.weekday() < 5}
+
+
+def sse_holidays(year):
+    """SSE statutory Gregorian holidays only. The lunar holidays and the week-long closures
+    around them are set by yearly State Council notices and are not modelled"""
+    return {date(year, 1, 1), date(year, 5, 1), date(year, 10, 1), date(year, 10, 2), date(year, 10, 3)}
+
+
+def no_holidays(year):
+    return set()
+
+
+# "holidays_complete": False marks exchanges whose lunar-calendar holidays are not modelled;
+# their calendars will show sessions on some days the exchange is actually closed
+EXCHANGES = {
+    # Americas
+    "NYSE/NASDAQ (US)": {"timezone": "America/New_York", "open": time(9, 30), "close": time(16, 0),
+                         "holidays": us_holidays, "early_closes": us_early_closes, "early_close": time(13, 0)},
+    "Toronto (TSX)": {"timezone": "America/Toronto", "open": time(9, 30), "close": time(16, 0),
+                      "holidays": tsx_holidays, "early_closes": tsx_early_closes, "early_close": time(13, 0)},
+    # Europe
+    "London (LSE)": {"timezone": "Europe/London", "open": time(8, 0), "close": time(16, 30),
+                     "holidays": lse_holidays, "early_closes": lse_early_closes, "early_close": time(12, 30)},
+    "Frankfurt (FWB)": {"timezone": "Europe/Berlin", "open": time(8, 0), "close": time(20, 0),  # Extended hours
+                        "holidays": xetra_holidays},
+    # Asia
+    "Tokyo (TSE)": {"timezone": "Asia/Tokyo", "open": time(9, 0), "close": time(15, 0),
+                    "holidays": japan_holidays},
+    "Hong Kong (HKEX)": {"timezone": "Asia/Hong_Kong", "open": time(9, 30), "close": time(16, 0),
+                         "holidays": hkex_holidays, "early_closes": hkex_early_closes, "early_close": time(12, 0),
+                         "holidays_complete": False},
+    "Shanghai (SSE)": {"timezone": "Asia/Shanghai", "open": time(9, 30), "close": time(15, 0),
+                       "holidays": sse_holidays, "holidays_complete": False},
+}
+
+US_EXCHANGE = "NYSE/NASDAQ (US)"
+
+
+class SessionCalendar:
+    """Regular trading sessions of one exchange, precomputed as sorted UTC open/close instants.
+
+    Built once for a date range (holidays removed, half days closing early),
+    after which every question is a binary search over two int64 arrays.
+    Times are UTC nanoseconds internally; methods accept anything pd.Timestamp
+    does and default to now. `holidays_complete` is False for exchanges whose
+    holiday rules are only partly modelled (see EXCHANGES).
+    """
+
+    def __init__(self, exchange=US_EXCHANGE, start=None, end=None):
+        details = EXCHANGES[exchange]
+        today = pd.Timestamp.now(tz='UTC').normalize().tz_localize(None)
+        start = pd.Timestamp(start) if start is not None else today - pd.DateOffset(years=1)
+        end = pd.Timestamp(end) if end is not None else today + pd.DateOffset(years=2)
+        self.exchange = exchange
+        self.timezone = details["timezone"]
+        self.holidays_complete = details.get("holidays_complete", True)
+
+        days = pd.bdate_range(start.normalize(), end.normalize())
+        holidays, early = set(), set()
+        # A range without business days leaves empty arrays: never open, no next session
+        for year in range(start.year, end.year + 1):
+            holidays |= details["holidays"](year)
+            early |= details.get("early_closes", no_holidays)(year)
+        day_dates = days.date
+        days = days[~np.isin(day_dates, list(holidays))]
+        is_early = np.isin(days.date, list(early))
+
+        open_offset = pd.Timedelta(hours=details["open"].hour, minutes=details["open"].minute)
+        close_offset = pd.Timedelta(hours=details["close"].hour, minutes=details["close"].minute)
+        closes_local = days + close_offset
+        if is_early.any():
+            early_close = details["early_close"]
+            early_offset = pd.Timedelta(hours=early_close.hour, minutes=early_close.minute)
+            closes_local = closes_local.where(~is_early, days + early_offset)
+        self.opens = self.to_utc_ns(days + open_offset)
+        self.closes = self.to_utc_ns(closes_local)
+
+    def to_utc_ns(self, local):
+        return local.tz_localize(self.timezone).tz_convert('UTC').as_unit('ns').asi8
+
+    @staticmethod
+    def ns(when=None):
+        when = pd.Timestamp.now(tz='UTC') if when is None else pd.Timestamp(when)
+        if when.tzinfo is None:
+            when = when.tz_localize('UTC')
+        return when.value
+
+    def session_index(self, t):
+        """Index of the last session opening at or before `t` (ns), or -1"""
+        return int(np.searchsorted(self.opens, t, side='right')) - 1
+
+    def is_open(self, when=None):
+        t = self.ns(when)
+        i = self.session_index(t)
+        return i >= 0 and t < self.closes[i]
+
+    def next_open(self, when=None):
+        """Start of the first session opening after `when`, or None past the calendar's range"""
+        i = int(np.searchsorted(self.opens, self.ns(when), side='right'))
+        return pd.Timestamp(int(self.opens[i]), tz='UTC') if i < len(self.opens) else None
+
+    def seconds_until_open(self, when=None):
+        """0 while a session is open, else seconds until the next one starts"""
+        if self.is_open(when):
+            return 0.0
+        upcoming = self.next_open(when)
+        return None if upcoming is None else (upcoming.value - self.ns(when)) / 1e9
+
+    def seconds_until_close(self, when=None):
+        """Seconds left in the current session, or None when closed"""
+        t = self.ns(when)
+        i = self.session_index(t)
+        if i < 0 or t >= self.closes[i]:
+            return None
+        return (self.closes[i] - t) / 1e9
+
+    def session_mask(self, timestamps):
+        """Boolean mask of int64 ns UTC `timestamps` that fall inside a regular session"""
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        i = np.searchsorted(self.opens, timestamps, side='right') - 1
+        inside = i >= 0
+        inside[inside] = timestamps[inside] < self.closes[i[inside]]
+        return inside
@@ -0,0 +1,221 @@
+import itertools
+import time
+
+
+class Bar:
+    """Minimal bar with the same attributes the bots read from alpaca's Bar"""
+
+    __slots__ = ('symbol', 'timestamp', 'open', 'high', 'low', 'close', 'volume', 'trade_count', 'vwap')
+
+    def __init__(self, symbol, timestamp, open, high, low, close, volume=0.0, trade_count=None, vwap=None):
+        self.symbol = symbol
+        self.timestamp = timestamp
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+        self.trade_count = trade_count
+        self.vwap = vwap
+
+
+def bar_from_row(symbol, timestamp, row):
+    """Build a Bar from a yfinance / Twelve Data style row with Open/High/Low/Close keys"""
+    return Bar(
+        symbol, timestamp,
+        float(row['Open']), float(row['High']), float(row['Low']), float(row['Close']),
+        float(row.get('Volume', 0.0))
+    )
+
+
+class TradingEngine:
+    """Event loop core: feeds bars to a strategy and routes its decisions to a broker.
+
+    The same engine runs historical replays (SimulatedBroker) and the live bots
+    (AlpacaBroker). Each call returns the entry/exit events it produced so the
+    caller can log or report them.
+    """
+
+    def __init__(self, strategy, broker, latency=None):
+        self.strategy = strategy
+        self.broker = broker
+        self.latency = None
+        self.set_latency(latency)
+        # exit order id -> trade it closed, until the broker acknowledges the order
+        self.pending_exits = {}
+
+    def set_latency(self, latency):
+        """Attach (or with None, detach) a Core.Latency.LatencyRecorder to the engine and strategy"""
+        self.latency = latency
+        self.strategy.latency = latency
+
+    def on_bar(self, bar):
+        """Handle one bar as it arrives: update, then entry and exit checks for its symbol"""
+        if self.latency is not None:
+            started = time.perf_counter()
+        self.strategy.update(bar)
+        events = []
+        self.check_entry(bar, events)
+        self.check_exit(bar, events)
+        if self.latency is not None:
+            self.latency.record('on_bar', bar.symbol, time.perf_counter() - started)
+        return events
+
+    def on_bars(self, bars, marks=()):
+        """Handle all bars of one timestamp: updates, then every entry, then every exit.
+
+        `marks` are forward-filled bars for symbols that did not print at this
+        timestamp; they only check exits of open positions, never update
+        indicators or enter.
+        """
+        events = []
+        by_symbol = {}
+        for bar in bars:
+            self.strategy.update(bar)
+            by_symbol[bar.symbol] = bar
+        for bar in bars:
+            self.check_entry(bar, events)
+        for bar in marks:
+            by_symbol.setdefault(bar.symbol, bar)
+        for symbol in list(self.strategy.positions):
+            if symbol in by_symbol:
+                self.check_exit(by_symbol[symbol], events)
+        return events
+
+    def on_order_ack(self, ack):
+        """Handle a broker acknowledgement.
+
+        A rejected entry drops the position it opened. A rejected exit puts the
+        closed position back (the broker still holds it), so the next bar of the
+        symbol checks the exit again and resubmits it.
+        """
+        trade = self.pending_exits.pop(ack['order_id'], None)
+        if ack['status'] != 'rejected':
+            return []
+        symbol = ack['symbol']
+        if trade is not None:
+            restored = symbol not in self.strategy.positions
+            if restored:
+                self.strategy.open_position(symbol, trade['side'], trade['entry_price'], trade['qty'],
+                                            trade['entry_time'], trade['entry_order_id'])
+            return [{'type': 'exit_rejected', 'symbol': symbol, 'side': trade['side'], 'qty': trade['qty'],
+                     'order_id': trade['entry_order_id'], 'exit_order_id': ack['order_id'],
+                     'restored': restored, 'error': ack.get('error')}]
+        pos = self.strategy.positions.get(symbol)
+        if pos is not None and pos['order_id'] == ack['order_id']:
+            del self.strategy.positions[symbol]
+            return [{'type': 'entry_rejected', 'symbol': symbol, 'order_id': ack['order_id'],
+                     'error': ack.get('error')}]
+        return []
+
+    def check_entry(self, bar, events):
+        latency = self.latency
+        if latency is not None:
+            started = time.perf_counter()
+        side = self.strategy.entry_signal(bar.symbol)
+        if latency is not None:
+            latency.record('signal', bar.symbol, time.perf_counter() - started)
+        if side is None:
+            return
+        qty = self.strategy.position_size(self.broker.buying_power(), bar.close)
+        fill = self.submit_order(bar.symbol, qty, side, bar.close, bar.timestamp)
+        if fill is None:
+            return
+        self.strategy.open_position(bar.symbol, side, fill['price'], fill['qty'], bar.timestamp, fill['order_id'])
+        events.append({
+            'type': 'entry',
+            'symbol': bar.symbol,
+            'side': side,
+            'price': fill['price'],
+            'qty': fill['qty'],
+            'timestamp': bar.timestamp,
+            'order_id': fill['order_id']
+        })
+
+    def check_exit(self, bar, events):
+        latency = self.latency
+        if latency is not None:
+            started = time.perf_counter()
+        reason = self.strategy.exit_signal(bar.symbol, bar.close, bar.timestamp)
+        if latency is not None:
+            latency.record('signal', bar.symbol, time.perf_counter() - started)
+        if reason is None:
+            return
+        pos = self.strategy.positions[bar.symbol]
+        closing_side = 'SELL' if pos['side'] == 'BUY' else 'BUY'
+        fill = self.submit_order(bar.symbol, pos['qty'], closing_side, bar.close, bar.timestamp)
+        if fill is None:
+            return
+        trade = self.strategy.close_position(bar.symbol, fill['price'], bar.timestamp, reason, fill['order_id'])
+        self.broker.settle(trade)
+        # Only brokers that acknowledge asynchronously (AsyncAlpacaBroker) can still reject it
+        if hasattr(self.broker, 'acks'):
+            self.pending_exits[fill['order_id']] = trade
+        trade['type'] = 'exit'
+        events.append(trade)
+
+    def submit_order(self, symbol, qty, side, price, timestamp):
+        if self.latency is None:
+            return self.broker.submit_order(symbol, qty, side, price, timestamp)
+        started = time.perf_counter()
+        fill = self.broker.submit_order(symbol, qty, side, price, timestamp)
+        self.latency.record('order_submit', symbol, time.perf_counter() - started)
+        return fill
+
+
+class SimulatedBroker:
+    """Fills every order immediately at the bar close and books realised PnL into capital"""
+
+    def __init__(self, starting_capital):
+        self.starting_capital = starting_capital
+        self.capital = starting_capital
+        self.trades = 0
+        self.wins = 0
+        self.losses = 0
+        self.pnl = 0
+        self.order_ids = itertools.count(1)
+
+    def buying_power(self):
+        return self.capital
+
+    def submit_order(self, symbol, qty, side, price, timestamp):
+        return {'qty': qty, 'price': price, 'order_id': f"sim-{next(self.order_ids)}"}
+
+    def settle(self, trade):
+        self.capital += trade['pnl']
+        self.pnl += trade['pnl']
+        self.trades += 1
+        if trade['pnl'] > 0:
+            self.wins += 1
+        else:
+            self.losses += 1
+
+
+class ReplaySource:
+    """Replays a Core.BarStream one timestamp at a time, as fast as the engine can go"""
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def batches(self):
+        """Yield (bars, marks) per timestamp: the bars printed at it and, when the stream was built
+        with missing="ffill", flat bars at the last close for the symbols that did not print"""
+        stream = self.stream
+        fields = [stream.columns[field] for field in ('open', 'high', 'low', 'close', 'volume')]
+        closes = stream.columns['close']
+        ffill = stream.missing == "ffill"
+        for t in range(len(stream)):
+            timestamp = stream.index[t]
+            bars, marks = [], []
+            for row, symbol in enumerate(stream.symbols):
+                if stream.present[row, t]:
+                    bars.append(Bar(symbol, timestamp, *(values[row, t] for values in fields)))
+                elif ffill and closes[row, t] == closes[row, t]:
+                    marks.append(Bar(symbol, timestamp, *(values[row, t] for values in fields)))
+            yield bars, marks
+
+    def run(self, engine):
+        events = []
+        for bars, marks in self.batches():
+            events.extend(engine.on_bars(bars, marks))
+        return events
@@ -0,0 +1,196 @@
+import itertools
+import threading
+import time
+import zlib
+from types import SimpleNamespace
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+
+def _utc_timestamp(value):
+    timestamp = pd.Timestamp(value)
+    return timestamp.tz_localize('UTC') if timestamp.tzinfo is None else timestamp.tz_convert('UTC')
+
+
+def _hash_normals(keys, seed):
+    """Map integer keys to standard normals with a splitmix64 hash, so any subset is reproducible"""
+    with np.errstate(over='ignore'):
+        z = keys.astype(np.uint64) * np.uint64(0x9E3779B97F4A7C15) + np.uint64(seed)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        z = z ^ (z >> np.uint64(31))
+    u1 = ((z >> np.uint64(11)).astype(np.float64) + 0.5) / 2.0 ** 53
+    u2 = ((z & np.uint64(0x7FF)).astype(np.float64) + 0.5) / 2.0 ** 11
+    return np.sqrt(-2 * np.log(u1)) * np.cos(2 * np.pi * u2)
+
+
+def synthetic_bars(symbol, start, end, start_price=100.0, seed=None):
+    """Deterministic random-walk minute bars for regular US sessions in [start, end).
+
+    Each session walks from a price fixed by its date, so the bars for a given
+    minute are the same whatever range they were requested in.
+    """
+    start, end = _utc_timestamp(start), _utc_timestamp(end)
+    seed = zlib.crc32(symbol.encode()) if seed is None else seed
+
+    # Generate whole days, then cut to the requested range
+    minutes = pd.date_range(start.floor('D'), end.ceil('D'), freq='min', inclusive='left')
+    local = minutes.tz_convert('America/New_York')
+    minute_of_day = local.hour * 60 + local.minute
+    in_session = (local.dayofweek < 5) & (minute_of_day >= 9 * 60 + 30) & (minute_of_day < 16 * 60)
+    minutes, local = minutes[in_session], local[in_session]
+
+    day_ids = local.tz_localize(None).to_numpy().astype('datetime64[D]').astype(np.int64)
+    minute_ids = minutes.tz_localize(None).to_numpy().astype('datetime64[m]').astype(np.int64)
+    day_open = start_price * np.exp(0.15 * np.sin(day_ids / 40.0) + 0.01 * _hash_normals(day_ids, seed))
+    # Whole days were generated, so every session has the same 390 minutes
+    steps = 0.0008 * _hash_normals(minute_ids, seed + 1)
+    walk = np.cumsum(steps.reshape(-1, 390), axis=1).ravel()
+    first_of_day = np.zeros(len(minutes), dtype=bool)
+    first_of_day[::390] = True
+    closes = day_open * np.exp(walk)
+    opens = np.where(first_of_day, day_open, np.roll(closes, 1))
+    spread = np.abs(_hash_normals(minute_ids, seed + 2)) * 0.0005 * closes
+    volume = np.round(np.abs(_hash_normals(minute_ids, seed + 3)) * 5000 + 100)
+
+    bars = pd.DataFrame({
+        'symbol': symbol,
+        'timestamp': minutes,
+        'open': opens,
+        'high': np.maximum(opens, closes) + spread,
+        'low': np.minimum(opens, closes) - spread,
+        'close': closes,
+        'volume': volume,
+        'trade_count': np.round(volume / 25),
+        'vwap': (opens + closes) / 2
+    })
+    return bars[(bars['timestamp'] >= start) & (bars['timestamp'] < end)].reset_index(drop=True)
+
+
+class FakeBarSet:
+    def __init__(self, df):
+        self.df = df
+
+
+class FakeHistoricalDataClient:
+    """Offline stand-in for alpaca's StockHistoricalDataClient.
+
+    Serves bars from `frames` ({symbol: DataFrame like minute_<symbol>.csv}) or,
+    for unknown symbols, from synthetic_bars. Every request is recorded in
+    `requests`; `latency` adds a per-call delay and `fail_after` raises once that
+    many calls have been served, to exercise resume logic.
+    """
+
+    def __init__(self, frames=None, latency=0.0, fail_after=None):
+        self.frames = frames or {}
+        self.latency = latency
+        self.fail_after = fail_after
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def get_stock_bars(self, request):
+        with self.lock:
+            if self.fail_after is not None and len(self.requests) >= self.fail_after:
+                raise ConnectionError("FakeHistoricalDataClient: simulated outage")
+            self.requests.append(request)
+        if self.latency:
+            time.sleep(self.latency)
+
+        symbols = request.symbol_or_symbols
+        symbols = [symbols] if isinstance(symbols, str) else list(symbols)
+        start = _utc_timestamp(request.start)
+        end = _utc_timestamp(request.end or datetime.now(timezone.utc))
+
+        frames = []
+        for symbol in symbols:
+            if symbol in self.frames:
+                frame = self.frames[symbol]
+                timestamps = pd.to_datetime(frame['timestamp'], utc=True)
+                frame = frame[(timestamps >= start) & (timestamps < end)].assign(
+                    symbol=symbol, timestamp=timestamps)
+            else:
+                frame = synthetic_bars(symbol, start, end)
+            frames.append(frame)
+
+        bars = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        if bars.empty:
+            # alpaca returns a bare DataFrame without the (symbol, timestamp) index when nothing matched
+            return FakeBarSet(pd.DataFrame())
+        return FakeBarSet(bars.set_index(['symbol', 'timestamp']))
+
+
+class FakeTradingClient:
+    """Offline stand-in for alpaca's TradingClient: a fixed account and instantly accepted orders.
+
+    `latency` blocks each call like an HTTP round trip would; submitted orders
+    are kept in `orders`. With a `fill_price(order_data)` hook, market orders
+    fill at the price it returns, `fill_delay` seconds after submission, and can
+    be looked up like alpaca orders with get_order_by_client_id.
+    """
+
+    def __init__(self, buying_power=100000.0, latency=0.0, fill_price=None, fill_delay=0.0):
+        self.buying_power = buying_power
+        self.latency = latency
+        self.fill_price = fill_price
+        self.fill_delay = fill_delay
+        self.orders = []
+        self.by_client_id = {}
+        self.order_ids = itertools.count(1)
+        self.lock = threading.Lock()
+
+    def get_account(self):
+        if self.latency:
+            time.sleep(self.latency)
+        return SimpleNamespace(buying_power=str(self.buying_power), trading_blocked=False)
+
+    def submit_order(self, order_data):
+        if self.latency:
+            time.sleep(self.latency)
+        price = self.fill_price(order_data) if self.fill_price is not None else None
+        with self.lock:
+            submitted_at = datetime.now(timezone.utc)
+            order = SimpleNamespace(
+                id=f"fake-{next(self.order_ids)}",
+                client_order_id=getattr(order_data, 'client_order_id', None),
+                symbol=order_data.symbol,
+                qty=order_data.qty,
+                side=order_data.side,
+                submitted_at=submitted_at,
+                status='accepted',
+                filled_at=None,
+                filled_qty='0',
+                filled_avg_price=None
+            )
+            if price is not None:
+                order.status = 'filled'
+                order.filled_at = submitted_at + timedelta(seconds=self.fill_delay)
+                order.filled_qty = str(order_data.qty)
+                order.filled_avg_price = str(price)
+            self.orders.append(order)
+            if order.client_order_id:
+                self.by_client_id[order.client_order_id] = order
+        return order
+
+    def get_all_positions(self):
+        """Net position per symbol from the orders submitted so far (filled or merely accepted)"""
+        if self.latency:
+            time.sleep(self.latency)
+        net = {}
+        with self.lock:
+            for order in self.orders:
+                side = str(getattr(order.side, 'value', order.side)).lower()
+                qty = float(order.qty) if side == 'buy' else -float(order.qty)
+                net[order.symbol] = net.get(order.symbol, 0.0) + qty
+        return [SimpleNamespace(symbol=symbol, qty=str(abs(qty)), side='long' if qty > 0 else 'short')
+                for symbol, qty in net.items() if round(qty, 6) != 0]
+
+    def get_order_by_client_id(self, client_id):
+        if self.latency:
+            time.sleep(self.latency)
+        with self.lock:
+            order = self.by_client_id.get(client_id)
+        if order is None:
+            raise ValueError(f"order not found for client_order_id {client_id}")
+        return order
@@ -0,0 +1,140 @@
+import numpy as np
+
+EXIT_TAKE_PROFIT = 1
+EXIT_STOP_LOSS = 2
+EXIT_TIME = 3
+
+# Upper bound on the trade x bar matrices built at once, here and in Core.Lifecycle
+MAX_WINDOW_CELLS = 1 << 20
+
+
+def bps_slippage(bps):
+    """Slippage hook that moves every fill `bps` basis points against the trade"""
+    def apply(prices, directions, is_entry):
+        # Buying (entry long / exit short) pays up, selling gives up
+        paying = directions if is_entry else -directions
+        return prices * (1 + paying * bps / 10000.0)
+    return apply
+
+
+def proportional_fee(rate):
+    """Fee hook charging `rate` of the traded notional per leg"""
+    def apply(notional):
+        return np.abs(notional) * rate
+    return apply
+
+
+class FillModel:
+    """Intrabar take-profit / stop-loss fills from bar high/low.
+
+    For every trade the bars after entry are scanned, as one array operation,
+    for the first bar whose range crosses the take-profit or stop-loss level.
+    If neither is hit, the trade exits at the close of the first bar at least
+    `max_hold_minutes` after entry. When one bar crosses both levels, the tie
+    rule decides. "stop" assumes the stop filled first, which is the
+    pessimistic choice. "target" assumes the target filled first. "open"
+    picks whichever level is nearer the bar's open. Levels that the bar
+    opens beyond fill at the open.
+
+    `slippage(prices, directions, is_entry)` adjusts fill prices and
+    `fee(notional)` returns the cost of one leg; both are optional hooks.
+    """
+
+    def __init__(self, tie_rule="stop", slippage=None, fee=None):
+        if tie_rule not in ("stop", "target", "open"):
+            raise ValueError(f"Unknown tie rule: {tie_rule}")
+        self.tie_rule = tie_rule
+        self.slippage = slippage
+        self.fee = fee
+
+    def resolve(self, entries, directions, bars, take_profit_pct, stop_loss_pct, max_hold_minutes):
+        """Resolve exits for trades entered at the close of bars `entries`.
+
+        `directions` is +1 for long and -1 for short, `bars` holds aligned 'open',
+        'high', 'low', 'close' and int64 nanosecond 'timestamp' arrays. Returns a
+        dict of arrays: entry_price, exit_index (-1 if the data ends first),
+        exit_price and reason (EXIT_* codes, 0 when unresolved).
+        """
+        entries = np.asarray(entries, dtype=np.int64)
+        directions = np.asarray(directions, dtype=np.int64)
+        opens, highs, lows, closes = bars['open'], bars['high'], bars['low'], bars['close']
+        timestamps = bars['timestamp']
+        n_bars = len(closes)
+
+        entry_prices = closes[entries]
+        tp_levels = entry_prices * (1 + directions * take_profit_pct)
+        sl_levels = entry_prices * (1 - directions * stop_loss_pct)
+
+        # The trade's last bar is the first bar with data at least max_hold_minutes after entry
+        with_data = np.where(~np.isnan(closes), np.arange(n_bars), n_bars)
+        next_with_data = np.append(np.minimum.accumulate(with_data[::-1])[::-1], n_bars)
+        expiry = np.searchsorted(timestamps, timestamps[entries] + int(max_hold_minutes * 60e9))
+        last_bar = next_with_data[expiry]
+
+        horizon = max(int(np.max(np.minimum(last_bar, n_bars - 1) - entries, initial=1)), 1)
+        exit_step = np.empty(len(entries), dtype=np.int64)
+        exit_prices = np.empty(len(entries))
+        reason = np.empty(len(entries), dtype=np.int8)
+        # Trades x horizon matrices, in blocks so long holds don't blow up memory
+        block = max(1, MAX_WINDOW_CELLS // horizon)
+        for start in range(0, len(entries), block):
+            rows = slice(start, start + block)
+            exit_step[rows], exit_prices[rows], reason[rows] = self.resolve_block(
+                entries[rows], directions[rows], tp_levels[rows], sl_levels[rows], last_bar[rows], horizon,
+                opens, highs, lows, closes
+            )
+
+        if self.slippage is not None:
+            entry_prices = self.slippage(entry_prices, directions, True)
+            exit_prices = self.slippage(exit_prices, directions, False)
+
+        return {
+            'entry_price': entry_prices,
+            'exit_index': np.where(exit_step >= 0, entries + 1 + exit_step, -1),
+            'exit_price': exit_prices,
+            'reason': reason
+        }
+
+    def resolve_block(self, entries, directions, tp_levels, sl_levels, last_bar, horizon, opens, highs, lows,
+                      closes):
+        """Exit step after entry (-1 if unresolved), exit price and reason for one block of trades"""
+        n_bars = len(closes)
+        window = entries[:, None] + np.arange(1, horizon + 1)[None, :]
+        live = (window < n_bars) & (window <= last_bar[:, None])
+        expired = live & (window == last_bar[:, None])
+        window = np.minimum(window, n_bars - 1)
+
+        w_open, w_high, w_low, w_close = opens[window], highs[window], lows[window], closes[window]
+
+        long = (directions > 0)[:, None]
+        tp_hit = live & np.where(long, w_high >= tp_levels[:, None], w_low <= tp_levels[:, None])
+        sl_hit = live & np.where(long, w_low <= sl_levels[:, None], w_high >= sl_levels[:, None])
+
+        first_tp = np.where(tp_hit.any(axis=1), tp_hit.argmax(axis=1), horizon)
+        first_sl = np.where(sl_hit.any(axis=1), sl_hit.argmax(axis=1), horizon)
+        first_expiry = np.where(expired.any(axis=1), expired.argmax(axis=1), horizon)
+
+        rows = np.arange(len(entries))
+        take_profit = first_tp < first_sl
+        tie = (first_tp == first_sl) & (first_tp < horizon)
+        if self.tie_rule == "target":
+            take_profit |= tie
+        elif self.tie_rule == "open":
+            tie_open = w_open[rows, np.minimum(first_tp, horizon - 1)]
+            take_profit |= tie & (np.abs(tie_open - tp_levels) < np.abs(tie_open - sl_levels))
+        stop_loss = ~take_profit & (first_sl < horizon)
+        take_profit &= first_tp < horizon
+        timed_out = ~take_profit & ~stop_loss & (first_expiry < horizon)
+
+        exit_step = np.select([take_profit, stop_loss, timed_out], [first_tp, first_sl, first_expiry], -1)
+        step = np.maximum(exit_step, 0)
+        bar_open = w_open[rows, step]
+        # A level the bar gapped through fills at the open instead
+        tp_fill = np.where(directions > 0, np.maximum(tp_levels, bar_open), np.minimum(tp_levels, bar_open))
+        sl_fill = np.where(directions > 0, np.minimum(sl_levels, bar_open), np.maximum(sl_levels, bar_open))
+        exit_prices = np.select([take_profit, stop_loss, timed_out], [tp_fill, sl_fill, w_close[rows, step]], np.nan)
+        reason = np.select([take_profit, stop_loss, timed_out], [EXIT_TAKE_PROFIT, EXIT_STOP_LOSS, EXIT_TIME], 0)
+        return exit_step, exit_prices, reason
+
+    def fees(self, notional):
+        return self.fee(notional) if self.fee is not None else 0.0
@@ -0,0 +1,244 @@
+import time
+from collections import deque
+
+
+class EMA:
+    """Streaming exponential moving average, identical to pandas ewm(span=...).mean()"""
+
+    def __init__(self, span):
+        self.span = span
+        self.alpha = 1. / (1. + (span - 1) / 2.)
+        self.value = None
+        self.old_wt = 1.
+        self.count = 0
+
+    def update(self, price):
+        # Same recurrence as pandas' adjusted ewm, so values match the backtester bit for bit
+        self.count += 1
+        if self.value is None:
+            self.value = price
+            return self.value
+        self.old_wt *= 1. - self.alpha
+        if self.value != price:
+            self.value = (self.old_wt * self.value + price) / (self.old_wt + 1.)
+        self.old_wt += 1.
+        return self.value
+
+    def to_dict(self):
+        return {'span': self.span, 'value': self.value, 'old_wt': self.old_wt, 'count': self.count}
+
+    @classmethod
+    def from_dict(cls, state):
+        ema = cls(state['span'])
+        ema.value = state['value']
+        ema.old_wt = state['old_wt']
+        ema.count = state['count']
+        return ema
+
+
+class MACD:
+    """Streaming MACD line and signal line"""
+
+    def __init__(self, short_period=12, long_period=26, signal_period=9):
+        self.long_period = long_period
+        self.short_ema = EMA(short_period)
+        self.long_ema = EMA(long_period)
+        self.signal_ema = EMA(signal_period)
+        self.count = 0
+
+    def update(self, price):
+        self.count += 1
+        macd = self.short_ema.update(price) - self.long_ema.update(price)
+        self.signal_ema.update(macd)
+        return self.value
+
+    @property
+    def value(self):
+        if self.count < self.long_period:
+            return None, None
+        return self.short_ema.value - self.long_ema.value, self.signal_ema.value
+
+    def to_dict(self):
+        return {
+            'long_period': self.long_period,
+            'count': self.count,
+            'short_ema': self.short_ema.to_dict(),
+            'long_ema': self.long_ema.to_dict(),
+            'signal_ema': self.signal_ema.to_dict()
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        macd = cls(long_period=state['long_period'])
+        macd.count = state['count']
+        macd.short_ema = EMA.from_dict(state['short_ema'])
+        macd.long_ema = EMA.from_dict(state['long_ema'])
+        macd.signal_ema = EMA.from_dict(state['signal_ema'])
+        return macd
+
+
+class RSI:
+    """Streaming RSI.
+
+    method="simple" reproduces calculate_rsi: summed gains/losses over the last
+    `period` closes, with RSI 0 when there are no losses. method="wilder" uses
+    Wilder's smoothed averages seeded from the first `period` changes.
+    """
+
+    def __init__(self, period=14, method="simple"):
+        if method not in ("simple", "wilder"):
+            raise ValueError(f"Unknown RSI method: {method}")
+        self.period = period
+        self.method = method
+        self.last_close = None
+        self.deltas = deque(maxlen=period - 1 if method == "simple" else period)
+        self.avg_gain = None
+        self.avg_loss = None
+        self.count = 0
+
+    def update(self, price):
+        self.count += 1
+        if self.last_close is not None:
+            delta = price - self.last_close
+            if self.method == "wilder" and self.avg_gain is not None:
+                self.avg_gain = (self.avg_gain * (self.period - 1) + max(delta, 0.)) / self.period
+                self.avg_loss = (self.avg_loss * (self.period - 1) + max(-delta, 0.)) / self.period
+            else:
+                self.deltas.append(delta)
+                if self.method == "wilder" and len(self.deltas) == self.period:
+                    self.avg_gain = sum(d for d in self.deltas if d > 0) / self.period
+                    self.avg_loss = -sum(d for d in self.deltas if d < 0) / self.period
+        self.last_close = price
+        return self.value
+
+    @property
+    def value(self):
+        if self.method == "simple":
+            if self.count < self.period:
+                return None
+            gains = sum(d for d in self.deltas if d > 0)
+            losses = -sum(d for d in self.deltas if d < 0)
+            rs = gains / losses if losses != 0 else 0
+            return 100 - (100 / (1 + rs))
+        if self.avg_gain is None:
+            return None
+        if self.avg_loss == 0:
+            return 100.
+        return 100 - (100 / (1 + self.avg_gain / self.avg_loss))
+
+    def to_dict(self):
+        return {
+            'period': self.period,
+            'method': self.method,
+            'last_close': self.last_close,
+            'deltas': list(self.deltas),
+            'avg_gain': self.avg_gain,
+            'avg_loss': self.avg_loss,
+            'count': self.count
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        rsi = cls(state['period'], state['method'])
+        rsi.last_close = state['last_close']
+        rsi.deltas.extend(state['deltas'])
+        rsi.avg_gain = state['avg_gain']
+        rsi.avg_loss = state['avg_loss']
+        rsi.count = state['count']
+        return rsi
+
+
+class Trend:
+    """Streaming EMA crossover trend: 'up', 'down' or 'neutral'"""
+
+    def __init__(self, short_ema=20, long_ema=50):
+        self.long_period = long_ema
+        self.short_ema = EMA(short_ema)
+        self.long_ema = EMA(long_ema)
+        self.count = 0
+
+    def update(self, price):
+        self.count += 1
+        self.short_ema.update(price)
+        self.long_ema.update(price)
+        return self.value
+
+    @property
+    def value(self):
+        if self.count < self.long_period:
+            return None
+        if self.short_ema.value > self.long_ema.value:
+            return 'up'
+        elif self.short_ema.value < self.long_ema.value:
+            return 'down'
+        else:
+            return 'neutral'
+
+    def to_dict(self):
+        return {
+            'long_period': self.long_period,
+            'count': self.count,
+            'short_ema': self.short_ema.to_dict(),
+            'long_ema': self.long_ema.to_dict()
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        trend = cls(long_ema=state['long_period'])
+        trend.count = state['count']
+        trend.short_ema = EMA.from_dict(state['short_ema'])
+        trend.long_ema = EMA.from_dict(state['long_ema'])
+        return trend
+
+
+class IndicatorSet:
+    """RSI, MACD and trend for one symbol, updated together from each new close"""
+
+    def __init__(self, rsi_method="simple", warmup_bars=50):
+        self.warmup_bars = warmup_bars
+        self.rsi = RSI(method=rsi_method)
+        self.macd = MACD()
+        self.trend = Trend()
+        self.count = 0
+
+    def update(self, price):
+        self.count += 1
+        self.rsi.update(price)
+        self.macd.update(price)
+        self.trend.update(price)
+
+    def update_timed(self, price, latency, symbol):
+        """update(), recording each indicator's time into a Core.Latency recorder"""
+        self.count += 1
+        for name, indicator in (('indicator.rsi', self.rsi), ('indicator.macd', self.macd),
+                                ('indicator.trend', self.trend)):
+            started = time.perf_counter()
+            indicator.update(price)
+            latency.record(name, symbol, time.perf_counter() - started)
+
+    @property
+    def ready(self):
+        return self.count >= self.warmup_bars
+
+    def values(self):
+        """Return (rsi, macd, signal, trend), with None for anything still warming up"""
+        macd, signal = self.macd.value
+        return self.rsi.value, macd, signal, self.trend.value
+
+    def to_dict(self):
+        return {
+            'warmup_bars': self.warmup_bars,
+            'count': self.count,
+            'rsi': self.rsi.to_dict(),
+            'macd': self.macd.to_dict(),
+            'trend': self.trend.to_dict()
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        indicators = cls(warmup_bars=state['warmup_bars'])
+        indicators.count = state['count']
+        indicators.rsi = RSI.from_dict(state['rsi'])
+        indicators.macd = MACD.from_dict(state['macd'])
+        indicators.trend = Trend.from_dict(state['trend'])
+        return indicators
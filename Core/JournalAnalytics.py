@@ -0,0 +1,266 @@
+import io
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from Core.TradeLog import JOURNAL_HEADER
+
+NUMERIC_COLUMNS = ("quantity", "entry_price", "exit_price", "elapsed_minutes", "pnl", "latency")
+FILL_COLUMNS = ["order_id", "broker_order_id", "status", "fill_price", "fill_qty", "filled_at"]
+
+
+def read_journal_rows(data, header):
+    """Parse complete CSV lines of a journal into a DataFrame with JOURNAL_HEADER columns.
+
+    Files written before TradeJournal (e.g. Data/live_trades_log.csv) have no
+    `event` column and one row per closed trade; those rows become exits.
+    """
+    frame = pd.read_csv(io.BytesIO(data), header=None, names=header, dtype=str, keep_default_na=False)
+    frame = frame.replace('', None)
+    if 'event' not in frame.columns:
+        frame['event'] = 'exit'
+    for column in JOURNAL_HEADER:
+        if column not in frame.columns:
+            frame[column] = None
+    frame = frame[JOURNAL_HEADER].copy()
+    for column in NUMERIC_COLUMNS:
+        frame[column] = pd.to_numeric(frame[column], errors='coerce')
+    frame['timestamp'] = pd.to_datetime(frame['timestamp'], utc=True, format='ISO8601')
+    return frame
+
+
+def order_fill(order):
+    """Fill fields of an alpaca (or fake) order; fill_price is NaN until it has filled"""
+    status = getattr(order, 'status', None)
+    status = str(getattr(status, 'value', status))
+    price = getattr(order, 'filled_avg_price', None)
+    filled_at = getattr(order, 'filled_at', None)
+    return {
+        'broker_order_id': str(getattr(order, 'id', '')) or None,
+        'status': status,
+        'fill_price': float(price) if price is not None else np.nan,
+        'fill_qty': float(getattr(order, 'filled_qty', None) or 0.0),
+        'filled_at': pd.Timestamp(filled_at) if filled_at is not None else pd.NaT
+    }
+
+
+class JournalAnalyzer:
+    """Incremental analytics over the live bots' trade journals, reconciled against broker fills.
+
+    Journals are the TradeJournal CSVs in `journals` (a folder or a list of
+    files). `state_dir` keeps an offset index of how far each file has been
+    read, the rows parsed so far and the fills already fetched, so each run
+    parses only rows appended since the last one and asks the broker only
+    about orders that were not final yet. `client` is an alpaca TradingClient
+    (or Core.Fakes.FakeTradingClient); without one, reports carry signal-side
+    numbers only.
+
+    Slippage is measured per order against the price the strategy acted on (the
+    bar close), signed so that positive is a cost; realised PnL comes from the
+    entry and exit fills.
+    """
+
+    def __init__(self, journals, state_dir=".journal_analytics", client=None, max_workers=8):
+        self.journals = journals
+        self.state_dir = Path(state_dir)
+        self.client = client
+        self.max_workers = max_workers
+        self.index = {}
+        self.rows = None
+        self.fills = pd.DataFrame(columns=FILL_COLUMNS)
+        self.load_state()
+
+    def journal_paths(self):
+        if isinstance(self.journals, (str, Path)) and Path(self.journals).is_dir():
+            return sorted(Path(self.journals).glob('live_trades*.csv'))
+        if isinstance(self.journals, (str, Path)):
+            return [Path(self.journals)]
+        return [Path(path) for path in self.journals]
+
+    def load_state(self):
+        index_path = self.state_dir / 'index.json'
+        if index_path.exists():
+            with open(index_path) as f:
+                self.index = json.load(f)
+        if (self.state_dir / 'rows.pkl').exists():
+            self.rows = pd.read_pickle(self.state_dir / 'rows.pkl')
+        if (self.state_dir / 'fills.pkl').exists():
+            self.fills = pd.read_pickle(self.state_dir / 'fills.pkl')
+
+    def save_state(self):
+        """Write rows and fills before the index, each atomically, so a crash never skips rows"""
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        if self.rows is not None:
+            self.rows.to_pickle(self.state_dir / 'rows.pkl.tmp')
+            os.replace(self.state_dir / 'rows.pkl.tmp', self.state_dir / 'rows.pkl')
+        self.fills.to_pickle(self.state_dir / 'fills.pkl.tmp')
+        os.replace(self.state_dir / 'fills.pkl.tmp', self.state_dir / 'fills.pkl')
+        with open(self.state_dir / 'index.json.tmp', 'w') as f:
+            json.dump(self.index, f, indent=2)
+        os.replace(self.state_dir / 'index.json.tmp', self.state_dir / 'index.json')
+
+    def ingest(self):
+        """Parse the rows appended to every journal since the last call; returns how many were new"""
+        new = []
+        dropped = set()
+        for path in self.journal_paths():
+            if not path.exists():
+                continue
+            key = str(path.resolve())
+            info = os.stat(path)
+            entry = self.index.get(key)
+            if entry is not None and (entry['inode'] != info.st_ino or info.st_size < entry['offset']):
+                # Replaced or truncated: read it again from the top
+                dropped.add(key)
+                entry = None
+            with open(path, 'rb') as f:
+                f.seek(entry['offset'] if entry else 0)
+                data = f.read()
+            # Only whole lines; a row the journal is still writing waits for the next run
+            data = data[:data.rfind(b'\n') + 1]
+            if not data:
+                continue
+            offset = (entry['offset'] if entry else 0) + len(data)
+            if entry is None:
+                header_line, _, data = data.partition(b'\n')
+                header = header_line.decode().strip().split(',')
+            else:
+                header = entry['header']
+            self.index[key] = {'offset': offset, 'inode': info.st_ino, 'header': header}
+            if data:
+                frame = read_journal_rows(data, header)
+                frame['source'] = key
+                new.append(frame)
+
+        if dropped and self.rows is not None:
+            self.rows = self.rows[~self.rows['source'].isin(dropped)]
+        if new:
+            self.rows = pd.concat(([self.rows] if self.rows is not None else []) + new, ignore_index=True)
+        return sum(len(frame) for frame in new)
+
+    def legs(self):
+        """One row per order the bot sent: entries and the closing side of exits, with fills and ack latency"""
+        rows = self.rows if self.rows is not None else read_journal_rows(b'', JOURNAL_HEADER)
+        entries = rows[rows['event'] == 'entry']
+        exits = rows[rows['event'] == 'exit']
+        legs = pd.concat([
+            pd.DataFrame({'order_id': entries['order_id'], 'role': 'entry', 'symbol': entries['symbol'],
+                          'side': entries['side'], 'qty': entries['quantity'],
+                          'signal_price': entries['entry_price'], 'signal_time': entries['timestamp']}),
+            pd.DataFrame({'order_id': exits['exit_order_id'], 'role': 'exit', 'symbol': exits['symbol'],
+                          'side': np.where(exits['side'] == 'BUY', 'SELL', 'BUY'), 'qty': exits['quantity'],
+                          'signal_price': exits['exit_price'], 'signal_time': exits['timestamp']}),
+        ], ignore_index=True)
+
+        acks = rows[rows['event'] == 'ack'].drop_duplicates('order_id', keep='last').set_index('order_id')
+        legs['ack_status'] = legs['order_id'].map(acks['status'])
+        legs['ack_latency'] = legs['order_id'].map(acks['latency'])
+        fills = self.fills.drop_duplicates('order_id', keep='last').set_index('order_id')
+        for column in ('status', 'fill_price', 'fill_qty', 'filled_at'):
+            legs[column] = legs['order_id'].map(fills[column])
+        legs['fill_price'] = legs['fill_price'].astype(np.float64)
+        legs['fill_qty'] = legs['fill_qty'].astype(np.float64)
+        legs['filled_at'] = pd.to_datetime(legs['filled_at'], utc=True)
+
+        sign = np.where(legs['side'] == 'BUY', 1.0, -1.0)
+        move = (legs['fill_price'] - legs['signal_price']) * sign
+        legs['slippage_bps'] = move / legs['signal_price'] * 1e4
+        legs['slippage_cost'] = move * legs['fill_qty']
+        legs['fill_delay'] = (legs['filled_at'] - legs['signal_time']).dt.total_seconds()
+        legs['hour'] = legs['signal_time'].dt.hour
+        return legs
+
+    def reconcile(self):
+        """Fetch broker fills for orders not final yet; returns how many were looked up"""
+        if self.client is None:
+            return 0
+        legs = self.legs()
+        final = set(self.fills.loc[self.fills['status'].isin(('filled', 'canceled', 'expired', 'rejected')),
+                                   'order_id'])
+        wanted = legs['order_id'].notna() & ~legs['order_id'].isin(final) & (legs['ack_status'] != 'rejected')
+        order_ids = list(dict.fromkeys(legs.loc[wanted, 'order_id']))
+        if not order_ids:
+            return 0
+
+        def fetch(order_id):
+            try:
+                return {'order_id': order_id, **order_fill(self.client.get_order_by_client_id(order_id))}
+            except Exception as e:
+                print(f"Could not fetch order {order_id}: {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            fetched = [fill for fill in pool.map(fetch, order_ids) if fill is not None]
+        if fetched:
+            fetched = pd.DataFrame(fetched, columns=FILL_COLUMNS)
+            kept = self.fills[~self.fills['order_id'].isin(fetched['order_id'])]
+            self.fills = pd.concat([kept, fetched], ignore_index=True) if len(kept) else fetched
+        return len(order_ids)
+
+    def trades(self, legs=None):
+        """Closed trades with signal PnL (bar closes) next to realised PnL (broker fills)"""
+        legs = self.legs() if legs is None else legs
+        rows = self.rows if self.rows is not None else read_journal_rows(b'', JOURNAL_HEADER)
+        # An exit the broker rejected never closed the position; the strategy reopened it
+        rejected = rows.loc[rows['event'] == 'exit_rejected', 'exit_order_id']
+        exits = rows[(rows['event'] == 'exit') & ~rows['exit_order_id'].isin(rejected)]
+        fill_price = legs.dropna(subset=['order_id']).drop_duplicates('order_id').set_index('order_id')['fill_price']
+        direction = np.where(exits['side'] == 'SELL', -1.0, 1.0)
+        trades = pd.DataFrame({
+            'symbol': exits['symbol'],
+            'side': exits['side'],
+            'exit_time': exits['timestamp'],
+            'qty': exits['quantity'],
+            'reason': exits['reason'],
+            'signal_pnl': (exits['exit_price'] - exits['entry_price']) * exits['quantity'] * direction,
+            'entry_fill': exits['order_id'].map(fill_price),
+            'exit_fill': exits['exit_order_id'].map(fill_price),
+        })
+        trades['realised_pnl'] = (trades['exit_fill'] - trades['entry_fill']) * trades['qty'] * direction
+        trades['pnl_gap'] = trades['realised_pnl'] - trades['signal_pnl']
+        trades['hour'] = trades['exit_time'].dt.hour
+        return trades.reset_index(drop=True)
+
+    def summarize(self, legs, trades, key):
+        orders = legs.groupby(key).agg(
+            orders=('role', 'size'),
+            filled=('fill_price', 'count'),
+            slippage_bps=('slippage_bps', 'mean'),
+            slippage_cost=('slippage_cost', lambda values: values.sum(min_count=1)),
+            ack_latency_ms=('ack_latency', 'mean'),
+            fill_delay_s=('fill_delay', 'mean'),
+        )
+        orders['ack_latency_ms'] *= 1000
+        closed = trades.groupby(key).agg(
+            trades=('qty', 'size'),
+            reconciled=('realised_pnl', 'count'),
+            signal_pnl=('signal_pnl', 'sum'),
+            realised_pnl=('realised_pnl', lambda values: values.sum(min_count=1)),
+            pnl_gap=('pnl_gap', lambda values: values.sum(min_count=1)),
+        )
+        counts = ['orders', 'filled', 'trades', 'reconciled']
+        summary = orders.join(closed, how='outer')
+        summary[counts] = summary[counts].fillna(0).astype(np.int64)
+        return summary
+
+    def report(self):
+        """{'by_symbol', 'by_hour'} summaries plus the per-order 'legs' and per-trade 'trades' tables"""
+        legs = self.legs()
+        trades = self.trades(legs)
+        return {
+            'by_symbol': self.summarize(legs, trades, 'symbol'),
+            'by_hour': self.summarize(legs, trades, 'hour'),
+            'legs': legs,
+            'trades': trades
+        }
+
+    def run(self):
+        """Ingest new rows, reconcile open orders, persist the state and return report()"""
+        self.ingest()
+        self.reconcile()
+        self.save_state()
+        return self.report()
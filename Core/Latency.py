@@ -0,0 +1,142 @@
+import asyncio
+import json
+import math
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import numpy as np
+
+# Log-spaced buckets: 16 per doubling from 100ns, so any recorded value is within ~4.4%
+MIN_SECONDS = 1e-7
+BUCKETS_PER_DOUBLING = 16
+N_BUCKETS = BUCKETS_PER_DOUBLING * 32
+BUCKET_UPPER = MIN_SECONDS * 2 ** ((np.arange(N_BUCKETS) + 1) / BUCKETS_PER_DOUBLING)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram; recording is a log2 and a list increment"""
+
+    __slots__ = ('counts', 'count', 'total', 'max')
+
+    def __init__(self):
+        self.counts = [0] * N_BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        if seconds > MIN_SECONDS:
+            bucket = min(int(math.log2(seconds / MIN_SECONDS) * BUCKETS_PER_DOUBLING), N_BUCKETS - 1)
+        else:
+            bucket = 0
+        self.counts[bucket] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def merge(self, other):
+        for i, n in enumerate(other.counts):
+            if n:
+                self.counts[i] += n
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, q):
+        if self.count == 0:
+            return 0.0
+        cumulative = np.cumsum(self.counts)
+        bucket = int(np.searchsorted(cumulative, q / 100 * self.count))
+        return float(min(BUCKET_UPPER[bucket], self.max))
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else 0.0,
+            'p50': self.percentile(50),
+            'p99': self.percentile(99),
+            'max': self.max
+        }
+
+
+class LatencyRecorder:
+    """Per-stage, per-symbol latency histograms for the bar-to-order pipeline.
+
+    Stages recorded by the engine and strategy: 'receive' (bar close to
+    arrival), 'buffer_append', 'indicator.rsi' / 'indicator.macd' /
+    'indicator.trend', 'signal', 'order_submit', 'on_bar' (whole handler) and
+    'ack' (order round trip). Components only time anything when they were
+    given a recorder, so leaving it as None costs a single attribute check.
+    """
+
+    def __init__(self):
+        self.histograms = {}
+        self.started = time.time()
+
+    def record(self, stage, symbol, seconds):
+        key = (stage, symbol)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram()
+        histogram.record(seconds)
+
+    def record_receive(self, bar, bar_seconds=60):
+        """Wall-clock delay between the end of `bar` and now"""
+        closed = bar.timestamp.timestamp() + bar_seconds
+        self.record('receive', bar.symbol, max(time.time() - closed, 0.0))
+
+    def snapshot(self):
+        """{stage: {symbol: summary, '*': all symbols}} with times in seconds"""
+        stages = {}
+        for (stage, symbol), histogram in list(self.histograms.items()):
+            symbols = stages.setdefault(stage, {})
+            symbols[symbol] = histogram.summary()
+            combined = symbols.setdefault('*', Histogram())
+            combined.merge(histogram)
+        for symbols in stages.values():
+            symbols['*'] = symbols['*'].summary()
+        return {'since': self.started, 'taken': time.time(), 'stages': stages}
+
+    def export(self, path):
+        """Write the current snapshot to `path` as JSON, atomically"""
+        path = Path(path)
+        tmp = path.with_suffix(path.suffix + '.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(self.snapshot(), f, indent=2)
+        os.replace(tmp, path)
+
+    async def export_loop(self, path, interval=60.0):
+        while True:
+            await asyncio.sleep(interval)
+            await asyncio.to_thread(self.export, path)
+
+    def serve(self, host='127.0.0.1', port=8787):
+        """Serve the snapshot as JSON over HTTP from a daemon thread; returns the server"""
+        recorder = self
+
+        class SnapshotHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = json.dumps(recorder.snapshot()).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), SnapshotHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+    def print_summary(self):
+        stages = self.snapshot()['stages']
+        print(f"{'stage':<18} {'count':>9} {'p50 us':>10} {'p99 us':>10} {'max us':>10}")
+        for stage, symbols in stages.items():
+            s = symbols['*']
+            print(f"{stage:<18} {s['count']:>9} {s['p50'] * 1e6:>10.1f} {s['p99'] * 1e6:>10.1f} {s['max'] * 1e6:>10.1f}")
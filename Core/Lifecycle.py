@@ -0,0 +1,266 @@
+import numpy as np
+
+from Core.FillModel import EXIT_STOP_LOSS, EXIT_TAKE_PROFIT, EXIT_TIME, MAX_WINDOW_CELLS
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; the plain NumPy path gives identical results
+    njit = None
+
+TRADE_DTYPE = np.dtype([
+    ('symbol', np.int32),
+    ('entry_index', np.int64),
+    ('exit_index', np.int64),
+    ('entry_time', np.int64),
+    ('exit_time', np.int64),
+    ('direction', np.int8),
+    ('reason', np.int8),
+    ('entry_price', np.float64),
+    ('exit_price', np.float64),
+    ('qty', np.float64),
+    ('pnl', np.float64),
+])
+
+
+def _lifecycle_loop(signals, closes, timestamps, take_profit, stop_loss, max_hold, entries, exits, reasons):
+    """One pass over the bars of one symbol; writes trades into `entries`/`exits`/`reasons`.
+
+    Returns (trade count, entry index of the position still open at the end or -1).
+
+    Same rules as simulate_vectorized: enter on a signal when flat, check exits on
+    every bar with a close (the entry bar included), one position at a time.
+    Size cancels out of the take-profit / stop-loss tests, so no capital is needed.
+    """
+    n = 0
+    holding = False
+    entry = 0
+    entry_price = 0.0
+    direction = 0
+    for t in range(len(closes)):
+        if not holding and signals[t] != 0:
+            holding = True
+            entry = t
+            entry_price = closes[t]
+            direction = signals[t]
+        if not holding:
+            continue
+        price = closes[t]
+        if price != price:
+            continue
+        move = (price - entry_price) * direction
+        elapsed = (timestamps[t] - timestamps[entry]) / 1e9 / 60
+        reason = 0
+        if move >= entry_price * take_profit:
+            reason = EXIT_TAKE_PROFIT
+        elif move <= -entry_price * stop_loss:
+            reason = EXIT_STOP_LOSS
+        elif elapsed >= max_hold:
+            reason = EXIT_TIME
+        if reason:
+            entries[n] = entry
+            exits[n] = t
+            reasons[n] = reason
+            n += 1
+            holding = False
+    return n, entry if holding else -1
+
+
+def candidate_exits(signals, closes, timestamps, take_profit, stop_loss, max_hold):
+    """Exit bar and reason for every bar with a signal, as if each one were entered on its own.
+
+    Returns (candidates, exit_index, reason); exit_index is -1 for a position
+    still open when the data ends. Same exit rules as _lifecycle_loop.
+    """
+    n_bars = len(closes)
+    candidates = np.flatnonzero(signals)
+    exit_index = np.empty(len(candidates), dtype=np.int64)
+    reason = np.empty(len(candidates), dtype=np.int8)
+    if len(candidates) == 0:
+        return candidates, exit_index, reason
+    directions = signals[candidates].astype(np.float64)
+    entry_prices = closes[candidates]
+
+    # Bound each trade's window by the first bar with data at least max_hold after entry (plus one for safety)
+    with_data = np.where(~np.isnan(closes), np.arange(n_bars), n_bars)
+    next_with_data = np.append(np.minimum.accumulate(with_data[::-1])[::-1], n_bars)
+    expiry = np.searchsorted(timestamps, timestamps[candidates] + int(max_hold * 60e9))
+    last_bar = np.minimum(next_with_data[np.minimum(expiry, n_bars)] + 1, n_bars - 1)
+    horizon = int(np.max(last_bar - candidates, initial=0)) + 1
+
+    # Candidates x horizon matrices, in blocks so long holds don't blow up memory
+    block = max(1, MAX_WINDOW_CELLS // horizon)
+    for start in range(0, len(candidates), block):
+        rows = slice(start, start + block)
+        entry = candidates[rows]
+        window = entry[:, None] + np.arange(horizon)[None, :]
+        inside = window < n_bars
+        window = np.minimum(window, n_bars - 1)
+        prices = closes[window]
+        move = (prices - entry_prices[rows, None]) * directions[rows, None]
+        elapsed = (timestamps[window] - timestamps[entry][:, None]) / 1e9 / 60
+        with np.errstate(invalid='ignore'):
+            tp_hit = move >= (entry_prices[rows] * take_profit)[:, None]
+            sl_hit = move <= (-entry_prices[rows] * stop_loss)[:, None]
+        time_hit = (elapsed >= max_hold) & ~np.isnan(prices)
+        hit = inside & (tp_hit | sl_hit | time_hit)
+        step = hit.argmax(axis=1)
+        at = np.arange(len(entry))
+        reason[rows] = np.where(tp_hit[at, step], EXIT_TAKE_PROFIT,
+                                np.where(sl_hit[at, step], EXIT_STOP_LOSS, EXIT_TIME))
+        exit_index[rows] = np.where(hit.any(axis=1), entry + step, -1)
+    return candidates, exit_index, reason
+
+
+def _lifecycle_numpy(signals, closes, timestamps, take_profit, stop_loss, max_hold, entries, exits, reasons):
+    """Plain NumPy version of _lifecycle_loop: exits for every candidate entry are found in one array
+    operation, and only the trades actually taken are walked in Python."""
+    candidates, exit_index, reason = candidate_exits(signals, closes, timestamps, take_profit, stop_loss,
+                                                     max_hold)
+    n = 0
+    free_from = 0
+    for k in range(len(candidates)):
+        entry = candidates[k]
+        if entry < free_from:
+            continue
+        if exit_index[k] < 0:
+            return n, entry  # still open when the data ends
+        entries[n] = entry
+        exits[n] = exit_index[k]
+        reasons[n] = reason[k]
+        n += 1
+        free_from = exit_index[k] + 1
+    return n, -1
+
+
+def _account_loop(order, is_exit, trade, entry_prices, exit_prices, directions, capital, total, pct, qty, pnl):
+    """Walk entry/exit events in bar order, sizing entries from the capital realised so far"""
+    for k in order:
+        i = trade[k]
+        if is_exit[k]:
+            value = (exit_prices[i] - entry_prices[i]) * qty[i]
+            if directions[i] < 0:
+                value *= -1
+            pnl[i] = value
+            capital += value
+            total += value
+        else:
+            qty[i] = capital * pct / entry_prices[i]
+    return capital, total
+
+
+if njit is not None:
+    lifecycle = njit(cache=True, nogil=True)(_lifecycle_loop)
+    account = njit(cache=True, nogil=True)(_account_loop)
+else:
+    lifecycle = _lifecycle_numpy
+    account = _account_loop
+
+
+def resolve_trades(signals, closes, timestamps, take_profit, stop_loss, max_hold):
+    """Trades for one symbol as (entry_index, exit_index, reason) arrays, plus the open entry or -1"""
+    size = int(np.count_nonzero(signals))
+    entries = np.empty(size, dtype=np.int64)
+    exits = np.empty(size, dtype=np.int64)
+    reasons = np.empty(size, dtype=np.int8)
+    n, open_entry = lifecycle(signals, closes, timestamps, take_profit, stop_loss, float(max_hold),
+                              entries, exits, reasons)
+    return entries[:n], exits[:n], reasons[:n], int(open_entry)
+
+
+class KernelState:
+    """Runs the lifecycle kernel over consecutive chunks of bars, carrying positions and capital.
+
+    Each call to run_chunk takes the next slice of the shared timestamp axis;
+    `offset` is the global index of its first bar. A position still open at the
+    end of a chunk is carried into the next one by replaying its entry bar in
+    front of it, so exits, sizing and settlement order come out exactly as if
+    the whole history had been one array.
+    """
+
+    def __init__(self, n_symbols, starting_capital, config):
+        self.config = config
+        self.take_profit = config['take_profit_pct']
+        self.stop_loss = config['stop_loss_pct']
+        self.max_hold = config['max_hold_minutes']
+        self.pct = float(config.get('position_size_pct', 0.1))
+        self.capital = float(starting_capital)
+        self.pnl = 0.0
+        # symbol -> (entry_index, entry_time, entry_price, direction, qty) of positions still open
+        self.open = {}
+        self.n_symbols = n_symbols
+
+    def run_chunk(self, signals, closes, timestamps, offset=0):
+        """Resolve and book one chunk; returns the trades it closed as a TRADE_DTYPE array in entry order"""
+        blocks = []
+        open_times = {}
+        for symbol in range(self.n_symbols):
+            symbol_signals, symbol_closes, symbol_times = signals[symbol], closes[symbol], timestamps
+            carried = self.open.pop(symbol, None)
+            shift = 0
+            if carried is not None:
+                entry_index, entry_time, entry_price, direction, qty = carried
+                symbol_signals = np.concatenate([[direction], symbol_signals]).astype(np.int8)
+                symbol_closes = np.concatenate([[entry_price], symbol_closes])
+                symbol_times = np.concatenate([[entry_time], timestamps])
+                shift = 1
+            entries, exits, reasons, open_entry = resolve_trades(
+                symbol_signals, symbol_closes, symbol_times, self.take_profit, self.stop_loss, self.max_hold
+            )
+            if open_entry >= 0:
+                open_times[symbol] = int(symbol_times[open_entry])
+                entries = np.append(entries, open_entry)
+                exits = np.append(exits, -1)
+                reasons = np.append(reasons, 0).astype(np.int8)
+            block = np.zeros(len(entries), dtype=TRADE_DTYPE)
+            block['symbol'] = symbol
+            block['direction'] = symbol_signals[entries]
+            block['entry_price'] = symbol_closes[entries]
+            block['exit_price'] = np.where(exits >= 0, symbol_closes[exits], np.nan)
+            block['reason'] = reasons
+            block['entry_index'] = entries + offset - shift
+            block['exit_index'] = np.where(exits >= 0, exits + offset - shift, -1)
+            block['entry_time'] = symbol_times[entries]
+            block['exit_time'] = np.where(exits >= 0, symbol_times[exits], -1)
+            block['qty'] = np.nan
+            if carried is not None and len(entries) and entries[0] == 0:
+                block['entry_index'][0] = entry_index
+                block['qty'][0] = qty
+            blocks.append(block)
+        trades = np.concatenate(blocks) if blocks else np.zeros(0, dtype=TRADE_DTYPE)
+        trades = trades[np.lexsort((trades['symbol'], trades['entry_index']))]
+
+        # Events: new entries and every exit, ordered by bar, entries before exits, then by entry order
+        n = len(trades)
+        new = np.flatnonzero(np.isnan(trades['qty']))
+        closed = np.flatnonzero(trades['exit_index'] >= 0)
+        bar = np.concatenate([trades['entry_index'][new], trades['exit_index'][closed]])
+        is_exit = np.concatenate([np.zeros(len(new), dtype=np.bool_), np.ones(len(closed), dtype=np.bool_)])
+        trade = np.concatenate([new, closed])
+        order = np.lexsort((trade, is_exit, bar))
+
+        qty = trades['qty'].copy()
+        pnl = np.zeros(n)
+        self.capital, self.pnl = account(order, is_exit, trade, trades['entry_price'].copy(),
+                                         trades['exit_price'].copy(), trades['direction'].copy(),
+                                         self.capital, self.pnl, self.pct, qty, pnl)
+        trades['qty'] = qty
+        trades['pnl'] = pnl
+        for row in trades[trades['exit_index'] < 0]:
+            symbol = int(row['symbol'])
+            self.open[symbol] = (int(row['entry_index']), open_times[symbol], float(row['entry_price']),
+                                 int(row['direction']), float(row['qty']))
+        return trades[trades['exit_index'] >= 0]
+
+
+def run_kernel(signals, closes, timestamps, starting_capital, config):
+    """Run the position lifecycle for every symbol and book the trades against one capital pool.
+
+    `signals` and `closes` are lists of per-symbol arrays aligned to
+    `timestamps`. Returns (structured TRADE_DTYPE array in entry order,
+    final capital, total pnl). Entries at a bar are sized before that bar's
+    exits settle and exits settle in entry order, as in simulate_vectorized.
+    Positions still open when the data ends are dropped.
+    """
+    state = KernelState(len(signals), starting_capital, config)
+    trades = state.run_chunk(signals, closes, timestamps)
+    return trades, state.capital, state.pnl
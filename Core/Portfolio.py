@@ -0,0 +1,35 @@
+def size_by_capital(price, capital, equity, buying_power, pct):
+    """Original backtester rule: a fraction of realised capital"""
+    return capital * pct / price
+
+
+def size_by_equity(price, capital, equity, buying_power, pct):
+    """A fraction of marked-to-market equity"""
+    return equity * pct / price
+
+
+def size_by_buying_power(price, capital, equity, buying_power, pct):
+    """The live bots' rule (ScalpingStrategy.position_size): a fraction of current buying power"""
+    return buying_power * pct / price
+
+
+def size_by_notional(price, capital, equity, buying_power, notional):
+    """A fixed dollar amount per position; `position_size_pct` holds the amount"""
+    return notional / price
+
+
+# Looked up by the "sizing" key of a strategy config; any callable with the same signature also works
+SIZING_RULES = {
+    'capital': size_by_capital,
+    'equity': size_by_equity,
+    'buying_power': size_by_buying_power,
+    'notional': size_by_notional,
+}
+
+
+def sizing_rule(sizing):
+    if callable(sizing):
+        return sizing
+    if sizing not in SIZING_RULES:
+        raise ValueError(f"Unknown sizing rule: {sizing}")
+    return SIZING_RULES[sizing]
@@ -0,0 +1,122 @@
+import asyncio
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from Core.BarStore import BarStore, frame_to_columns
+from Core.BarStream import BarStream
+from Core.Engine import Bar
+
+
+class ReplayDataStream:
+    """Local stand-in for alpaca's StockDataStream that replays stored minute bars.
+
+    Exposes the same subscribe_bars(handler, *symbols) / run() / stop() interface
+    and awaits each handler with Bar objects carrying alpaca's bar attributes.
+    `speed` paces the replay: 1.0 is real time, N is N times faster and None
+    sends bars as fast as the handlers take them (gaps between bars are capped
+    at `max_gap_seconds` of market time). `fanout` clones every source symbol
+    into that many synthetic symbols (TSLA.1, TSLA.2, ...) for load tests.
+
+    For every bar the stream records lag: the time from the moment the bar was
+    due to be delivered until its handler returned.
+    """
+
+    def __init__(self, bars, speed=None, fanout=1, max_gap_seconds=60):
+        self.speed = speed
+        self.max_gap_seconds = max_gap_seconds
+        self.handlers = {}
+        self.running = False
+
+        columns = {}
+        for symbol, symbol_bars in bars.items():
+            names = [symbol] if fanout <= 1 else [f"{symbol}.{k}" for k in range(1, fanout + 1)]
+            for name in names:
+                columns[name] = symbol_bars
+        self.stream = BarStream.from_columns(
+            columns, fields=('open', 'high', 'low', 'close', 'volume', 'trade_count', 'vwap')
+        )
+        self.lags = np.empty(int(self.stream.present.sum()))
+        self.routed_symbols = 0
+        self.bars_sent = 0
+        self.elapsed = 0.0
+
+    @classmethod
+    def from_csv_folder(cls, data_folder, symbols=None, **kwargs):
+        bars = {}
+        for path in sorted(Path(data_folder).glob('minute_*.csv')):
+            symbol = path.stem.split('_', 1)[1].upper()
+            if symbols is None or symbol in symbols:
+                bars[symbol] = frame_to_columns(pd.read_csv(path, parse_dates=['timestamp']))
+        return cls(bars, **kwargs)
+
+    @classmethod
+    def from_store(cls, store_folder, symbols=None, **kwargs):
+        store = BarStore(store_folder)
+        return cls({symbol: store.load(symbol) for symbol in (symbols or store.symbols())}, **kwargs)
+
+    @property
+    def symbols(self):
+        return self.stream.symbols
+
+    def subscribe_bars(self, handler, *symbols):
+        for symbol in symbols:
+            self.handlers[symbol] = handler
+
+    def unsubscribe_bars(self, *symbols):
+        for symbol in symbols:
+            self.handlers.pop(symbol, None)
+
+    def stop(self):
+        self.running = False
+
+    def run(self):
+        asyncio.run(self._run_forever())
+
+    async def _run_forever(self):
+        stream = self.stream
+        fields = [stream.columns[field] for field in ('open', 'high', 'low', 'close', 'volume', 'trade_count', 'vwap')]
+        routes = [(row, symbol, self.handlers.get(symbol, self.handlers.get('*')))
+                  for row, symbol in enumerate(stream.symbols)]
+        routes = [route for route in routes if route[2] is not None]
+        self.routed_symbols = len(routes)
+
+        self.running = True
+        started = due = time.perf_counter()
+        sent = 0
+        for t in range(len(stream)):
+            if not self.running:
+                break
+            if self.speed and t > 0:
+                gap = min((stream.timestamps[t] - stream.timestamps[t - 1]) / 1e9, self.max_gap_seconds)
+                due += gap / self.speed
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            elif not self.speed:
+                due = time.perf_counter()
+
+            timestamp = stream.index[t]
+            for row, symbol, handler in routes:
+                if stream.present[row, t]:
+                    await handler(Bar(symbol, timestamp, *(values[row, t] for values in fields)))
+                    self.lags[sent] = time.perf_counter() - due
+                    sent += 1
+        self.bars_sent = sent
+        self.elapsed = time.perf_counter() - started
+        self.running = False
+
+    def stats(self):
+        """Throughput and delivery lag (seconds) of the last run"""
+        lags = self.lags[:self.bars_sent]
+        return {
+            'symbols': self.routed_symbols,
+            'bars': self.bars_sent,
+            'elapsed': self.elapsed,
+            'bars_per_sec': self.bars_sent / self.elapsed if self.elapsed else 0.0,
+            'lag_p50': float(np.percentile(lags, 50)) if len(lags) else 0.0,
+            'lag_p99': float(np.percentile(lags, 99)) if len(lags) else 0.0,
+            'lag_max': float(lags.max()) if len(lags) else 0.0
+        }
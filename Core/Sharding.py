@@ -0,0 +1,211 @@
+import asyncio
+import multiprocessing
+import queue
+import threading
+import zlib
+
+from Core.BarBuffer import to_ns
+from Core.Engine import Bar
+from Core.Strategy import ScalpingStrategy
+
+
+def shard_worker(conn, config, symbols, warmup_bars, history_bars):
+    """Worker process: owns the bar buffers and indicators of its symbols and answers with entry signals.
+
+    Receives lists of (symbol, timestamp_ns, open, high, low, close, volume)
+    and replies with the (symbol, timestamp_ns, side) entries that fired. The
+    worker never holds positions; the coordinator filters signals for symbols
+    it already trades.
+    """
+    strategy = ScalpingStrategy(config, symbols, warmup_bars=warmup_bars, history_bars=history_bars)
+    while True:
+        batch = conn.recv()
+        if batch is None:
+            break
+        signals = []
+        for symbol, timestamp, open, high, low, close, volume in batch:
+            strategy.update(Bar(symbol, timestamp, open, high, low, close, volume))
+            side = strategy.entry_signal(symbol)
+            if side is not None:
+                signals.append((symbol, timestamp, side))
+        if signals:
+            conn.send(signals)
+    conn.close()
+
+
+class CoordinatorStrategy(ScalpingStrategy):
+    """Coordinator side of a sharded strategy: positions, sizing and exits, but no indicators.
+
+    Indicators live in the shard workers; `signals` holds the entries they
+    reported for each symbol's latest bar until the engine acts on them.
+    """
+
+    def __init__(self, config=None, symbols=()):
+        super().__init__(config, (), history_bars=1)
+        self.signals = {}
+
+    def update(self, bar):
+        self.last_price[bar.symbol] = bar.close
+
+    def entry_signal(self, symbol):
+        side = self.signals.pop(symbol, None)
+        if side is None or symbol in self.positions:
+            return None
+        limit = self.config.get('max_open_positions')
+        if limit is not None and len(self.positions) >= limit:
+            return None
+        return side
+
+
+class ShardCoordinator:
+    """Partitions symbols across worker processes and trades their signals through one engine.
+
+    The coordinator owns the engine (and so the broker, open positions and
+    buying power) and runs exits on every bar as it arrives, which needs no
+    indicators. Bars are batched per shard and handed to a writer thread that
+    ships them over a pipe, so a full pipe never blocks the event loop; a reader
+    thread per shard hands entry signals back to the event loop, where they are
+    acted on only if no newer bar for that symbol has arrived since. Events
+    produced asynchronously go to `report`.
+
+    A worker that dies before stop() is reported at once and kept in `error`,
+    which stop() raises once everything is shut down.
+    """
+
+    def __init__(self, engine, symbols, shards, report, warmup_bars=50, history_bars=100, max_batch=256):
+        self.engine = engine
+        self.symbols = list(symbols)
+        self.shards = shards
+        self.report = report
+        self.warmup_bars = warmup_bars
+        self.history_bars = history_bars
+        self.max_batch = max_batch
+        self.shard_of = {symbol: i % shards for i, symbol in enumerate(self.symbols)}
+        self.latest = {}
+        self.conns = []
+        self.processes = []
+        self.readers = []
+        self.writers = []
+        self.send_queues = []
+        self.outbox = [[] for _ in range(shards)]
+        self.flush_scheduled = False
+        self.loop = None
+        self.stopping = False
+        self.error = None
+        self.signals_received = 0
+        self.signals_stale = 0
+        # Workers are spawned fresh rather than forked from a process that already runs broker threads
+        self.context = multiprocessing.get_context('spawn')
+
+    def start(self):
+        self.loop = asyncio.get_running_loop()
+        for shard in range(self.shards):
+            symbols = [symbol for symbol in self.symbols if self.shard_of[symbol] == shard]
+            parent, child = self.context.Pipe()
+            process = self.context.Process(
+                target=shard_worker, name=f"shard-{shard}", daemon=True,
+                args=(child, self.engine.strategy.config, symbols, self.warmup_bars, self.history_bars)
+            )
+            process.start()
+            child.close()
+            self.conns.append(parent)
+            self.processes.append(process)
+            send_queue = queue.SimpleQueue()
+            writer = threading.Thread(target=self.write_batches, args=(parent, send_queue), daemon=True)
+            reader = threading.Thread(target=self.read_signals, args=(shard, parent), daemon=True)
+            writer.start()
+            reader.start()
+            self.send_queues.append(send_queue)
+            self.writers.append(writer)
+            self.readers.append(reader)
+
+    def shard(self, symbol):
+        shard = self.shard_of.get(symbol)
+        if shard is None:
+            shard = self.shard_of[symbol] = zlib.crc32(symbol.encode()) % self.shards
+        return shard
+
+    def on_bar(self, bar):
+        """Exit check now, indicators and entry check in the symbol's shard; returns the exit events"""
+        timestamp = to_ns(bar.timestamp)
+        # As in TradingEngine.on_bar, a bar that found a position open never triggers an entry
+        self.latest[bar.symbol] = (timestamp, bar, bar.symbol in self.engine.strategy.positions)
+        events = []
+        self.engine.strategy.update(bar)
+        self.engine.check_exit(bar, events)
+        outbox = self.outbox[self.shard(bar.symbol)]
+        outbox.append((bar.symbol, timestamp, bar.open, bar.high, bar.low, bar.close, bar.volume))
+        if len(outbox) >= self.max_batch:
+            self.flush()
+        elif not self.flush_scheduled:
+            self.flush_scheduled = True
+            self.loop.call_soon(self.flush)
+        return events
+
+    def flush(self):
+        self.flush_scheduled = False
+        for shard, outbox in enumerate(self.outbox):
+            if outbox:
+                self.send_queues[shard].put(outbox)
+                self.outbox[shard] = []
+
+    def write_batches(self, conn, send_queue):
+        """Writer thread: sends queued batches (None to shut the worker down) in order"""
+        while True:
+            batch = send_queue.get()
+            try:
+                conn.send(batch)
+            except OSError:
+                return  # the worker is gone; its reader reports it
+            if batch is None:
+                return
+
+    def read_signals(self, shard, conn):
+        while True:
+            try:
+                message = conn.recv()
+            except (EOFError, OSError):
+                if not self.stopping:
+                    self.loop.call_soon_threadsafe(self.on_worker_lost, shard)
+                return
+            self.loop.call_soon_threadsafe(self.on_signals, message)
+
+    def on_worker_lost(self, shard):
+        symbols = [symbol for symbol, owner in self.shard_of.items() if owner == shard]
+        self.error = RuntimeError(f"Shard {shard} worker exited unexpectedly (exit code "
+                                  f"{self.processes[shard].exitcode}); no entries for {', '.join(symbols)}")
+        print(f"Error: {self.error}")
+
+    def on_signals(self, signals):
+        strategy = self.engine.strategy
+        events = []
+        for symbol, timestamp, side in signals:
+            self.signals_received += 1
+            latest_timestamp, bar, held = self.latest[symbol]
+            if latest_timestamp != timestamp:
+                # A newer bar arrived while the shard was working; the signal no longer applies
+                self.signals_stale += 1
+                continue
+            if held:
+                continue
+            strategy.signals[symbol] = side
+            self.engine.check_entry(bar, events)
+        if events:
+            self.report(events)
+
+    async def stop(self):
+        """Flush and shut the workers down; raises `error` if a worker died along the way"""
+        self.flush()
+        self.stopping = True
+        for send_queue in self.send_queues:
+            send_queue.put(None)
+        for thread in self.writers + self.readers:
+            await asyncio.to_thread(thread.join)
+        # Let signals the readers queued before exiting reach the engine
+        await asyncio.sleep(0)
+        for process in self.processes:
+            process.join()
+        for conn in self.conns:
+            conn.close()
+        if self.error is not None:
+            raise self.error
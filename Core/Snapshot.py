@@ -0,0 +1,104 @@
+import asyncio
+import json
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from alpaca.data.requests import StockBarsRequest
+from alpaca.data.timeframe import TimeFrame
+
+from Core.BarBuffer import BUFFER_FIELDS
+
+SNAPSHOT_VERSION = 1
+
+
+def save_snapshot(path, state):
+    """Write `state` to `path` as compact JSON, atomically: a crash leaves the previous snapshot intact"""
+    path = Path(path)
+    tmp = path.with_suffix(path.suffix + '.tmp')
+    with open(tmp, 'w') as f:
+        json.dump({'version': SNAPSHOT_VERSION, 'saved_at': time.time(), **state}, f, separators=(',', ':'))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def load_snapshot(path):
+    """Return the snapshot at `path`, or None when there is none or it can't be used"""
+    path = Path(path)
+    if not path.exists():
+        return None
+    try:
+        with open(path) as f:
+            state = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable snapshot {path}: {e}")
+        return None
+    if state.get('version') != SNAPSHOT_VERSION:
+        print(f"Ignoring snapshot {path}: version {state.get('version')}, expected {SNAPSHOT_VERSION}")
+        return None
+    return state
+
+
+def fetch_missing_bars(client, starts, end=None):
+    """Minute bars each symbol missed, in one bulk historical request.
+
+    `starts` maps symbol -> timestamp of the last bar it has (bars strictly
+    after it are returned). The request spans the earliest of them to `end`
+    for all symbols at once; returns {symbol: (timestamps_ns, {field: array})}.
+    """
+    if not starts:
+        return {}
+    end = pd.Timestamp(end or datetime.now(timezone.utc))
+    first = min(pd.Timestamp(start) for start in starts.values())
+    request = StockBarsRequest(
+        symbol_or_symbols=list(starts),
+        start=(first + timedelta(minutes=1)).floor('min').to_pydatetime(),
+        end=end.to_pydatetime(),
+        timeframe=TimeFrame.Minute
+    )
+    bars = client.get_stock_bars(request).df
+    missing = {}
+    if bars.empty:
+        return missing
+    bars = bars.reset_index()
+    bars['timestamp'] = pd.to_datetime(bars['timestamp'], utc=True)
+    for symbol, frame in bars.groupby('symbol', sort=False):
+        if symbol not in starts:
+            continue
+        frame = frame[frame['timestamp'] > pd.Timestamp(starts[symbol])].sort_values('timestamp')
+        timestamps = frame['timestamp'].to_numpy(dtype='datetime64[ns]').view(np.int64)
+        missing[symbol] = (timestamps, {field: frame[field].to_numpy(dtype=np.float64) for field in BUFFER_FIELDS})
+    return missing
+
+
+def reconcile_positions(positions, broker_positions):
+    """Keep only the snapshot positions the broker still holds on the same side.
+
+    `broker_positions` are alpaca Position objects (TradingClient.get_all_positions).
+    A position closed after the last snapshot would otherwise come back as open
+    and get a second closing order. Quantities shrink to what the broker holds.
+    Returns (kept, dropped symbols).
+    """
+    held = {}
+    for position in broker_positions:
+        side = str(getattr(position.side, 'value', position.side)).lower()
+        held[position.symbol] = ('BUY' if side == 'long' else 'SELL', abs(float(position.qty)))
+    kept, dropped = {}, []
+    for symbol, pos in positions.items():
+        side, qty = held.get(symbol, (None, 0.0))
+        if side != pos['side'] or qty <= 0:
+            dropped.append(symbol)
+            continue
+        kept[symbol] = {**pos, 'qty': min(pos['qty'], qty)}
+    return kept, dropped
+
+
+async def snapshot_loop(path, build_state, interval=30.0):
+    """Every `interval` seconds take build_state() on the event loop and write it from a worker thread"""
+    while True:
+        await asyncio.sleep(interval)
+        await asyncio.to_thread(save_snapshot, path, build_state())
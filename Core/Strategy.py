@@ -0,0 +1,167 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from Core.BarBuffer import BUFFER_FIELDS, BarBuffer, to_ns
+from Core.Indicators import IndicatorSet
+
+DEFAULT_CONFIG = {
+    "take_profit_pct": 0.0025,
+    "stop_loss_pct": 0.0015,
+    "max_hold_minutes": 8,
+    "rsi_buy_threshold": 35,
+    "rsi_sell_threshold": 56,
+    "position_size_pct": 0.01,
+    "max_open_positions": None
+}
+
+
+class ScalpingStrategy:
+    """The RSI / MACD / EMA-trend scalping rules, shared by every bot and the backtester.
+
+    The strategy only decides: it keeps per-symbol indicators and open positions,
+    says when to enter or exit, and books trades it is told were filled. Orders
+    are placed by whichever broker adapter drives it.
+    """
+
+    def __init__(self, config=None, symbols=(), warmup_bars=50, history_bars=100):
+        self.config = dict(DEFAULT_CONFIG)
+        self.config.update(config or {})
+        self.warmup_bars = warmup_bars
+        self.history_bars = history_bars
+        self.indicators = {symbol: IndicatorSet(warmup_bars=warmup_bars) for symbol in symbols}
+        # Recent OHLCV per symbol in fixed-size ring buffers, preallocated so memory stays flat
+        self.bars = {symbol: BarBuffer(history_bars) for symbol in symbols}
+        # Optional Core.Latency.LatencyRecorder; None keeps update() free of timing calls
+        self.latency = None
+        self.last_price = {}
+        self.positions = {}
+
+    def update(self, bar):
+        symbol = bar.symbol
+        if symbol not in self.indicators:
+            self.indicators[symbol] = IndicatorSet(warmup_bars=self.warmup_bars)
+            self.bars[symbol] = BarBuffer(self.history_bars)
+        if self.latency is None:
+            self.bars[symbol].append_bar(bar)
+            self.indicators[symbol].update(bar.close)
+        else:
+            started = time.perf_counter()
+            self.bars[symbol].append_bar(bar)
+            self.latency.record('buffer_append', symbol, time.perf_counter() - started)
+            self.indicators[symbol].update_timed(bar.close, self.latency, symbol)
+        self.last_price[symbol] = bar.close
+
+    def backfill(self, symbol, timestamps, columns):
+        """Catch `symbol` up on bars it missed: one bulk buffer append, then the indicators bar by bar"""
+        if symbol not in self.indicators:
+            self.indicators[symbol] = IndicatorSet(warmup_bars=self.warmup_bars)
+            self.bars[symbol] = BarBuffer(self.history_bars)
+        closes = np.asarray(columns['close'], dtype=np.float64)
+        if len(closes) == 0:
+            return
+        self.bars[symbol].extend(timestamps, columns)
+        indicators = self.indicators[symbol]
+        for price in closes.tolist():
+            indicators.update(price)
+        self.last_price[symbol] = closes[-1]
+
+    def backfill_bars(self, bars):
+        """Backfill from time-ordered Bars of any symbols; indicators only, no entry or exit checks"""
+        by_symbol = {}
+        for bar in bars:
+            by_symbol.setdefault(bar.symbol, []).append(bar)
+        for symbol, symbol_bars in by_symbol.items():
+            timestamps = np.array([to_ns(bar.timestamp) for bar in symbol_bars], dtype=np.int64)
+            columns = {field: np.array([getattr(bar, field) for bar in symbol_bars], dtype=np.float64)
+                       for field in BUFFER_FIELDS}
+            self.backfill(symbol, timestamps, columns)
+
+    def to_dict(self):
+        """Bar buffers, indicator state and open positions as JSON-ready values, for warm restarts"""
+        return {
+            'bars': {symbol: buffer.to_dict() for symbol, buffer in self.bars.items() if len(buffer)},
+            'indicators': {symbol: indicators.to_dict() for symbol, indicators in self.indicators.items()},
+            'positions': {symbol: {**pos, 'entry_time': pd.Timestamp(pos['entry_time']).isoformat()}
+                          for symbol, pos in self.positions.items()},
+            'last_price': {symbol: float(price) for symbol, price in self.last_price.items()}
+        }
+
+    def restore(self, state):
+        """Load a to_dict() snapshot; positions keep their original entry times, so exit timers carry on"""
+        for symbol, buffer in state.get('bars', {}).items():
+            self.bars[symbol] = BarBuffer.from_dict(buffer)
+        for symbol, indicators in state.get('indicators', {}).items():
+            self.indicators[symbol] = IndicatorSet.from_dict(indicators)
+        for symbol, pos in state.get('positions', {}).items():
+            self.positions[symbol] = {**pos, 'entry_time': pd.Timestamp(pos['entry_time'])}
+        self.last_price.update(state.get('last_price', {}))
+
+    def entry_signal(self, symbol):
+        """Return 'BUY', 'SELL' or None for the latest bar of `symbol`"""
+        if symbol in self.positions or not self.indicators[symbol].ready:
+            return None
+        limit = self.config.get('max_open_positions')
+        if limit is not None and len(self.positions) >= limit:
+            return None
+        rsi, macd, signal, trend = self.indicators[symbol].values()
+        if None in (rsi, macd, signal, trend):
+            return None
+        if rsi < self.config['rsi_buy_threshold'] and macd > signal and trend == 'up':
+            return 'BUY'
+        if rsi > self.config['rsi_sell_threshold'] and macd < signal and trend == 'down':
+            return 'SELL'
+        return None
+
+    def position_size(self, buying_power, price):
+        return buying_power * self.config['position_size_pct'] / price
+
+    def open_position(self, symbol, side, price, qty, timestamp, order_id=None):
+        self.positions[symbol] = {
+            'entry_time': timestamp,
+            'entry_price': price,
+            'side': side,
+            'qty': qty,
+            'order_id': order_id
+        }
+
+    def exit_signal(self, symbol, price, timestamp):
+        """Return 'take_profit', 'stop_loss', 'max_hold' or None for an open position"""
+        pos = self.positions.get(symbol)
+        if pos is None:
+            return None
+        pnl = (price - pos['entry_price']) * pos['qty']
+        if pos['side'] == 'SELL':
+            pnl *= -1
+        if pnl >= pos['entry_price'] * self.config['take_profit_pct'] * pos['qty']:
+            return 'take_profit'
+        if pnl <= -pos['entry_price'] * self.config['stop_loss_pct'] * pos['qty']:
+            return 'stop_loss'
+        if self.elapsed_minutes(pos, timestamp) >= self.config['max_hold_minutes']:
+            return 'max_hold'
+        return None
+
+    def close_position(self, symbol, price, timestamp, reason, order_id=None):
+        """Remove the position and return its trade record"""
+        pos = self.positions.pop(symbol)
+        pnl = (price - pos['entry_price']) * pos['qty']
+        if pos['side'] == 'SELL':
+            pnl *= -1
+        return {
+            'symbol': symbol,
+            'side': pos['side'],
+            'entry_time': pos['entry_time'],
+            'exit_time': timestamp,
+            'entry_price': pos['entry_price'],
+            'exit_price': price,
+            'qty': pos['qty'],
+            'elapsed_minutes': self.elapsed_minutes(pos, timestamp),
+            'pnl': pnl,
+            'reason': reason,
+            'entry_order_id': pos['order_id'],
+            'exit_order_id': order_id
+        }
+
+    def elapsed_minutes(self, pos, timestamp):
+        return (timestamp - pos['entry_time']).total_seconds() / 60
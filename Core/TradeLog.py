@@ -0,0 +1,170 @@
+import asyncio
+import csv
+import os
+import time
+from collections import deque
+from datetime import datetime, timezone
+from pathlib import Path
+
+JOURNAL_HEADER = [
+    "event", "timestamp", "symbol", "side", "quantity", "entry_price", "exit_price",
+    "elapsed_minutes", "pnl", "reason", "order_id", "exit_order_id",
+    "broker_order_id", "status", "error", "latency"
+]
+
+
+def print_event(event):
+    """Console line for an engine entry/exit event, in the bots' [ENTRY]/[EXIT] format"""
+    if event['type'] == 'entry_rejected':
+        print(f"[REJECTED] {event['symbol']} | order {event['order_id']} | {event['error']}")
+    elif event['type'] == 'exit_rejected':
+        state = 'position restored' if event['restored'] else 'symbol already re-entered'
+        print(f"[EXIT REJECTED] {event['symbol']} | order {event['exit_order_id']} | {state} | {event['error']}")
+    elif event['type'] == 'entry':
+        print(f"[ENTRY] {event['symbol']} | {event['side']} {event['qty']} @ {event['price']:.2f} | "
+              f"Time: {event['timestamp'].strftime('%H:%M:%S')} UTC")
+    else:
+        closing_side = 'SELL' if event['side'] == 'BUY' else 'BUY'
+        pnl = event['pnl']
+        print(f"[EXIT] {event['symbol']} | {closing_side} {event['qty']} @ {event['exit_price']:.2f} | "
+              f"Entry: {event['entry_price']:.2f} | Elapsed: {event['elapsed_minutes']:.1f}m | "
+              f"PnL: {'+' if pnl >= 0 else ''}{pnl:.2f}")
+
+
+class TradeJournal:
+    """Session trade journal: entries, exits and order acks, flushed in batches off the event loop.
+
+    `record()` only queues the event, so the hot path never touches the disk. A
+    background task writes whatever has queued every `flush_interval` seconds
+    (or as soon as `max_batch` records are waiting) in a worker thread, and
+    fsyncs at most every `fsync_interval` seconds. Each session gets its own
+    file, `<prefix>_<YYYYmmdd_HHMMSS>.csv`, under `folder`.
+
+    A batch that fails to write goes back on the queue. The background task
+    logs the error and stops; close() still writes what is queued and then
+    raises the writer's error.
+    """
+
+    def __init__(self, folder=".", prefix="live_trades", flush_interval=1.0, fsync_interval=5.0,
+                 max_batch=500, session=None):
+        self.folder = Path(folder)
+        self.session = session or datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')
+        self.path = self.folder / f"{prefix}_{self.session}.csv"
+        self.flush_interval = flush_interval
+        self.fsync_interval = fsync_interval
+        self.max_batch = max_batch
+        self.pending = deque()
+        self.file = None
+        self.task = None
+        self.wake = None
+        self.stopping = False
+        self.last_fsync = 0.0
+        self.written = 0
+
+    def record(self, event):
+        self.pending.append(event)
+        if self.wake is not None and len(self.pending) >= self.max_batch:
+            self.wake.set()
+
+    async def start(self):
+        self.folder.mkdir(parents=True, exist_ok=True)
+        new_file = not self.path.exists()
+        self.file = open(self.path, mode='a', newline='')
+        if new_file:
+            csv.writer(self.file).writerow(JOURNAL_HEADER)
+        self.wake = asyncio.Event()
+        self.stopping = False
+        self.task = asyncio.create_task(self.run())
+
+    async def run(self):
+        while not self.stopping:
+            try:
+                await asyncio.wait_for(self.wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self.wake.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"Error writing trade journal {self.path}: {e}")
+                raise
+
+    async def flush(self, fsync=False):
+        """Write everything queued so far; fsync if forced or the cadence is due.
+
+        On failure the batch is put back at the front of the queue and the error re-raised.
+        """
+        events = []
+        while self.pending:
+            events.append(self.pending.popleft())
+        now = time.monotonic()
+        fsync = fsync or now - self.last_fsync >= self.fsync_interval
+        if not events and not fsync:
+            return
+        try:
+            await asyncio.to_thread(self.write, [journal_row(event) for event in events], fsync)
+        except BaseException:
+            self.pending.extendleft(reversed(events))
+            raise
+        if fsync:
+            self.last_fsync = now
+
+    def write(self, rows, fsync):
+        if rows:
+            csv.writer(self.file).writerows(rows)
+            self.written += len(rows)
+        self.file.flush()
+        if fsync:
+            os.fsync(self.file.fileno())
+
+    async def close(self):
+        error = None
+        if self.task is not None:
+            # Let the writer finish the batch it may be writing in its thread, rather than
+            # cancelling it and racing that write with the final flush below
+            self.stopping = True
+            self.wake.set()
+            try:
+                await self.task
+            except Exception as e:
+                error = e
+            self.task = None
+        if self.file is not None:
+            try:
+                await self.flush(fsync=True)
+            finally:
+                self.file.close()
+                self.file = None
+        if error is not None:
+            raise error
+
+
+def journal_row(event):
+    """Flatten an engine event or broker ack into one JOURNAL_HEADER row"""
+    kind = event['type']
+    if kind == 'exit':
+        timestamp = event['exit_time']
+        entry_price = event['entry_price']
+    else:
+        timestamp = event.get('timestamp') or datetime.now(timezone.utc)
+        entry_price = event.get('price')
+    pnl = event.get('pnl')
+    elapsed = event.get('elapsed_minutes')
+    return [
+        kind,
+        timestamp.isoformat(),
+        event['symbol'],
+        event.get('side'),
+        event.get('qty'),
+        entry_price,
+        event.get('exit_price'),
+        None if elapsed is None else round(elapsed, 2),
+        None if pnl is None else round(pnl, 2),
+        event.get('reason'),
+        event.get('entry_order_id', event.get('order_id')),
+        event.get('exit_order_id'),
+        event.get('broker_order_id'),
+        event.get('status'),
+        event.get('error'),
+        event.get('latency')
+    ]
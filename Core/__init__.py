@@ -0,0 +1 @@
+"""Shared building blocks used by the live bots and the backtester."""
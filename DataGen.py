@@ -1,28 +1,148 @@
 from alpaca.data.historical import StockHistoricalDataClient
 from alpaca.data.requests import StockBarsRequest
 from alpaca.data.timeframe import TimeFrame
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
 import pandas as pd
+from Core.BarStore import BarStore
 
 API_KEY = "Enter Your Own Key"
 API_SECRET="Enter Your Own Key"
 
-
-client = StockHistoricalDataClient(API_KEY, API_SECRET)
-
 symbols = ['TSLA', 'AAPL', 'NVDA']
 start = datetime(2025, 4,28)
 end = datetime(2025,4,30)# adjust to any date range you want
 
-for symbol in symbols:
+
+MINUTE_NS = 60 * 10 ** 9
+# Segments a symbol may collect across runs before they are folded back into its base
+COMPACT_SEGMENTS = 16
+
+
+def to_ns(value):
+    timestamp = pd.Timestamp(value)
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.tz_localize('UTC')  # Alpaca treats naive datetimes as UTC
+    return timestamp.tz_convert('UTC').as_unit('ns').value
+
+
+def plan_downloads(store, symbols, start, end, chunk_days=5):
+    """Split [start, end) into date chunks per symbol, skipping ranges the store already covers"""
+    start_ns, end_ns, step = to_ns(start), to_ns(end), int(timedelta(days=chunk_days).total_seconds() * 1e9)
+    tasks = []
+    for symbol in symbols:
+        missing = [(start_ns, end_ns)]
+        for covered_start, covered_end in store.coverage(symbol):
+            missing = [
+                piece
+                for gap_start, gap_end in missing
+                for piece in ((gap_start, min(gap_end, covered_start)), (max(gap_start, covered_end), gap_end))
+                if piece[0] < piece[1]
+            ]
+        for gap_start, gap_end in missing:
+            for chunk_start in range(gap_start, gap_end, step):
+                tasks.append((symbol, chunk_start, min(chunk_start + step, gap_end)))
+    return tasks
+
+
+def fetch_chunk(client, symbol, chunk_start, chunk_end):
     request = StockBarsRequest(
         symbol_or_symbols=symbol,
-        start=start,
-        end=end,
+        start=pd.Timestamp(chunk_start, tz='UTC').to_pydatetime(),
+        end=pd.Timestamp(chunk_end, tz='UTC').to_pydatetime(),
         timeframe=TimeFrame.Minute
     )
     bars = client.get_stock_bars(request).df
-    df = bars[bars.index.get_level_values(0) == symbol].reset_index()
-    df.rename(columns={'timestamp': 'timestamp'}, inplace=True)
-    df.to_csv(f"minute_{symbol.lower()}.csv", index=False)
-    print(f"Saved: minute_{symbol.lower()}.csv")
\ No newline at end of file
+    if bars.empty:
+        return bars
+    return bars[bars.index.get_level_values(0) == symbol].reset_index()
+
+
+def download_history(client, store, symbols, start, end, max_workers=4, chunk_days=5, settle_minutes=15,
+                     compact_segments=COMPACT_SEGMENTS):
+    """Fetch every missing (symbol, chunk) concurrently and append it to the store.
+
+    Each chunk is recorded in the store's coverage only after its bars are written,
+    so an interrupted run simply picks up the chunks that never completed. Chunks
+    land as store segments; a symbol is compacted (its whole history rewritten)
+    only once it has `compact_segments` of them, so frequent small top-ups stay cheap.
+
+    `end` is clamped to now. The provider may still be publishing the last
+    `settle_minutes`, so a chunk reaching into them is only marked covered up
+    to its last bar received and the rest is fetched again next run.
+    """
+    now = datetime.now(timezone.utc)
+    end = min(to_ns(end), to_ns(now))
+    settled = to_ns(now - timedelta(minutes=settle_minutes))
+    tasks = plan_downloads(store, symbols, start, end, chunk_days)
+    print(f"{len(tasks)} chunks to download for {len(symbols)} symbols")
+    failed = []
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(fetch_chunk, client, *task): task for task in tasks}
+        # Writes happen here on the calling thread, so a symbol is never written concurrently
+        for future in as_completed(futures):
+            symbol, chunk_start, chunk_end = futures[future]
+            try:
+                df = future.result()
+            except Exception as e:
+                print(f"Error fetching {symbol} {pd.Timestamp(chunk_start, tz='UTC')}: {e}")
+                failed.append(futures[future])
+                continue
+            if not df.empty:
+                store.append(symbol, df)
+            if chunk_end > settled:
+                last_bar = to_ns(df['timestamp'].max()) + MINUTE_NS if not df.empty else chunk_start
+                chunk_end = min(chunk_end, max(last_bar, settled))
+            if chunk_end > chunk_start:
+                store.mark_covered(symbol, chunk_start, chunk_end)
+    for symbol in symbols:
+        if len(store.manifest(symbol)['segments']) >= compact_segments:
+            store.compact(symbol)
+    return failed
+
+
+def csv_rows_and_last_timestamp(path):
+    """Data row count and last timestamp of a CSV written by export_csv, without parsing the whole file"""
+    with open(path, 'rb') as f:
+        header = f.readline().decode().rstrip().split(',')
+        rows = 0
+        tail = b''
+        for block in iter(lambda: f.read(1 << 20), b''):
+            rows += block.count(b'\n')
+            tail = (tail + block)[-4096:]
+    if rows == 0:
+        return 0, None
+    last = tail.rstrip().rsplit(b'\n', 1)[-1].decode().split(',')
+    return rows, pd.Timestamp(last[header.index('timestamp')])
+
+
+def export_csv(store, symbol, folder="."):
+    """Bring minute_<symbol>.csv up to date with the store, appending only bars it does not have yet.
+
+    The file is rewritten in full only when the store gained bars before its
+    last row, i.e. a gap earlier in the history was filled.
+    """
+    path = Path(folder) / f"minute_{symbol.lower()}.csv"
+    frame = store.load_frame(symbol)
+    if path.exists():
+        rows, last = csv_rows_and_last_timestamp(path)
+        new = frame[frame['timestamp'] > last] if last is not None else frame
+        if len(frame) - len(new) == rows:
+            new.to_csv(path, mode='a', header=False, index=False)
+            print(f"Appended {len(new)} bars to {path.name}")
+            return
+    frame.to_csv(path, index=False)
+    print(f"Saved: {path.name}")
+
+
+if __name__ == "__main__":
+    client = StockHistoricalDataClient(API_KEY, API_SECRET)
+    store = BarStore("bars")  # columnar, memory-mappable copy read by the backtester
+
+    failed = download_history(client, store, symbols, start, end)
+    for symbol in symbols:
+        if store.has(symbol):
+            export_csv(store, symbol)
+    if failed:
+        print(f"{len(failed)} chunks failed; run again to resume")
\ No newline at end of file
@@ -0,0 +1,35 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(ROOT))
+sys.path.append(str(ROOT / "BackTesting"))
+sys.path.append(str(ROOT / "Code"))
+
+from Core.Fakes import synthetic_bars
+
+SYMBOLS = ['TSLA', 'AAPL', 'NVDA']
+
+
+def write_minute_csvs(folder, start, end, drop=0.0, seed=0):
+    """minute_<symbol>.csv files of synthetic bars, with a fraction `drop` of the minutes removed"""
+    rng = np.random.default_rng(seed)
+    for i, symbol in enumerate(SYMBOLS):
+        frame = synthetic_bars(symbol, start, end, start_price=100.0 + 50 * i)
+        frame = frame[rng.random(len(frame)) >= drop]
+        frame.drop(columns='symbol').to_csv(folder / f"minute_{symbol.lower()}.csv", index=False)
+    return folder
+
+
+@pytest.fixture(scope="session")
+def dense_data(tmp_path_factory):
+    return write_minute_csvs(tmp_path_factory.mktemp("dense"), "2024-03-04", "2024-03-06")
+
+
+@pytest.fixture(scope="session")
+def sparse_data(tmp_path_factory):
+    """Symbols miss 40% of their minutes, so missing-bar handling matters"""
+    return write_minute_csvs(tmp_path_factory.mktemp("sparse"), "2024-03-04", "2024-03-06", drop=0.4)
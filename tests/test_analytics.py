@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from Core.Analytics import NS_PER_DAY, NS_PER_MINUTE, equity_curve, ledger_metrics
+from Core.Lifecycle import TRADE_DTYPE
+
+START = 1_709_562_600 * 10 ** 9
+CAPITAL = 10_000.0
+
+
+def random_ledger(seed, n):
+    rng = np.random.default_rng(seed)
+    ledger = np.zeros(n, dtype=TRADE_DTYPE)
+    ledger['symbol'] = rng.integers(0, 3, n)
+    ledger['entry_index'] = np.sort(rng.integers(0, 2000, n))
+    # Exits settle out of entry order, with ties
+    ledger['exit_index'] = ledger['entry_index'] + rng.integers(1, 30, n) // 3 * 3
+    ledger['entry_time'] = START + ledger['entry_index'] * NS_PER_MINUTE * 5
+    ledger['exit_time'] = START + ledger['exit_index'] * NS_PER_MINUTE * 5
+    ledger['pnl'] = np.round(rng.normal(0.5, 20.0, n), 2)
+    return ledger
+
+
+def reference_metrics(ledger, n_days, periods_per_year=252):
+    """The same statistics for one ledger, one trade at a time"""
+    settled = sorted(range(len(ledger)), key=lambda i: (ledger['exit_index'][i], i))
+    equity, peak, drawdown = CAPITAL, CAPITAL, 0.0
+    for i in settled:
+        equity += ledger['pnl'][i]
+        peak = max(peak, equity)
+        drawdown = max(drawdown, (peak - equity) / peak)
+    daily = {}
+    for trade in ledger:
+        day = trade['exit_time'] // NS_PER_DAY
+        daily[day] = daily.get(day, 0.0) + trade['pnl'] / CAPITAL
+    returns = np.zeros(max(n_days, 2))
+    returns[:len(daily)] = list(daily.values())
+    std = returns.std(ddof=1)
+    pnl = ledger['pnl']
+    wins, losses = pnl[pnl > 0], pnl[pnl <= 0]
+    gross_loss = -pnl[pnl < 0].sum()
+    holds = (ledger['exit_time'] - ledger['entry_time']) / NS_PER_MINUTE
+    return {
+        'trades': len(ledger),
+        'wins': len(wins),
+        'pnl': pnl.sum(),
+        'profit_factor': wins.sum() / gross_loss if gross_loss > 0 else np.inf if len(wins) else 0.0,
+        'avg_win': wins.mean() if len(wins) else 0.0,
+        'avg_loss': losses.mean() if len(losses) else 0.0,
+        'max_drawdown': drawdown,
+        'sharpe': returns.mean() / std * np.sqrt(periods_per_year) if std > 0 else 0.0,
+        'mean_hold_minutes': holds.mean(),
+        'median_hold_minutes': np.median(holds),
+    }
+
+
+def test_ledger_metrics_match_a_per_ledger_reference():
+    ledgers = [random_ledger(seed, n) for seed, n in enumerate((40, 1, 250, 7))]
+    n_days = 12
+    metrics = ledger_metrics(ledgers, CAPITAL, n_days=n_days)
+    assert len(metrics) == len(ledgers)
+    for row, ledger in zip(metrics.to_dict('records'), ledgers):
+        expected = reference_metrics(ledger, n_days)
+        for key, value in expected.items():
+            assert row[key] == pytest.approx(value, rel=1e-9, abs=1e-12), key
+
+
+def test_empty_ledgers_get_zero_rows():
+    ledgers = [np.zeros(0, dtype=TRADE_DTYPE), random_ledger(3, 5)]
+    metrics = ledger_metrics(ledgers, CAPITAL)
+    empty = metrics.iloc[0]
+    assert empty['trades'] == 0
+    assert (empty[['pnl', 'max_drawdown', 'sharpe', 'win_rate', 'profit_factor', 'median_hold_minutes']] == 0).all()
+    assert metrics.iloc[1]['trades'] == 5
+    assert ledger_metrics([], CAPITAL).empty
+
+
+def test_equity_curve_is_running_capital_in_settlement_order():
+    ledger = random_ledger(7, 60)
+    curve = equity_curve(ledger, CAPITAL)
+    settled = sorted(range(len(ledger)), key=lambda i: (ledger['exit_index'][i], i))
+    assert curve['timestamp'].tolist() == ledger['exit_time'][settled].tolist()
+    capital = CAPITAL
+    for point, i in zip(curve['equity'], settled):
+        capital += ledger['pnl'][i]
+        assert point == capital
+    assert np.all(np.diff(curve['timestamp']) >= 0)
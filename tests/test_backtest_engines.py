@@ -0,0 +1,49 @@
+import pytest
+
+from Core.FillModel import FillModel
+from Multiple_BackTests import BacktestScalpingBot
+
+COUNTERS = ('trades', 'wins', 'losses')
+
+
+@pytest.mark.parametrize("data, missing_bars", [
+    ("dense_data", "skip"), ("sparse_data", "skip"), ("sparse_data", "ffill")
+])
+def test_vectorized_engine_matches_loop(request, tmp_path, data, missing_bars):
+    folder = request.getfixturevalue(data)
+    bot = BacktestScalpingBot(folder, missing_bars=missing_bars, bar_store=tmp_path / "bars")
+    for config in bot.strategies:
+        loop = bot.run_backtest_for_strategy(config, engine="loop")
+        vectorized = bot.run_backtest_for_strategy(config, engine="vectorized")
+        assert loop['trades'] > 0
+        for key in COUNTERS:
+            assert vectorized[key] == loop[key], (config['name'], key)
+        assert vectorized['pnl'] == pytest.approx(loop['pnl'], rel=1e-9, abs=1e-9)
+        assert vectorized['capital'] == pytest.approx(loop['capital'], rel=1e-12)
+
+
+def test_portfolio_engine_matches_vectorized_with_capital_sizing(sparse_data, tmp_path):
+    bot = BacktestScalpingBot(sparse_data, bar_store=tmp_path / "bars")
+    for config in bot.strategies:
+        vectorized = bot.run_backtest_for_strategy(config, engine="vectorized")
+        portfolio = bot.run_backtest_for_strategy(config, engine="portfolio")
+        for key in COUNTERS:
+            assert portfolio[key] == vectorized[key], (config['name'], key)
+        assert portfolio['pnl'] == pytest.approx(vectorized['pnl'], rel=1e-9, abs=1e-9)
+        assert portfolio['equity'][-1] == pytest.approx(portfolio['capital'], rel=1e-12)
+
+
+def test_portfolio_buying_power_sizing_rounds_qty_like_live_orders(sparse_data, tmp_path):
+    bot = BacktestScalpingBot(sparse_data, bar_store=tmp_path / "bars")
+    # 0.00001 of buying power is under a hundredth of a share, which the live adapters round to nothing
+    config = dict(bot.strategies[0], sizing='buying_power', position_size_pct=0.00001)
+    assert bot.run_backtest_for_strategy(config, engine="portfolio")['trades'] == 0
+    unrounded = bot.run_backtest_for_strategy(dict(config, qty_decimals=None), engine="portfolio")
+    assert unrounded['trades'] > 0
+
+
+@pytest.mark.parametrize("engine", ["loop", "event", "portfolio", "streaming"])
+def test_engines_without_intrabar_fills_reject_a_fill_model(dense_data, tmp_path, engine):
+    bot = BacktestScalpingBot(dense_data, bar_store=tmp_path / "bars", fill_model=FillModel())
+    with pytest.raises(ValueError, match="does not take a fill model"):
+        bot.run_backtest_for_strategy(bot.strategies[0], engine=engine)
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from Core.BarBuffer import BarBuffer
+
+START = pd.Timestamp('2024-03-04 14:30', tz='UTC')
+
+
+def filled(n, capacity=5):
+    buffer = BarBuffer(capacity)
+    for k in range(n):
+        buffer.append(START + pd.Timedelta(minutes=k), k, k + 0.5, k - 0.5, float(k), 100 + k)
+    return buffer
+
+
+@pytest.mark.parametrize("n", [0, 3, 5, 12])
+def test_latest_is_the_last_capacity_bars_oldest_first(n):
+    buffer = filled(n)
+    kept = list(range(max(0, n - 5), n))
+    assert len(buffer) == len(kept)
+    np.testing.assert_array_equal(buffer.latest(), kept)
+    np.testing.assert_array_equal(buffer.latest('volume', 2), [100 + k for k in kept[-2:]])
+    assert buffer.latest('close', 50).size == len(kept)
+    assert buffer.last_timestamp() == (START + pd.Timedelta(minutes=n - 1) if n else None)
+
+
+def test_latest_is_a_read_only_view():
+    buffer = filled(7)
+    view = buffer.latest()
+    with pytest.raises(ValueError):
+        view[0] = 1.0
+    buffer.append(START, 0, 0, 0, 99.0, 0)
+    assert buffer.last() == 99.0
+
+
+def test_missing_trailing_fields_become_nan():
+    buffer = BarBuffer(3)
+    buffer.append(START, 1.0, 2.0)
+    assert buffer.last('high') == 2.0
+    assert np.isnan(buffer.last('close'))
+
+
+@pytest.mark.parametrize("existing, added", [(0, 3), (2, 2), (4, 9)])
+def test_extend_matches_appending_one_by_one(existing, added):
+    appended = filled(existing + added)
+    extended = filled(existing)
+    steps = np.arange(existing, existing + added)
+    timestamps = (START + pd.to_timedelta(steps, unit='min')).as_unit('ns').asi8
+    extended.extend(timestamps, {'open': steps, 'high': steps + 0.5, 'low': steps - 0.5,
+                                 'close': steps.astype(float), 'volume': 100 + steps})
+    for field in ('timestamp',) + appended.fields:
+        np.testing.assert_array_equal(extended.latest(field), appended.latest(field))
+
+
+def test_dict_round_trip_keeps_order_after_wrap_around():
+    buffer = filled(8)
+    restored = BarBuffer.from_dict(buffer.to_dict())
+    assert restored.capacity == buffer.capacity
+    for field in ('timestamp',) + buffer.fields:
+        np.testing.assert_array_equal(restored.latest(field), buffer.latest(field))
+    restored.append(START + pd.Timedelta(minutes=8), 8, 8, 8, 8.0, 108)
+    np.testing.assert_array_equal(restored.latest(), [4, 5, 6, 7, 8])
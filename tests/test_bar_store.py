@@ -0,0 +1,102 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from Core.BarStore import BAR_FIELDS, BarStore, convert_csv_folder, frame_to_columns
+from Core.Fakes import synthetic_bars
+from conftest import SYMBOLS
+
+
+@pytest.fixture
+def bars():
+    return synthetic_bars("AAPL", "2024-03-04", "2024-03-07")
+
+
+def assert_columns_equal(actual, expected):
+    for name in ('timestamp',) + BAR_FIELDS:
+        np.testing.assert_array_equal(actual[name], expected[name], err_msg=name)
+
+
+def test_write_and_memory_mapped_load_round_trip(tmp_path, bars):
+    store = BarStore(tmp_path)
+    store.write("aapl", bars)
+    assert store.symbols() == ["AAPL"] and store.has("AAPL")
+    loaded = store.load("AAPL")
+    assert isinstance(loaded['close'], np.memmap)
+    assert not loaded['close'].flags.writeable
+    assert_columns_equal(loaded, frame_to_columns(bars))
+    frame = store.load_frame("AAPL")
+    assert (frame['timestamp'] == bars['timestamp']).all()
+    assert (frame['symbol'] == "AAPL").all()
+
+
+def test_segments_merge_sorted_with_newest_bars_winning(tmp_path, bars):
+    store = BarStore(tmp_path)
+    columns = frame_to_columns(bars)
+    first, second = len(bars) // 2, len(bars) // 2 - 30
+    store.write("AAPL", {name: values[:first] for name, values in columns.items()})
+    # Appended out of order and overlapping the base by 30 bars, with revised closes for the overlap
+    revised = {name: values[second:].copy() for name, values in columns.items()}
+    revised['close'][:30] += 1.0
+    store.append("AAPL", {name: values[len(values) // 2:] for name, values in revised.items()})
+    store.append("AAPL", {name: values[:len(values) // 2] for name, values in revised.items()})
+    assert store.manifest("AAPL")['segments'] == ['seg-000001', 'seg-000002']
+
+    expected = {name: np.concatenate([values[:second], revised[name]]) for name, values in columns.items()}
+    merged = store.load("AAPL")
+    assert_columns_equal(merged, expected)
+    assert not merged['close'].flags.writeable
+
+    store.compact("AAPL")
+    manifest = store.manifest("AAPL")
+    assert manifest['segments'] == [] and manifest['base'] == 'base-000003'
+    assert isinstance(store.load("AAPL")['close'], np.memmap)
+    assert_columns_equal(store.load("AAPL"), expected)
+    # Superseded column sets are removed once the manifest no longer names them
+    assert sorted(path.name for path in (tmp_path / "AAPL").iterdir() if path.is_dir()) == ['base-000003']
+
+
+def test_a_write_that_never_committed_is_invisible(tmp_path, bars):
+    store = BarStore(tmp_path)
+    store.write("AAPL", bars)
+    before = store.load("AAPL")['close'].copy()
+    # A crash after the new set was written but before the manifest swap
+    manifest = store.manifest("AAPL")
+    store.write_set("AAPL", 'seg', manifest, frame_to_columns(bars.head(10)))
+    np.testing.assert_array_equal(store.load("AAPL")['close'], before)
+    # The next commit reuses the number and cleans up
+    store.append("AAPL", bars.tail(5))
+    assert len(store.load("AAPL")['timestamp']) == len(bars)
+
+
+def test_mismatched_columns_and_missing_symbols_are_errors(tmp_path, bars):
+    store = BarStore(tmp_path)
+    with pytest.raises(FileNotFoundError):
+        store.load("MSFT")
+    store.write("AAPL", bars)
+    base = tmp_path / "AAPL" / store.manifest("AAPL")['base']
+    np.save(base / "close.npy", np.zeros(3))
+    with pytest.raises(ValueError, match="Column lengths differ"):
+        store.load("AAPL")
+
+
+def test_coverage_ranges_merge(tmp_path):
+    store = BarStore(tmp_path)
+    assert store.coverage("AAPL") == []
+    store.mark_covered("AAPL", 10, 20)
+    store.mark_covered("AAPL", 30, 40)
+    store.mark_covered("AAPL", 20, 25)
+    assert store.coverage("AAPL") == [(10, 25), (30, 40)]
+    assert json.loads((tmp_path / "AAPL" / "coverage.json").read_text()) == [[10, 25], [30, 40]]
+
+
+def test_convert_csv_folder_matches_the_csvs(tmp_path, dense_data):
+    store = BarStore(tmp_path / "bars")
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr("builtins.print", lambda *args, **kwargs: None)
+        assert sorted(convert_csv_folder(dense_data, store)) == sorted(SYMBOLS)
+    for symbol in SYMBOLS:
+        frame = pd.read_csv(dense_data / f"minute_{symbol.lower()}.csv", parse_dates=['timestamp'])
+        assert_columns_equal(store.load(symbol), frame_to_columns(frame))
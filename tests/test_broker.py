@@ -0,0 +1,125 @@
+import asyncio
+import time
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("alpaca.trading")
+
+from Core.AlpacaAdapters import AsyncAlpacaBroker
+from Core.Engine import Bar, TradingEngine
+from Core.Fakes import FakeTradingClient
+from Core.Strategy import ScalpingStrategy
+
+ENTRY_TIME = pd.Timestamp('2024-03-04 15:00', tz='UTC')
+
+
+class RejectingClient(FakeTradingClient):
+    """Accepts orders on one side and rejects the other"""
+
+    def __init__(self, reject_side, **kwargs):
+        super().__init__(**kwargs)
+        self.reject_side = reject_side
+        self.account_calls = 0
+
+    def get_account(self):
+        self.account_calls += 1
+        return super().get_account()
+
+    def submit_order(self, order_data):
+        if str(order_data.side.value).upper() == self.reject_side:
+            raise ValueError("insufficient qty")
+        return super().submit_order(order_data)
+
+
+def test_orders_return_at_once_and_go_out_in_parallel():
+    async def run():
+        broker = AsyncAlpacaBroker(FakeTradingClient(latency=0.1), max_workers=8)
+        await broker.start()
+        started = time.perf_counter()
+        fills = [broker.submit_order(symbol, 1.234, 'BUY', 100.0, ENTRY_TIME) for symbol in 'ABCDEF']
+        assert time.perf_counter() - started < 0.05
+        acks = [await broker.acks.get() for _ in fills]
+        # Six 100ms round trips overlapped rather than queued
+        assert time.perf_counter() - started < 0.35
+        await broker.close()
+        return fills, acks
+
+    fills, acks = asyncio.run(run())
+    assert all(fill['qty'] == 1.23 for fill in fills)
+    assert {ack['order_id'] for ack in acks} == {fill['order_id'] for fill in fills}
+    assert all(ack['status'] == 'accepted' and ack['broker_order_id'] for ack in acks)
+
+
+def test_buying_power_is_cached_and_refreshed_after_acks():
+    async def run():
+        client = RejectingClient(reject_side='SELL', buying_power=5000.0)
+        broker = AsyncAlpacaBroker(client, refresh_interval=60)
+        await broker.start()
+        assert broker.buying_power() == 5000.0
+        calls = client.account_calls
+        broker.buying_power()
+        assert client.account_calls == calls
+        client.buying_power = 4000.0
+        broker.submit_order('AAPL', 1, 'BUY', 100.0, ENTRY_TIME)
+        await broker.acks.get()
+        for _ in range(100):
+            if broker.buying_power() == 4000.0:
+                break
+            await asyncio.sleep(0.01)
+        await broker.close()
+        return broker.buying_power()
+
+    assert asyncio.run(run()) == 4000.0
+
+
+def test_orders_sent_before_start_are_acknowledged():
+    async def run():
+        broker = AsyncAlpacaBroker(FakeTradingClient())
+        broker.submit_order('AAPL', 2, 'BUY', 100.0, ENTRY_TIME)
+        await broker.close()
+        return broker
+
+    broker = asyncio.run(run())
+    assert broker.acks.get_nowait()['status'] == 'accepted'
+    assert broker.refresh_requested.is_set()
+    assert broker.submit_order('AAPL', 0.001, 'BUY', 100.0, ENTRY_TIME) is None
+
+
+def test_rejected_exit_restores_the_position_and_exits_again():
+    async def run():
+        broker = AsyncAlpacaBroker(RejectingClient(reject_side='SELL'))
+        strategy = ScalpingStrategy({'max_hold_minutes': 8}, ['AAPL'])
+        engine = TradingEngine(strategy, broker)
+        strategy.open_position('AAPL', 'BUY', 100.0, 3.0, ENTRY_TIME, 'entry-1')
+
+        late = Bar('AAPL', ENTRY_TIME + pd.Timedelta(minutes=10), 100.0, 100.0, 100.0, 100.0)
+        exits = engine.on_bar(late)
+        assert [event['type'] for event in exits] == ['exit'] and 'AAPL' not in strategy.positions
+        events = engine.on_order_ack(await broker.acks.get())
+        assert events[0]['type'] == 'exit_rejected' and events[0]['restored']
+        assert strategy.positions['AAPL']['entry_time'] == ENTRY_TIME
+        assert engine.pending_exits == {}
+
+        # The next bar resubmits the exit for the same position
+        retry = engine.on_bar(Bar('AAPL', late.timestamp + pd.Timedelta(minutes=1), 100.0, 100.0, 100.0, 100.0))
+        assert retry[0]['type'] == 'exit' and retry[0]['qty'] == 3.0
+        await broker.close()
+
+    asyncio.run(run())
+
+
+def test_rejected_entry_drops_the_position():
+    async def run():
+        broker = AsyncAlpacaBroker(RejectingClient(reject_side='BUY'))
+        strategy = ScalpingStrategy(symbols=['AAPL'])
+        engine = TradingEngine(strategy, broker)
+        fill = broker.submit_order('AAPL', 1, 'BUY', 100.0, ENTRY_TIME)
+        strategy.open_position('AAPL', 'BUY', 100.0, 1, ENTRY_TIME, fill['order_id'])
+        events = engine.on_order_ack(await broker.acks.get())
+        await broker.close()
+        return strategy, events
+
+    strategy, events = asyncio.run(run())
+    assert events[0]['type'] == 'entry_rejected'
+    assert strategy.positions == {}
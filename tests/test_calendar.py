@@ -0,0 +1,76 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from Core.Calendar import EXCHANGES, SessionCalendar, easter, japan_holidays, lse_holidays, tsx_holidays, us_holidays
+
+
+def weekday_dates(holidays):
+    return sorted(day for day in holidays if day.weekday() < 5)
+
+
+def test_easter_dates():
+    assert [easter(year) for year in (2019, 2024, 2025)] == [date(2019, 4, 21), date(2024, 3, 31),
+                                                             date(2025, 4, 20)]
+
+
+def test_nyse_2024_holidays():
+    assert weekday_dates(us_holidays(2024)) == [
+        date(2024, 1, 1), date(2024, 1, 15), date(2024, 2, 19), date(2024, 3, 29), date(2024, 5, 27),
+        date(2024, 6, 19), date(2024, 7, 4), date(2024, 9, 2), date(2024, 11, 28), date(2024, 12, 25),
+    ]
+    # New Year's Day 2022 fell on a Saturday and was not observed on the Friday before
+    assert date(2021, 12, 31) not in us_holidays(2021) | us_holidays(2022)
+
+
+def test_tsx_lse_and_tse_holidays_move_off_weekends():
+    assert date(2022, 12, 27) in tsx_holidays(2022)   # Christmas on a Sunday
+    assert {date(2022, 6, 2), date(2022, 6, 3)} <= lse_holidays(2022)
+    assert date(2022, 5, 30) not in lse_holidays(2022)
+    tse = japan_holidays(2024)
+    assert {date(2024, 2, 12), date(2024, 5, 6), date(2024, 11, 4)} <= tse  # Sunday substitutes
+    assert date(2009, 9, 22) in japan_holidays(2009)  # Citizens' holiday between two holidays
+
+
+def test_tse_2024_session_count():
+    assert len(SessionCalendar("Tokyo (TSE)", start="2024-01-01", end="2024-12-31").opens) == 245
+
+
+def test_sessions_and_half_days():
+    calendar = SessionCalendar(start="2024-11-25", end="2024-12-06")
+    assert not calendar.is_open("2024-11-28 15:00")                      # Thanksgiving
+    assert calendar.is_open("2024-11-29 17:30")                          # 12:30 ET on the half day
+    assert not calendar.is_open("2024-11-29 18:30")                      # 13:30 ET, already closed
+    assert calendar.seconds_until_close("2024-11-29 17:00") == 3600
+    assert calendar.next_open("2024-11-27 22:00") == pd.Timestamp("2024-11-29 14:30", tz="UTC")
+    assert calendar.seconds_until_open("2024-11-29 15:00") == 0.0
+
+    lse = SessionCalendar("London (LSE)", start="2024-12-20", end="2024-12-31")
+    assert lse.seconds_until_close("2024-12-24 12:00") == 30 * 60
+
+
+def test_session_mask_matches_is_open():
+    calendar = SessionCalendar(start="2024-07-01", end="2024-07-08")
+    minutes = pd.date_range("2024-07-01", "2024-07-08", freq="17min", tz="UTC")
+    mask = calendar.session_mask(minutes.as_unit('ns').asi8)
+    assert mask.any()
+    np.testing.assert_array_equal(mask, [calendar.is_open(minute) for minute in minutes])
+
+
+def test_range_without_business_days_is_never_open():
+    calendar = SessionCalendar(start="2024-03-09", end="2024-03-10")
+    assert len(calendar.opens) == 0
+    assert not calendar.is_open("2024-03-09 15:00")
+    assert calendar.next_open("2024-03-09") is None
+    assert calendar.seconds_until_open("2024-03-09") is None
+    assert not calendar.session_mask([0]).any()
+
+
+@pytest.mark.parametrize("exchange", list(EXCHANGES))
+def test_every_exchange_builds_and_flags_partial_holidays(exchange):
+    calendar = SessionCalendar(exchange, start="2024-01-01", end="2024-12-31")
+    assert 240 <= len(calendar.opens) <= 262
+    assert (calendar.closes > calendar.opens).all()
+    assert calendar.holidays_complete == (exchange not in ("Hong Kong (HKEX)", "Shanghai (SSE)"))
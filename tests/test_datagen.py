@@ -0,0 +1,105 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("alpaca.data")
+
+from Core.BarStore import BarStore, frame_to_columns
+from Core.Fakes import FakeHistoricalDataClient, synthetic_bars
+from DataGen import download_history, export_csv, plan_downloads, to_ns
+
+START, END = datetime(2024, 3, 4), datetime(2024, 3, 16)
+
+
+def download(client, store, symbols=('AAPL', 'NVDA'), start=START, end=END, **kwargs):
+    return download_history(client, store, list(symbols), start, end, max_workers=2, chunk_days=3, **kwargs)
+
+
+def test_download_stores_every_bar_and_its_coverage(tmp_path):
+    store = BarStore(tmp_path)
+    assert download(FakeHistoricalDataClient(), store, compact_segments=1) == []
+    for symbol in ('AAPL', 'NVDA'):
+        expected = synthetic_bars(symbol, START, END)
+        stored = store.load(symbol)
+        np.testing.assert_array_equal(stored['timestamp'], frame_to_columns(expected)['timestamp'])
+        np.testing.assert_array_equal(stored['close'], expected['close'].to_numpy())
+        assert store.coverage(symbol) == [(to_ns(START), to_ns(END))]
+        # Compacted: the backtester gets memory-mapped columns
+        assert store.manifest(symbol)['segments'] == []
+        assert isinstance(stored['close'], np.memmap)
+
+
+def test_second_run_requests_nothing(tmp_path):
+    store = BarStore(tmp_path)
+    download(FakeHistoricalDataClient(), store)
+    client = FakeHistoricalDataClient()
+    download(client, store)
+    assert client.requests == []
+    # Extending the range only fetches the new days
+    download(client, store, end=END + timedelta(days=3))
+    assert len(client.requests) == 2
+    assert plan_downloads(store, ['AAPL', 'NVDA'], START, END + timedelta(days=3)) == []
+
+
+def test_interrupted_run_resumes_missing_chunks(tmp_path):
+    store = BarStore(tmp_path)
+    failed = download(FakeHistoricalDataClient(fail_after=3), store)
+    assert failed
+    assert len(plan_downloads(store, ['AAPL', 'NVDA'], START, END, chunk_days=3)) == len(failed)
+    assert download(FakeHistoricalDataClient(), store) == []
+    for symbol in ('AAPL', 'NVDA'):
+        assert store.coverage(symbol) == [(to_ns(START), to_ns(END))]
+        assert len(store.load(symbol)['timestamp']) == len(synthetic_bars(symbol, START, END))
+
+
+def test_unpublished_minutes_are_not_marked_covered(tmp_path):
+    store = BarStore(tmp_path)
+    before = datetime.now(timezone.utc)
+    start = before - timedelta(days=5)
+    download(FakeHistoricalDataClient(), store, symbols=['AAPL'], start=start, end=before + timedelta(days=2),
+             settle_minutes=15)
+    after = datetime.now(timezone.utc)
+    (covered_start, covered_end), = store.coverage('AAPL')
+    assert covered_start == to_ns(start)
+    # Never past now; the last 15 minutes only count as covered up to the last bar received
+    last_bar = int(store.load('AAPL')['timestamp'][-1]) if store.has('AAPL') else covered_start
+    assert covered_end <= to_ns(after)
+    assert covered_end <= max(last_bar + 60 * 10 ** 9, to_ns(after - timedelta(minutes=15)))
+    assert covered_end >= to_ns(before - timedelta(minutes=15))
+
+
+def test_segments_are_only_compacted_past_the_threshold(tmp_path):
+    store = BarStore(tmp_path)
+    # 12 days in 3-day chunks: 4 segments per symbol
+    download(FakeHistoricalDataClient(), store, compact_segments=5)
+    assert len(store.manifest('AAPL')['segments']) == 4
+    download(FakeHistoricalDataClient(), store, end=END + timedelta(days=3), compact_segments=5)
+    assert store.manifest('AAPL')['segments'] == []
+    assert len(store.load('AAPL')['timestamp']) == len(synthetic_bars('AAPL', START, END + timedelta(days=3)))
+
+
+def test_export_csv_appends_only_new_bars(tmp_path):
+    store = BarStore(tmp_path / "bars")
+    download(FakeHistoricalDataClient(), store, symbols=['AAPL'])
+    export_csv(store, 'AAPL', tmp_path)
+    path = tmp_path / "minute_aapl.csv"
+    first = path.read_bytes()
+    download(FakeHistoricalDataClient(), store, symbols=['AAPL'], end=END + timedelta(days=3))
+    export_csv(store, 'AAPL', tmp_path)
+    # The rows already exported are untouched, and the file equals a fresh full export
+    assert path.read_bytes().startswith(first)
+    store.load_frame('AAPL').to_csv(tmp_path / "full.csv", index=False)
+    assert path.read_bytes() == (tmp_path / "full.csv").read_bytes()
+
+
+def test_export_csv_rewrites_when_an_earlier_gap_is_filled(tmp_path):
+    store = BarStore(tmp_path / "bars")
+    download(FakeHistoricalDataClient(), store, symbols=['AAPL'], start=START + timedelta(days=3))
+    export_csv(store, 'AAPL', tmp_path)
+    download(FakeHistoricalDataClient(), store, symbols=['AAPL'])
+    export_csv(store, 'AAPL', tmp_path)
+    exported = pd.read_csv(tmp_path / "minute_aapl.csv")
+    assert len(exported) == len(synthetic_bars('AAPL', START, END))
+    assert exported['timestamp'].is_monotonic_increasing
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from Core.BarStream import BarStream
+from Core.Engine import Bar, ReplaySource, SimulatedBroker, TradingEngine
+from Core.Strategy import ScalpingStrategy
+from Multiple_BackTests import BacktestScalpingBot
+
+TIMES = pd.date_range("2024-03-04 15:00", periods=4, freq="min", tz="UTC").as_unit('ns').asi8
+
+
+def two_symbol_stream(missing):
+    # BBB has no bar at the second and third minutes
+    bars = {
+        'AAA': {'timestamp': TIMES, 'open': np.ones(4), 'high': np.ones(4), 'low': np.ones(4),
+                'close': np.array([1.0, 2.0, 3.0, 4.0]), 'volume': np.ones(4)},
+        'BBB': {'timestamp': TIMES[[0, 3]], 'open': np.ones(2), 'high': np.ones(2), 'low': np.ones(2),
+                'close': np.array([10.0, 13.0]), 'volume': np.ones(2)},
+    }
+    return BarStream.from_columns(bars, missing=missing)
+
+
+@pytest.mark.parametrize("data, missing_bars", [
+    ("dense_data", "skip"), ("sparse_data", "skip"), ("sparse_data", "ffill")
+])
+def test_event_engine_matches_vectorized(request, tmp_path, data, missing_bars):
+    bot = BacktestScalpingBot(request.getfixturevalue(data), missing_bars=missing_bars, bar_store=tmp_path / "bars")
+    for config in bot.strategies:
+        vectorized = bot.run_backtest_for_strategy(config, engine="vectorized")
+        event = bot.run_backtest_for_strategy(config, engine="event")
+        assert event['trades'] > 0
+        for key in ('trades', 'wins', 'losses'):
+            assert event[key] == vectorized[key], (config['name'], key)
+        assert event['pnl'] == pytest.approx(vectorized['pnl'], rel=1e-9, abs=1e-9)
+
+
+@pytest.mark.parametrize("missing, marked", [("skip", []), ("ffill", [10.0, 10.0])])
+def test_replay_marks_only_forward_filled_minutes(missing, marked):
+    batches = list(ReplaySource(two_symbol_stream(missing)).batches())
+    assert [[bar.symbol for bar in bars] for bars, _ in batches] == [['AAA', 'BBB'], ['AAA'], ['AAA'],
+                                                                    ['AAA', 'BBB']]
+    marks = [bar for _, batch_marks in batches for bar in batch_marks]
+    assert [bar.close for bar in marks] == marked
+    assert all(bar.symbol == 'BBB' and bar.volume == 0 for bar in marks)
+
+
+def test_marks_check_exits_but_never_update_or_enter():
+    strategy = ScalpingStrategy({'take_profit_pct': 0.01, 'stop_loss_pct': 0.01, 'max_hold_minutes': 2},
+                                ['AAA', 'BBB'])
+    engine = TradingEngine(strategy, SimulatedBroker(1000))
+    entry_time = pd.Timestamp(TIMES[0], tz='UTC')
+    strategy.open_position('BBB', 'BUY', 10.0, 1.0, entry_time, 'sim-0')
+    mark = Bar('BBB', entry_time + pd.Timedelta(minutes=2), 10.0, 10.0, 10.0, 10.0, 0.0)
+    events = engine.on_bars([Bar('AAA', mark.timestamp, 1.0, 1.0, 1.0, 1.0)], marks=[mark])
+    assert [(event['type'], event['symbol'], event['reason']) for event in events] == [('exit', 'BBB', 'max_hold')]
+    assert len(strategy.bars['BBB']) == 0
+    assert len(strategy.bars['AAA']) == 1
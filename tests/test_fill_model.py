@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from Core import FillModel as fill_module
+from Core.BarStore import frame_to_columns
+from Core.Fakes import synthetic_bars
+from Core.FillModel import (EXIT_STOP_LOSS, EXIT_TAKE_PROFIT, EXIT_TIME, FillModel, bps_slippage,
+                            proportional_fee)
+from conftest import SYMBOLS
+from Multiple_BackTests import BacktestScalpingBot
+
+
+def minute_bars(rows, start="2024-03-04 15:00"):
+    """Bars from (open, high, low, close) rows, one minute apart"""
+    opens, highs, lows, closes = (np.array(column, dtype=float) for column in zip(*rows))
+    timestamps = pd.date_range(start, periods=len(rows), freq="min", tz="UTC").as_unit('ns').asi8
+    return {'open': opens, 'high': highs, 'low': lows, 'close': closes, 'timestamp': timestamps}
+
+
+def test_levels_fill_intrabar_and_gaps_fill_at_the_open():
+    bars = minute_bars([(100, 100, 100, 100), (100, 100.6, 99.9, 100.2), (100, 100, 100, 100),
+                        (98, 98, 97, 97.5)])
+    fills = FillModel().resolve([0, 2], [1, 1], bars, 0.005, 0.01, 60)
+    np.testing.assert_array_equal(fills['exit_index'], [1, 3])
+    np.testing.assert_array_equal(fills['reason'], [EXIT_TAKE_PROFIT, EXIT_STOP_LOSS])
+    # The take-profit level fills exactly; the stop was gapped through and fills at the open
+    np.testing.assert_allclose(fills['exit_price'], [100.5, 98.0])
+
+
+@pytest.mark.parametrize("tie_rule, reason", [
+    ("stop", EXIT_STOP_LOSS), ("target", EXIT_TAKE_PROFIT), ("open", EXIT_TAKE_PROFIT)
+])
+def test_tie_rules_when_one_bar_crosses_both_levels(tie_rule, reason):
+    bars = minute_bars([(100, 100, 100, 100), (100.4, 101, 99, 100)])
+    fills = FillModel(tie_rule).resolve([0], [1], bars, 0.005, 0.005, 60)
+    assert fills['reason'][0] == reason
+
+
+def test_time_exit_and_unresolved_trades():
+    bars = minute_bars([(100, 100, 100, 100)] * 6)
+    fills = FillModel().resolve([0, 4], [-1, 1], bars, 0.01, 0.01, 3)
+    np.testing.assert_array_equal(fills['exit_index'], [3, -1])
+    np.testing.assert_array_equal(fills['reason'], [EXIT_TIME, 0])
+    assert np.isnan(fills['exit_price'][1])
+
+
+def test_slippage_and_fees_work_against_the_trade():
+    bars = minute_bars([(100, 100, 100, 100), (100, 100, 100, 100)])
+    model = FillModel(slippage=bps_slippage(10), fee=proportional_fee(0.001))
+    fills = model.resolve([0, 0], [1, -1], bars, 0.01, 0.01, 1)
+    np.testing.assert_allclose(fills['entry_price'], [100.1, 99.9])
+    np.testing.assert_allclose(fills['exit_price'], [99.9, 100.1])
+    assert model.fees(-2000.0) == pytest.approx(2.0)
+
+
+def test_blocks_give_the_same_fills(monkeypatch):
+    bars = {key: np.array(values) for key, values in
+            frame_to_columns(synthetic_bars("AAPL", "2024-03-04", "2024-03-08")).items()}
+    rng = np.random.default_rng(3)
+    bars['close'][rng.random(len(bars['close'])) < 0.3] = np.nan
+    entries = np.sort(rng.choice(np.flatnonzero(~np.isnan(bars['close'])), 200, replace=False))
+    directions = rng.choice([-1, 1], len(entries))
+    whole = FillModel("open").resolve(entries, directions, bars, 0.002, 0.001, 10)
+    monkeypatch.setattr(fill_module, 'MAX_WINDOW_CELLS', 7)
+    blocked = FillModel("open").resolve(entries, directions, bars, 0.002, 0.001, 10)
+    for key in whole:
+        np.testing.assert_array_equal(blocked[key], whole[key])
+
+
+def test_flat_bars_reproduce_the_loop_backtester(tmp_path):
+    # With open = high = low = close a level is crossed exactly when a close crosses it, which is all the
+    # loop engine sees, so intrabar fills must give the same trades
+    for i, symbol in enumerate(SYMBOLS):
+        frame = synthetic_bars(symbol, "2024-03-04", "2024-03-06", start_price=100.0 + 50 * i)
+        frame = frame.assign(open=frame['close'], high=frame['close'], low=frame['close'])
+        frame.drop(columns='symbol').to_csv(tmp_path / f"minute_{symbol.lower()}.csv", index=False)
+    loop_bot = BacktestScalpingBot(tmp_path, bar_store=tmp_path / "bars")
+    fill_bot = BacktestScalpingBot(tmp_path, bar_store=tmp_path / "bars", fill_model=FillModel())
+    for config in loop_bot.strategies:
+        loop = loop_bot.run_backtest_for_strategy(config, engine="loop")
+        intrabar = fill_bot.run_backtest_for_strategy(config, engine="vectorized")
+        assert loop['trades'] > 0
+        for key in ('trades', 'wins', 'losses'):
+            assert intrabar[key] == loop[key], (config['name'], key)
+        assert intrabar['pnl'] == pytest.approx(loop['pnl'], rel=1e-9, abs=1e-9)
@@ -0,0 +1,78 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from Core.Fakes import synthetic_bars
+from Core.Indicators import EMA, MACD, RSI, IndicatorSet, Trend
+from Multiple_BackTests import BacktestScalpingBot
+
+
+@pytest.fixture(scope="module")
+def closes():
+    closes = synthetic_bars("AAPL", "2024-03-04", "2024-03-06")['close'].round(2).to_numpy(copy=True)
+    # Runs of unchanged prices take the EMA's no-change shortcut
+    closes[100:110] = closes[100]
+    return closes
+
+
+def stream(indicator, closes):
+    return [indicator.update(price) for price in closes.tolist()]
+
+
+@pytest.mark.parametrize("span", [9, 12, 26, 50])
+def test_ema_matches_pandas_ewm(closes, span):
+    expected = pd.Series(closes).ewm(span=span).mean().to_numpy()
+    np.testing.assert_allclose(stream(EMA(span), closes), expected, rtol=1e-13)
+
+
+def test_macd_and_trend_match_pandas(closes):
+    series = pd.Series(closes)
+    macd_line = series.ewm(span=12).mean() - series.ewm(span=26).mean()
+    signal_line = macd_line.ewm(span=9).mean()
+    values = stream(MACD(), closes)
+    assert values[24] == (None, None)
+    np.testing.assert_allclose([macd for macd, _ in values[25:]], macd_line[25:], rtol=1e-12, atol=1e-12)
+    np.testing.assert_allclose([signal for _, signal in values[25:]], signal_line[25:], rtol=1e-12, atol=1e-12)
+
+    short, long = series.ewm(span=20).mean().to_numpy(), series.ewm(span=50).mean().to_numpy()
+    expected = np.where(short > long, 'up', np.where(short < long, 'down', 'neutral'))
+    trends = stream(Trend(), closes)
+    assert trends[48] is None
+    assert trends[49:] == expected[49:].tolist()
+
+
+def test_simple_rsi_matches_the_loop_backtester(closes):
+    bot = BacktestScalpingBot.__new__(BacktestScalpingBot)
+    window = [{'close': price} for price in closes]
+    values = stream(RSI(), closes)
+    assert values[12] is None
+    for i in range(13, len(closes)):
+        assert values[i] == pytest.approx(bot.calculate_rsi(window[:i + 1]), rel=1e-12, abs=1e-12)
+
+
+def test_wilder_rsi_matches_smoothed_averages(closes):
+    delta = np.diff(closes)
+    gains, losses = np.maximum(delta, 0), np.maximum(-delta, 0)
+    avg_gain, avg_loss = gains[:14].mean(), losses[:14].mean()
+    expected = [100 - 100 / (1 + avg_gain / avg_loss)]
+    for gain, loss in zip(gains[14:], losses[14:]):
+        avg_gain = (avg_gain * 13 + gain) / 14
+        avg_loss = (avg_loss * 13 + loss) / 14
+        expected.append(100 - 100 / (1 + avg_gain / avg_loss))
+    values = stream(RSI(method="wilder"), closes)
+    assert values[13] is None
+    np.testing.assert_allclose(values[14:], expected, rtol=1e-10)
+
+
+def test_indicator_set_survives_a_json_round_trip(closes):
+    indicators = IndicatorSet()
+    for price in closes[:200].tolist():
+        indicators.update(price)
+    restored = IndicatorSet.from_dict(json.loads(json.dumps(indicators.to_dict())))
+    assert restored.ready
+    for price in closes[200:].tolist():
+        indicators.update(price)
+        restored.update(price)
+        assert restored.values() == indicators.values()
@@ -0,0 +1,99 @@
+import csv
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from Core.Fakes import FakeTradingClient
+from Core.JournalAnalytics import JournalAnalyzer
+from Core.TradeLog import JOURNAL_HEADER
+
+
+def row(event, timestamp, symbol, **fields):
+    values = {'event': event, 'timestamp': f"2024-03-04T{timestamp}:00+00:00", 'symbol': symbol, **fields}
+    return [values.get(column, '') for column in JOURNAL_HEADER]
+
+
+ROWS = [
+    row('entry', '15:00', 'AAPL', side='BUY', quantity=10, entry_price=100.0, order_id='e1'),
+    row('ack', '15:00', 'AAPL', order_id='e1', status='accepted', latency=0.02),
+    row('entry', '15:01', 'TSLA', side='SELL', quantity=4, entry_price=200.0, order_id='e2'),
+    row('exit', '15:05', 'AAPL', side='BUY', quantity=10, entry_price=100.0, exit_price=101.0,
+        reason='take_profit', order_id='e1', exit_order_id='x1'),
+    row('exit', '15:06', 'TSLA', side='SELL', quantity=4, entry_price=200.0, exit_price=199.0,
+        reason='take_profit', order_id='e2', exit_order_id='x2'),
+    row('exit_rejected', '15:06', 'TSLA', side='SELL', quantity=4, order_id='e2', exit_order_id='x2',
+        error='insufficient qty'),
+]
+
+
+def write_journal(path, rows, header=True, mode='w'):
+    with open(path, mode, newline='') as f:
+        writer = csv.writer(f)
+        if header:
+            writer.writerow(JOURNAL_HEADER)
+        writer.writerows(rows)
+
+
+def test_ingest_reads_only_new_complete_rows(tmp_path):
+    journal = tmp_path / 'live_trades_1.csv'
+    write_journal(journal, ROWS[:2])
+    analyzer = JournalAnalyzer(tmp_path, state_dir=tmp_path / 'state')
+    assert analyzer.ingest() == 2
+    assert analyzer.ingest() == 0
+
+    # A row still being written waits until its line is complete
+    write_journal(journal, ROWS[2:3], header=False, mode='a')
+    with open(journal, 'a') as f:
+        f.write(','.join(str(value) for value in ROWS[3])[:20])
+    assert analyzer.ingest() == 1
+    with open(journal, 'a', newline='') as f:
+        f.write(','.join(str(value) for value in ROWS[3])[20:] + '\r\n')
+    assert analyzer.ingest() == 1
+    analyzer.save_state()
+
+    # A new run picks up from the saved offsets
+    resumed = JournalAnalyzer(tmp_path, state_dir=tmp_path / 'state')
+    assert resumed.ingest() == 0
+    assert resumed.rows['event'].tolist() == ['entry', 'ack', 'entry', 'exit']
+    assert resumed.rows['quantity'].fillna(0).tolist() == [10, 0, 4, 10]
+
+    # A rewritten journal is read again from the top rather than appended to
+    journal.unlink()
+    write_journal(journal, ROWS[:1])
+    assert resumed.ingest() == 1
+    assert resumed.rows['event'].tolist() == ['entry']
+
+
+def test_reconcile_prices_legs_and_trades_from_broker_fills(tmp_path):
+    write_journal(tmp_path / 'live_trades_1.csv', ROWS)
+    fills = {'e1': 100.05, 'x1': 100.9, 'e2': 199.9}
+    client = FakeTradingClient(fill_price=lambda order: fills[order.client_order_id], fill_delay=0.5)
+    for order_id, symbol, side, qty in (('e1', 'AAPL', 'buy', 10), ('x1', 'AAPL', 'sell', 10),
+                                        ('e2', 'TSLA', 'sell', 4)):
+        client.submit_order(SimpleNamespace(symbol=symbol, side=side, qty=qty, client_order_id=order_id))
+
+    analyzer = JournalAnalyzer(tmp_path, state_dir=tmp_path / 'state', client=client)
+    report = analyzer.run()
+    legs = report['legs'].set_index('order_id')
+    # Paying up on a buy and selling lower are both costs
+    assert legs.loc['e1', 'slippage_bps'] == pytest.approx(5.0)
+    assert legs.loc['x1', 'slippage_bps'] == pytest.approx(0.1 / 101.0 * 1e4)
+    assert legs.loc['e2', 'slippage_bps'] == pytest.approx(5.0)
+    assert legs.loc['e1', 'ack_latency'] == pytest.approx(0.02)
+    # x2 was never sent to the broker, so it has no fill
+    assert np.isnan(legs.loc['x2', 'fill_price'])
+
+    # The rejected TSLA exit never closed a trade
+    trades = report['trades']
+    assert trades['symbol'].tolist() == ['AAPL']
+    assert trades.loc[0, 'signal_pnl'] == pytest.approx(10.0)
+    assert trades.loc[0, 'realised_pnl'] == pytest.approx(8.5)
+    by_symbol = report['by_symbol']
+    assert by_symbol.loc['AAPL', ['orders', 'filled', 'trades', 'reconciled']].tolist() == [2, 2, 1, 1]
+
+    # Filled orders are final; only the unsent exit is looked up again
+    assert analyzer.reconcile() == 1
+    resumed = JournalAnalyzer(tmp_path, state_dir=tmp_path / 'state', client=client)
+    assert resumed.ingest() == 0
+    assert resumed.report()['trades']['realised_pnl'].tolist() == pytest.approx([8.5])
@@ -0,0 +1,75 @@
+import contextlib
+import io
+import json
+import urllib.request
+
+import numpy as np
+import pytest
+
+from Core.BarStore import frame_to_columns
+from Core.Fakes import FakeTradingClient, synthetic_bars
+from Core.Latency import Histogram, LatencyRecorder
+
+
+def test_histogram_percentiles_are_within_a_bucket_of_the_exact_values():
+    values = np.random.default_rng(0).lognormal(mean=np.log(50e-6), sigma=1.0, size=20000)
+    histogram = Histogram()
+    for value in values:
+        histogram.record(value)
+    for q in (50, 99):
+        exact = np.percentile(values, q)
+        assert histogram.percentile(q) == pytest.approx(exact, rel=0.05)
+    summary = histogram.summary()
+    assert summary['count'] == len(values)
+    assert summary['max'] == values.max()
+    assert summary['mean'] == pytest.approx(values.mean())
+
+
+def test_snapshot_merges_symbols_per_stage():
+    recorder = LatencyRecorder()
+    for seconds in (1e-6, 2e-6, 3e-6):
+        recorder.record('on_bar', 'AAPL', seconds)
+    recorder.record('on_bar', 'NVDA', 1e-3)
+    on_bar = recorder.snapshot()['stages']['on_bar']
+    assert on_bar['AAPL']['count'] == 3
+    assert on_bar['*']['count'] == 4
+    assert on_bar['*']['max'] == 1e-3
+
+
+def test_export_and_http_serve_the_same_snapshot(tmp_path):
+    recorder = LatencyRecorder()
+    recorder.record('signal', 'AAPL', 5e-6)
+    recorder.export(tmp_path / 'latency.json')
+    exported = json.loads((tmp_path / 'latency.json').read_text())
+    assert exported['stages']['signal']['AAPL']['count'] == 1
+    assert not list(tmp_path.glob('*.tmp'))
+
+    server = recorder.serve(port=0)
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.server_address[1]}/") as response:
+            served = json.loads(response.read())
+    finally:
+        server.shutdown()
+    assert served['stages'] == exported['stages']
+
+
+def test_live_bot_times_every_stage_and_exports_under_journal_dir(tmp_path, monkeypatch):
+    FinalQuantTrade = pytest.importorskip("FinalQuantTrade")
+    from Core.ReplayStream import ReplayDataStream
+
+    monkeypatch.chdir(tmp_path)
+    journal_dir = tmp_path / "journal"
+    journal_dir.mkdir()
+    bars = {symbol: frame_to_columns(synthetic_bars(symbol, '2024-03-04', '2024-03-05'))
+            for symbol in ('AAPL', 'NVDA')}
+    stream = ReplayDataStream(bars)
+    bot = FinalQuantTrade.LiveScalpingBot(client=FakeTradingClient(), stream=stream, symbols=stream.symbols,
+                                          journal_dir=journal_dir, latency_metrics=True)
+    with contextlib.redirect_stdout(io.StringIO()):
+        bot.run()
+
+    stages = bot.latency.snapshot()['stages']
+    assert stages['on_bar']['*']['count'] == stream.stats()['bars']
+    assert {'buffer_append', 'signal'} <= set(stages)
+    assert (journal_dir / 'latency_snapshot.json').exists()
+    assert not (tmp_path / 'latency_snapshot.json').exists()
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from Core import Lifecycle
+from Core.Lifecycle import _lifecycle_loop, _lifecycle_numpy
+
+NS_PER_MINUTE = 60 * 10 ** 9
+
+
+def random_symbol(seed, n_bars=3000, signal_rate=0.05, gap_rate=0.2):
+    """Signals, closes with NaN gaps and irregular minute timestamps for one symbol"""
+    rng = np.random.default_rng(seed)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, n_bars)))
+    closes[rng.random(n_bars) < gap_rate] = np.nan
+    signals = np.where(rng.random(n_bars) < signal_rate, rng.choice([-1, 1], n_bars), 0).astype(np.int8)
+    signals[np.isnan(closes)] = 0
+    timestamps = np.cumsum(rng.integers(1, 4, n_bars)) * NS_PER_MINUTE
+    return signals, closes, timestamps.astype(np.int64)
+
+
+def resolve(kernel, signals, closes, timestamps, take_profit, stop_loss, max_hold):
+    size = int(np.count_nonzero(signals))
+    entries = np.empty(size, dtype=np.int64)
+    exits = np.empty(size, dtype=np.int64)
+    reasons = np.empty(size, dtype=np.int8)
+    n, open_entry = kernel(signals, closes, timestamps, take_profit, stop_loss, float(max_hold),
+                           entries, exits, reasons)
+    return entries[:n].tolist(), exits[:n].tolist(), reasons[:n].tolist(), int(open_entry)
+
+
+PARAMETERS = [(0.0025, 0.0015, 8), (0.004, 0.001, 15), (0.01, 0.01, 1), (0.0005, 0.0005, 60)]
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("take_profit, stop_loss, max_hold", PARAMETERS)
+def test_numpy_kernel_matches_loop(seed, take_profit, stop_loss, max_hold):
+    symbol = random_symbol(seed)
+    expected = resolve(_lifecycle_loop, *symbol, take_profit, stop_loss, max_hold)
+    assert len(expected[0]) > 0
+    assert resolve(_lifecycle_numpy, *symbol, take_profit, stop_loss, max_hold) == expected
+
+
+def test_numpy_kernel_windows_in_blocks(monkeypatch):
+    """Candidate x horizon matrices are built in blocks; a tiny block size must not change the trades"""
+    symbol = random_symbol(7)
+    expected = resolve(_lifecycle_numpy, *symbol, 0.004, 0.001, 15)
+    monkeypatch.setattr(Lifecycle, 'MAX_WINDOW_CELLS', 1)
+    assert resolve(_lifecycle_numpy, *symbol, 0.004, 0.001, 15) == expected
+
+
+@pytest.mark.parametrize("take_profit, stop_loss, max_hold", PARAMETERS)
+def test_numba_kernel_matches_numpy(take_profit, stop_loss, max_hold):
+    numba = pytest.importorskip("numba")
+    compiled = numba.njit(_lifecycle_loop)
+    for seed in range(3):
+        symbol = random_symbol(seed)
+        assert (resolve(compiled, *symbol, take_profit, stop_loss, max_hold) ==
+                resolve(_lifecycle_numpy, *symbol, take_profit, stop_loss, max_hold))
+
+
+def test_run_kernel_books_every_closed_trade():
+    symbols = [random_symbol(seed) for seed in range(3)]
+    timestamps = symbols[0][2]
+    signals = [signals for signals, _, _ in symbols]
+    closes = [closes for _, closes, _ in symbols]
+    trades, capital, pnl = Lifecycle.run_kernel(signals, closes, timestamps, 5000,
+                                                {'take_profit_pct': 0.0025, 'stop_loss_pct': 0.0015,
+                                                 'max_hold_minutes': 8})
+    assert len(trades) > 0
+    assert np.all(trades['exit_index'] >= trades['entry_index'])
+    assert pnl == pytest.approx(trades['pnl'].sum())
+    assert capital == pytest.approx(5000 + pnl)
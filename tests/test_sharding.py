@@ -0,0 +1,96 @@
+import asyncio
+
+import pandas as pd
+import pytest
+
+from Core.BarBuffer import to_ns
+from Core.BarStore import frame_to_columns
+from Core.Engine import Bar, SimulatedBroker, TradingEngine
+from Core.Fakes import synthetic_bars
+from Core.ReplayStream import ReplayDataStream
+from Core.Sharding import CoordinatorStrategy, ShardCoordinator
+from Core.Strategy import ScalpingStrategy
+
+SYMBOLS = ['AAPL', 'NVDA', 'TSLA', 'MSFT']
+
+
+def replay_bars():
+    stream = ReplayDataStream({symbol: frame_to_columns(synthetic_bars(symbol, '2024-03-04', '2024-03-06'))
+                               for symbol in SYMBOLS})
+    columns = stream.stream.columns
+    for t in range(len(stream.stream)):
+        for row, symbol in enumerate(stream.symbols):
+            if stream.stream.present[row, t]:
+                yield Bar(symbol, stream.stream.index[t], columns['open'][row, t], columns['high'][row, t],
+                          columns['low'][row, t], columns['close'][row, t], columns['volume'][row, t])
+
+
+def coordinator(shards=2):
+    engine = TradingEngine(CoordinatorStrategy(symbols=SYMBOLS), SimulatedBroker(100000))
+    reported = []
+    return ShardCoordinator(engine, SYMBOLS, shards, reported.extend), reported
+
+
+def test_workers_emit_the_same_signals_as_one_process():
+    # Workers hold no positions, so every entry signal they raise is independent of trading
+    local = ScalpingStrategy(symbols=SYMBOLS)
+    expected = 0
+    bars = list(replay_bars())
+    for bar in bars:
+        local.update(bar)
+        expected += local.entry_signal(bar.symbol) is not None
+    assert expected > 0
+
+    async def run():
+        shards, reported = coordinator()
+        shards.start()
+        for i, bar in enumerate(bars):
+            reported.extend(shards.on_bar(bar))
+            if i % 500 == 0:
+                await asyncio.sleep(0)
+        await shards.stop()
+        return shards, reported
+
+    shards, reported = asyncio.run(run())
+    assert shards.signals_received == expected
+    assert shards.error is None
+    assert shards.signals_stale <= expected
+
+
+def test_only_signals_for_the_latest_bar_are_traded():
+    shards, reported = coordinator()
+    shards.loop = asyncio.new_event_loop()
+    try:
+        first, second = (Bar('AAPL', pd.Timestamp('2024-03-04 15:00', tz='UTC') + pd.Timedelta(minutes=k),
+                             100.0, 100.0, 100.0, 100.0) for k in range(2))
+        shards.on_bar(first)
+        shards.on_bar(second)
+        # The shard answered for the first bar after the second had arrived
+        shards.on_signals([('AAPL', to_ns(first.timestamp), 'BUY')])
+        assert shards.signals_stale == 1 and reported == []
+        shards.on_signals([('AAPL', to_ns(second.timestamp), 'BUY')])
+        assert [event['type'] for event in reported] == ['entry']
+        assert 'AAPL' in shards.engine.strategy.positions
+    finally:
+        shards.loop.close()
+
+
+def test_a_dead_worker_is_reported_and_raised_on_stop():
+    async def run():
+        shards, _ = coordinator()
+        shards.start()
+        shards.processes[1].kill()
+        await asyncio.to_thread(shards.processes[1].join)
+        for _ in range(200):
+            if shards.error is not None:
+                break
+            await asyncio.sleep(0.01)
+        assert isinstance(shards.error, RuntimeError)
+        # Bars keep flowing for the live shard and for exits; sending to the dead one does not block
+        for bar in list(replay_bars())[:50]:
+            shards.on_bar(bar)
+        await asyncio.sleep(0)
+        with pytest.raises(RuntimeError, match="Shard 1 worker exited unexpectedly"):
+            await shards.stop()
+
+    asyncio.run(run())
@@ -0,0 +1,91 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from Core.Engine import Bar
+from Core.Fakes import FakeTradingClient, synthetic_bars
+from Core.Snapshot import SNAPSHOT_VERSION, load_snapshot, reconcile_positions, save_snapshot
+from Core.Strategy import ScalpingStrategy
+
+ENTRY_TIME = pd.Timestamp('2024-03-04 15:00', tz='UTC')
+
+
+def warmed_strategy(symbols=('AAPL', 'NVDA'), n_bars=120):
+    strategy = ScalpingStrategy(symbols=symbols)
+    for symbol in symbols:
+        for row in synthetic_bars(symbol, '2024-03-04', '2024-03-05').head(n_bars).itertuples():
+            strategy.update(Bar(symbol, row.timestamp, row.open, row.high, row.low, row.close, row.volume))
+    return strategy
+
+
+def test_snapshot_round_trip_restores_indicators_bars_and_positions(tmp_path):
+    strategy = warmed_strategy()
+    strategy.open_position('AAPL', 'BUY', 101.5, 3.0, ENTRY_TIME, 'order-1')
+    path = tmp_path / 'live_state.json'
+    save_snapshot(path, strategy.to_dict())
+
+    restored = ScalpingStrategy(symbols=('AAPL', 'NVDA'))
+    restored.restore(load_snapshot(path))
+    assert restored.positions == strategy.positions
+    for symbol in ('AAPL', 'NVDA'):
+        assert restored.indicators[symbol].values() == strategy.indicators[symbol].values()
+        np.testing.assert_array_equal(restored.bars[symbol].latest(), strategy.bars[symbol].latest())
+        np.testing.assert_array_equal(restored.bars[symbol].latest('timestamp'),
+                                      strategy.bars[symbol].latest('timestamp'))
+
+    # Both continue identically on the next bar
+    bar = Bar('NVDA', ENTRY_TIME + pd.Timedelta(hours=2), 1.0, 1.0, 1.0, 99.0)
+    strategy.update(bar)
+    restored.update(bar)
+    assert restored.indicators['NVDA'].values() == strategy.indicators['NVDA'].values()
+
+
+def test_unusable_snapshots_are_ignored(tmp_path):
+    assert load_snapshot(tmp_path / 'missing.json') is None
+    (tmp_path / 'torn.json').write_text('{"version": 1, "bars"')
+    assert load_snapshot(tmp_path / 'torn.json') is None
+    (tmp_path / 'old.json').write_text(json.dumps({'version': SNAPSHOT_VERSION + 1}))
+    assert load_snapshot(tmp_path / 'old.json') is None
+
+
+def broker_with(*orders):
+    client = FakeTradingClient()
+    for symbol, side, qty in orders:
+        client.submit_order(type('Order', (), {'symbol': symbol, 'side': side, 'qty': qty})())
+    return client
+
+
+def test_reconcile_drops_positions_the_broker_closed():
+    positions = {
+        'AAPL': {'entry_time': ENTRY_TIME, 'entry_price': 100.0, 'side': 'BUY', 'qty': 2.0, 'order_id': 'a'},
+        'NVDA': {'entry_time': ENTRY_TIME, 'entry_price': 900.0, 'side': 'BUY', 'qty': 1.0, 'order_id': 'n'},
+        'TSLA': {'entry_time': ENTRY_TIME, 'entry_price': 200.0, 'side': 'SELL', 'qty': 5.0, 'order_id': 't'},
+    }
+    # NVDA was closed after the snapshot; TSLA is held on the other side; AAPL was partly closed
+    client = broker_with(('AAPL', 'buy', 2.0), ('AAPL', 'sell', 0.5), ('NVDA', 'buy', 1.0), ('NVDA', 'sell', 1.0),
+                         ('TSLA', 'buy', 5.0))
+    kept, dropped = reconcile_positions(positions, client.get_all_positions())
+    assert sorted(dropped) == ['NVDA', 'TSLA']
+    assert kept == {'AAPL': {**positions['AAPL'], 'qty': 1.5}}
+
+
+def test_warm_start_only_restores_positions_the_broker_holds(tmp_path):
+    FinalQuantTrade = pytest.importorskip("FinalQuantTrade")
+    from Core.ReplayStream import ReplayDataStream
+
+    saved = warmed_strategy()
+    saved.open_position('AAPL', 'BUY', 101.5, 3.0, ENTRY_TIME, 'order-1')
+    saved.open_position('NVDA', 'SELL', 880.0, 1.0, ENTRY_TIME, 'order-2')
+    save_snapshot(tmp_path / 'live_state.json', saved.to_dict())
+
+    stream = ReplayDataStream({'AAPL': {'timestamp': np.zeros(0, dtype=np.int64),
+                                        **{f: np.zeros(0) for f in ('open', 'high', 'low', 'close', 'volume',
+                                                                   'trade_count', 'vwap')}}})
+    bot = FinalQuantTrade.LiveScalpingBot(client=broker_with(('AAPL', 'buy', 3.0)), stream=stream,
+                                          symbols=['AAPL', 'NVDA'], journal_dir=tmp_path)
+    bot.warm_start()
+    assert list(bot.strategy.positions) == ['AAPL']
+    assert bot.strategy.positions['AAPL']['entry_time'] == ENTRY_TIME
+    assert bot.strategy.indicators['NVDA'].values() == saved.indicators['NVDA'].values()
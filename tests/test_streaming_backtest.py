@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from Core.BarStore import BarStore, convert_csv_folder
+from Multiple_BackTests import BacktestScalpingBot
+
+CHUNK_BARS = [1, 7, 50, 389, 10 ** 6]
+
+
+def assert_same_run(streaming, vectorized):
+    for key in ('trades', 'wins', 'losses'):
+        assert streaming[key] == vectorized[key]
+    assert streaming['pnl'] == pytest.approx(vectorized['pnl'], rel=1e-12, abs=1e-12)
+    assert streaming['capital'] == pytest.approx(vectorized['capital'], rel=1e-12)
+    assert streaming['ledger'].dtype == vectorized['ledger'].dtype
+    for name in streaming['ledger'].dtype.names:
+        np.testing.assert_allclose(streaming['ledger'][name], vectorized['ledger'][name], rtol=1e-12, err_msg=name)
+
+
+@pytest.mark.parametrize("missing_bars", ["skip", "ffill"])
+@pytest.mark.parametrize("chunk_bars", CHUNK_BARS)
+def test_streaming_ledger_matches_in_memory(sparse_data, tmp_path, missing_bars, chunk_bars):
+    bot = BacktestScalpingBot(sparse_data, missing_bars=missing_bars, bar_store=tmp_path / "bars")
+    for config in bot.strategies:
+        vectorized = bot.run_backtest_for_strategy(config, engine="vectorized")
+        assert vectorized['trades'] > 0
+        assert_same_run(bot.run_streaming_backtest(config, chunk_bars=chunk_bars), vectorized)
+
+
+@pytest.mark.parametrize("chunk_bars", [13, 10 ** 6])
+def test_streaming_from_bar_store(dense_data, tmp_path, chunk_bars):
+    """Memory-mapped bar store input streams to the same ledger as the CSVs"""
+    convert_csv_folder(dense_data, BarStore(tmp_path / "bars"))
+    from_store = BacktestScalpingBot(dense_data, bar_store=tmp_path / "bars")
+    from_csv = BacktestScalpingBot(dense_data, bar_store=tmp_path / "empty")
+    config = from_store.strategies[0]
+    assert_same_run(from_store.run_streaming_backtest(config, chunk_bars=chunk_bars),
+                    from_csv.run_backtest_for_strategy(config, engine="vectorized"))
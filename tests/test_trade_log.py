@@ -0,0 +1,63 @@
+import asyncio
+import contextlib
+import io
+
+import pandas as pd
+import pytest
+
+from Core.TradeLog import JOURNAL_HEADER, TradeJournal
+
+ENTRY_TIME = pd.Timestamp('2024-03-04 15:00', tz='UTC')
+
+
+def entry(k):
+    return {'type': 'entry', 'symbol': 'AAPL', 'side': 'BUY', 'price': 100.0 + k, 'qty': 1.0,
+            'timestamp': ENTRY_TIME + pd.Timedelta(minutes=k), 'order_id': f"order-{k}"}
+
+
+def test_journal_writes_every_record_in_order(tmp_path):
+    async def run():
+        journal = TradeJournal(tmp_path, flush_interval=0.01, session="s1")
+        await journal.start()
+        for k in range(5):
+            journal.record(entry(k))
+            await asyncio.sleep(0.005)
+        await journal.close()
+        return journal
+
+    journal = asyncio.run(run())
+    rows = pd.read_csv(journal.path)
+    assert list(rows.columns) == JOURNAL_HEADER
+    assert rows['order_id'].tolist() == [f"order-{k}" for k in range(5)]
+    assert journal.written == 5
+
+
+def test_failed_write_requeues_the_batch_and_close_raises(tmp_path):
+    async def run():
+        journal = TradeJournal(tmp_path, flush_interval=0.01, session="s2")
+        await journal.start()
+        write = journal.write
+        failures = []
+
+        def failing_write(rows, fsync):
+            if not failures:
+                failures.append(len(rows))
+                raise OSError("disk full")
+            write(rows, fsync)
+
+        journal.write = failing_write
+        for k in range(3):
+            journal.record(entry(k))
+        await asyncio.sleep(0.1)
+        # The background writer logged and stopped; nothing was lost
+        assert journal.task.done()
+        assert [event['order_id'] for event in journal.pending] == ["order-0", "order-1", "order-2"]
+        journal.record(entry(3))
+        with pytest.raises(OSError, match="disk full"):
+            await journal.close()
+        return journal
+
+    with contextlib.redirect_stdout(io.StringIO()) as out:
+        journal = asyncio.run(run())
+    assert "Error writing trade journal" in out.getvalue()
+    assert pd.read_csv(journal.path)['order_id'].tolist() == [f"order-{k}" for k in range(4)]
@@ -0,0 +1,71 @@
+import asyncio
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("aiohttp")
+pytest.importorskip("alpaca.trading")
+
+from Core.Engine import Bar
+from TwelveData_TradingBot import MAX_OUTPUTSIZE, TokenBucket, TwelveDataClient, TwelveDataScalper, parse_values
+
+
+def test_token_bucket_charges_every_credit():
+    async def run():
+        # 6000 credits a minute is 100 a second
+        bucket = TokenBucket(6000, capacity=10)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await bucket.acquire(10)
+        assert loop.time() - started < 0.02
+        await bucket.acquire(5)
+        waited = loop.time() - started
+        assert 0.04 <= waited < 0.2
+        assert bucket.tokens == pytest.approx(0.0, abs=0.5)
+        with pytest.raises(ValueError):
+            await bucket.acquire(11)
+
+    asyncio.run(run())
+
+
+def test_client_rejects_batches_larger_than_the_budget():
+    with pytest.raises(ValueError, match="batch_size"):
+        TwelveDataClient("key", credits_per_minute=8, batch_size=9)
+
+
+def test_time_series_batches_use_their_largest_outputsize():
+    client = TwelveDataClient("key", credits_per_minute=60, batch_size=2)
+    requests = []
+
+    async def get(path, params, credits=1):
+        requests.append((params['symbol'], params['outputsize'], credits))
+        return {symbol: {"values": []} for symbol in params['symbol'].split(',')}
+
+    client.get = get
+    sizes = {'AAPL': 3, 'NVDA': 40, 'TSLA': 2}
+    bars = asyncio.run(client.time_series(['AAPL', 'NVDA', 'TSLA'], outputsize=sizes))
+    assert sorted(requests) == [('AAPL,NVDA', 40, 2), ('TSLA', 2, 1)]
+    assert bars == {'AAPL': [], 'NVDA': [], 'TSLA': []}
+
+
+def test_parse_values_orders_oldest_first():
+    payload = {"values": [
+        {"datetime": "2024-03-04 14:31:00", "open": "2", "high": "2", "low": "2", "close": "2", "volume": "10"},
+        {"datetime": "2024-03-04 14:30:00", "open": "1", "high": "1", "low": "1", "close": "1"},
+    ]}
+    bars = parse_values(payload)
+    assert [bar['close'] for bar in bars] == [1.0, 2.0]
+    assert bars[0]['timestamp'] == pd.Timestamp("2024-03-04 14:30", tz="UTC")
+    assert bars[0]['volume'] == 0
+    assert parse_values({"status": "error", "message": "limit"}) == []
+
+
+def test_polls_reach_back_to_each_symbols_last_bar():
+    bot = TwelveDataScalper()
+    now = pd.Timestamp("2024-03-04 15:00", tz="UTC")
+    assert bot.bars_needed('AAPL', now) == bot.config['history_bars']
+    bot.strategy.update(Bar('AAPL', now - pd.Timedelta(minutes=1), 1.0, 1.0, 1.0, 1.0, 1))
+    assert bot.bars_needed('AAPL', now) == 2
+    # Two failed polls later every missed minute is still requested
+    assert bot.bars_needed('AAPL', now + pd.Timedelta(minutes=3)) == 5
+    assert bot.bars_needed('AAPL', now + pd.Timedelta(days=10)) == MAX_OUTPUTSIZE
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("yfinance")
+pytest.importorskip("alpaca.trading")
+from Yahoo_Trading import YahooBarPoller
+
+MINUTES = pd.date_range("2024-03-04 10:00", periods=4, freq="min", tz="America/New_York")
+
+
+def download(symbols, closes):
+    """A grouped yf.download frame: one (symbol, field) column per OHLCV field"""
+    frames = {}
+    for symbol in symbols:
+        close = np.asarray(closes[symbol], dtype=float)
+        frames[symbol] = pd.DataFrame({'Open': close, 'High': close, 'Low': close, 'Close': close,
+                                       'Adj Close': close, 'Volume': np.full(len(close), 100.0)}, index=MINUTES)
+    return pd.concat(frames, axis=1)
+
+
+def test_new_bars_drops_the_forming_minute_and_bars_already_seen():
+    poller = YahooBarPoller(['AAPL', 'TSLA'])
+    data = download(['AAPL', 'TSLA'], {'AAPL': [1, 2, 3, 4], 'TSLA': [10, np.nan, 30, 40]})
+    # 10:03 is still forming
+    bars = poller.new_bars(data, MINUTES[3] + pd.Timedelta(seconds=20))
+    assert [(bar.symbol, bar.close) for bar in bars] == [('AAPL', 1.0), ('TSLA', 10.0), ('AAPL', 2.0),
+                                                         ('AAPL', 3.0), ('TSLA', 30.0)]
+    assert all(bar.timestamp.tzinfo is not None for bar in bars)
+    assert poller.last_update_time['AAPL'] == MINUTES[2]
+
+    # The next poll repeats the overlap; only the now completed minute is new
+    bars = poller.new_bars(data, MINUTES[3] + pd.Timedelta(minutes=1))
+    assert [(bar.symbol, bar.close) for bar in bars] == [('AAPL', 4.0), ('TSLA', 40.0)]
+    assert poller.new_bars(data, MINUTES[3] + pd.Timedelta(minutes=2)) == []
+
+
+def test_new_bars_skips_symbols_missing_from_the_download():
+    poller = YahooBarPoller(['AAPL', 'META'])
+    bars = poller.new_bars(download(['AAPL'], {'AAPL': [1, 2, 3, 4]}), MINUTES[-1] + pd.Timedelta(minutes=1))
+    assert {bar.symbol for bar in bars} == {'AAPL'}
+    assert poller.last_update_time['META'] is None
+    assert poller.new_bars(pd.DataFrame(), MINUTES[-1]) == []